@@ -384,9 +384,15 @@ def download(
     type=str,
     help="Project configuration key defined under read_lab_metadata.projects",
 )
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="Reuse unchanged rows from previous read_lab_metadata outputs in output folder",
+)
 @click.pass_context
 def read_lab_metadata(
-    ctx, metadata_file, sample_list_file, output_dir, files_folder, project
+    ctx, metadata_file, sample_list_file, output_dir, files_folder, project, incremental
 ):
     """
     Create the json compliant to the relecov schema from the Metadata file.
@@ -469,6 +475,19 @@ def read_lab_metadata(
     default=False,
     help="Check if the processed samples are already uploaded to platform database and make invalid those that are already there",
 )
+@click.option(
+    "-t",
+    "--threads",
+    type=int,
+    default=None,
+    help="Number of processes used to validate the samples in parallel. Default 1",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Validate the json file in chunks and write results as NDJSON, for very large files. Enabled by default for .ndjson/.jsonl files",
+)
 @click.pass_context
 def validate(
     ctx,
@@ -481,6 +500,8 @@ def validate(
     logsum_file,
     samples_json,
     check_db,
+    threads,
+    stream,
 ):
     """Validate json file against schema."""
     debug = ctx.obj.get("debug", False)
@@ -926,6 +947,18 @@ def update_db(
     default=False,
     help="If the module should continue even if any sample does not validate.",
 )
+@click.option(
+    "--force_rescan",
+    is_flag=True,
+    default=False,
+    help="Scan the whole input folder, ignoring the index of previous scans.",
+)
+@click.option(
+    "--extract_mode",
+    type=click.Choice(["copy", "hardlink", "reflink", "symlink"]),
+    default="copy",
+    help="How result files are placed in analysis_results. Falls back to copy if not possible.",
+)
 @click.pass_context
 def read_bioinfo_metadata(
     ctx,
@@ -936,6 +969,8 @@ def read_bioinfo_metadata(
     software_name,
     update,
     soft_validation,
+    force_rescan,
+    extract_mode,
 ):
     """
     Create the json compliant  from the Bioinfo Metadata.
@@ -55,19 +55,9 @@ def quality_control_evaluation(data: list[dict], **kwargs) -> list[dict]:
             op, f"NOT_{op}"
         )
 
-    conditions = {
-        k: (
-            lambda x, op=op, th=th: (
-                eval(f"{float(x)} {op} {th}") if isinstance(x, (int, float)) else False
-            )
-        )
-        for k, (op, th) in thresholds.items()
-    }
-
     data, warnings = relecov_tools.assets.pipeline_utils.utils.evaluate_qc_samples(
         data,
         thresholds,
-        conditions,
         invert_operator,
         is_not_evaluable,
     )
@@ -3,18 +3,22 @@
 Common utility function used for relecov_tools package.
 """
 
+import csv
+import hashlib
 import json
 import logging
 import os
 import re
 import sys
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import rich
 import yaml
-from Bio import SeqIO  # type: ignore
 
 import relecov_tools.utils
 from relecov_tools.config_json import ConfigJson
@@ -27,6 +31,17 @@ stderr = rich.console.Console(
     highlight=False,
     force_terminal=relecov_tools.utils.rich_force_colors(),
 )
+# Max number of consensus files scanned at the same time
+CONSENSUS_THREADS = 8
+# Vectorized comparison for each QC threshold operator
+QC_OPERATORS = {
+    ">": np.greater,
+    "<": np.less,
+    ">=": np.greater_equal,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
 
 
 # INIT Class
@@ -166,162 +181,173 @@ class LongTableParse:
                 sys.exit(1)
         return True
 
-    def parse_file(self):
-        """This function generates a json file from the csv file entered by
-        the user (long_table.csv).
-        Validate the file by checking the header line
+    def _resolve_sample(self, raw_sample: str) -> str:
+        """Get the unique_sample_id for a sample value of the long table, using
+        the metadata mapping or the id encoded in the sample value.
         """
-        with open(self.file_path, encoding="utf-8-sig") as fh:
-            lines = fh.readlines()
-
-        headings_from_csv = lines[0].strip().split(",")
-        heading_index = {
-            heading: headings_from_csv.index(heading)
-            for heading in self.long_table_heading.values()
-        }
-        stderr.print("[green]\tSuccessful checking heading fields")
-        log.info("Successful checking heading fields")
-
-        samp_dict = {}
-        for line in lines[1:]:
-            line_s = line.strip().split(",")
-
-            raw_sample_value = line_s[heading_index["SAMPLE"]]
-            if raw_sample_value is None:
-                msg = "Found empty sample value in variants_long_table."
-                stderr.print(f"[red]{msg}")
-                log.error(msg)
-                raise ValueError(msg)
-
-            raw_sample = raw_sample_value.strip()
-            if not raw_sample:
-                msg = "Found empty sample value in variants_long_table."
-                stderr.print(f"[red]{msg}")
-                log.error(msg)
-                raise ValueError(msg)
-
-            unique_sample = self._raw_to_unique.get(raw_sample)
+        unique_sample = self._raw_to_unique.get(raw_sample)
+        if unique_sample is None:
+            if "_" in raw_sample:
+                split_ids = raw_sample.split("_")
+                # This part assumes that unique-ids NEVER include an underscore
+                candidate_unique = split_ids.pop(-1)
+                seq_id = "_".join(split_ids)
+            else:
+                seq_id, candidate_unique = raw_sample, ""
+
+            seq_id = str(seq_id).strip()
+            candidate_unique = str(candidate_unique).strip()
+
+            if not candidate_unique:
+                seq_from_unique = self.unique_to_seq.get(seq_id)
+                if seq_from_unique:
+                    unique_sample = seq_id
+                    self._register_mapping(
+                        seq_from_unique,
+                        unique_sample,
+                        context="variants_long_table",
+                    )
+                    self._raw_to_unique[raw_sample] = unique_sample
+
             if unique_sample is None:
-                if "_" in raw_sample:
-                    split_ids = raw_sample.split("_")
-                    # This part assumes that unique-ids NEVER include an underscore
-                    candidate_unique = split_ids.pop(-1)
-                    seq_id = "_".join(split_ids)
-                else:
-                    seq_id, candidate_unique = raw_sample, ""
-
-                seq_id = str(seq_id).strip()
-                candidate_unique = str(candidate_unique).strip()
-
-                if not candidate_unique:
-                    seq_from_unique = self.unique_to_seq.get(seq_id)
-                    if seq_from_unique:
-                        unique_sample = seq_id
-                        self._register_mapping(
-                            seq_from_unique,
-                            unique_sample,
-                            context="variants_long_table",
-                        )
-                        self._raw_to_unique[raw_sample] = unique_sample
+                if not seq_id:
+                    msg = (
+                        "Unable to determine sequencing_sample_id from variants_long_table "
+                        f"sample value '{raw_sample}'."
+                    )
+                    stderr.print(f"[red]{msg}")
+                    log.error(msg)
+                    raise ValueError(msg)
 
-                if unique_sample is None:
-                    if not seq_id:
-                        msg = (
-                            "Unable to determine sequencing_sample_id from variants_long_table "
-                            f"sample value '{raw_sample}'."
-                        )
-                        stderr.print(f"[red]{msg}")
-                        log.error(msg)
-                        raise ValueError(msg)
+                metadata_unique = self.seq_to_unique.get(seq_id)
 
-                    metadata_unique = self.seq_to_unique.get(seq_id)
+                if (
+                    metadata_unique
+                    and candidate_unique
+                    and metadata_unique != candidate_unique
+                ):
+                    msg = (
+                        "Mismatch between metadata unique_sample_id "
+                        f"'{metadata_unique}' and variants_long_table sample "
+                        f"'{candidate_unique}' for sequencing_sample_id '{seq_id}'."
+                    )
+                    stderr.print(f"[red]{msg}")
+                    log.error(msg)
+                    raise ValueError(msg)
 
+                unique_id = metadata_unique or candidate_unique
+                if not unique_id:
+                    msg = (
+                        "No unique_sample_id found for sequencing_sample_id "
+                        f"'{seq_id}'. Ensure it is present in the bioinfo metadata "
+                        "or encoded in the variants_long_table."
+                    )
+                    stderr.print(f"[red]{msg}")
+                    log.error(msg)
+                    raise ValueError(msg)
+
+                context = "metadata"
+                if not metadata_unique:
+                    context = "variants_long_table"
                     if (
-                        metadata_unique
-                        and candidate_unique
-                        and metadata_unique != candidate_unique
+                        seq_id in self._metadata_missing_unique
+                        and seq_id not in self._warned_missing_in_metadata
                     ):
-                        msg = (
-                            "Mismatch between metadata unique_sample_id "
-                            f"'{metadata_unique}' and variants_long_table sample "
-                            f"'{candidate_unique}' for sequencing_sample_id '{seq_id}'."
+                        stderr.print(
+                            "[yellow]unique_sample_id for sequencing_sample_id "
+                            f"'{seq_id}' missing in metadata. Using value from "
+                            "variants_long_table."
+                        )
+                        log.warning(
+                            "unique_sample_id for sequencing_sample_id '%s' missing "
+                            "in metadata. Using value from variants_long_table.",
+                            seq_id,
                         )
-                        stderr.print(f"[red]{msg}")
-                        log.error(msg)
-                        raise ValueError(msg)
-
-                    unique_id = metadata_unique or candidate_unique
-                    if not unique_id:
-                        msg = (
-                            "No unique_sample_id found for sequencing_sample_id "
-                            f"'{seq_id}'. Ensure it is present in the bioinfo metadata "
-                            "or encoded in the variants_long_table."
+                        self._warned_missing_in_metadata.add(seq_id)
+                    elif (
+                        seq_id not in self._metadata_missing_unique
+                        and seq_id not in self._warned_inferred_from_csv
+                    ):
+                        stderr.print(
+                            f"[yellow]Sequencing_sample_id '{seq_id}' not present in metadata. "
+                            "Using mapping from variants_long_table."
                         )
-                        stderr.print(f"[red]{msg}")
-                        log.error(msg)
-                        raise ValueError(msg)
-
-                    context = "metadata"
-                    if not metadata_unique:
-                        context = "variants_long_table"
-                        if (
-                            seq_id in self._metadata_missing_unique
-                            and seq_id not in self._warned_missing_in_metadata
-                        ):
-                            stderr.print(
-                                "[yellow]unique_sample_id for sequencing_sample_id "
-                                f"'{seq_id}' missing in metadata. Using value from "
-                                "variants_long_table."
-                            )
-                            log.warning(
-                                "unique_sample_id for sequencing_sample_id '%s' missing "
-                                "in metadata. Using value from variants_long_table.",
-                                seq_id,
-                            )
-                            self._warned_missing_in_metadata.add(seq_id)
-                        elif (
-                            seq_id not in self._metadata_missing_unique
-                            and seq_id not in self._warned_inferred_from_csv
-                        ):
-                            stderr.print(
-                                f"[yellow]Sequencing_sample_id '{seq_id}' not present in metadata. "
-                                "Using mapping from variants_long_table."
-                            )
-                            log.warning(
-                                "Sequencing_sample_id '%s' not present in metadata. "
-                                "Using mapping from variants_long_table.",
-                                seq_id,
-                            )
-                            self._warned_inferred_from_csv.add(seq_id)
-
-                    self._register_mapping(seq_id, unique_id, context=context)
-                    self._raw_to_unique[raw_sample] = unique_id
-                    unique_sample = unique_id
-
-            if unique_sample not in samp_dict:
-                samp_dict[unique_sample] = []
-
-            variant_dict = {
+                        log.warning(
+                            "Sequencing_sample_id '%s' not present in metadata. "
+                            "Using mapping from variants_long_table.",
+                            seq_id,
+                        )
+                        self._warned_inferred_from_csv.add(seq_id)
+
+                self._register_mapping(seq_id, unique_id, context=context)
+                self._raw_to_unique[raw_sample] = unique_id
+                unique_sample = unique_id
+        return unique_sample
+
+    def parse_file(self):
+        """This function generates a json file from the csv file entered by
+        the user (long_table.csv).
+        Validate the file by checking the header line. Rows are read one at a
+        time and grouped by sample, the file is never loaded as a whole.
+        """
+        with open(self.file_path, encoding="utf-8-sig", newline="") as fh:
+            reader = csv.reader(fh)
+            headings_from_csv = [heading.strip() for heading in next(reader, [])]
+            heading_index = {
+                heading: headings_from_csv.index(heading)
+                for heading in self.long_table_heading.values()
+            }
+            stderr.print("[green]\tSuccessful checking heading fields")
+            log.info("Successful checking heading fields")
+
+            # Column position of each field, resolved once for all rows
+            field_index = {
                 key: (
-                    {key2: line_s[heading_index[val2]] for key2, val2 in value.items()}
+                    {key2: heading_index[val2] for key2, val2 in value.items()}
                     if isinstance(value, dict)
-                    else line_s[heading_index[value]]
+                    else heading_index[value]
                 )
                 for key, value in self.long_table_heading.items()
             }
-            variant_dict["sample"] = unique_sample
-
-            if re.search("&", line_s[heading_index["GENE"]]):
-                # Example
-                # 215184,NC_045512.2,27886,AAACGAACATGAAATT,A,PASS,1789,1756,1552,0.87,ORF7b&ORF8,gene_fusion,n.27887_27901delAACGAACATGAAATT,.,.,ivar,B.1.1.318
-                # This only occurs (for now) as gene fusion, so we just duplicate lines with same values
-                genes = re.split("&", line_s[heading_index["GENE"]])
-                for gene in genes:
-                    variant_dict_copy = variant_dict.copy()
-                    variant_dict_copy["Gene"] = gene
-                    samp_dict[unique_sample].append(variant_dict_copy)
-            else:
-                samp_dict[unique_sample].append(variant_dict)
+            sample_idx = heading_index["SAMPLE"]
+            gene_idx = heading_index["GENE"]
+
+            samp_dict = {}
+            for line_s in reader:
+                if not line_s:
+                    continue
+                raw_sample = line_s[sample_idx].strip()
+                if not raw_sample:
+                    msg = "Found empty sample value in variants_long_table."
+                    stderr.print(f"[red]{msg}")
+                    log.error(msg)
+                    raise ValueError(msg)
+
+                unique_sample = self._raw_to_unique.get(raw_sample)
+                if unique_sample is None:
+                    unique_sample = self._resolve_sample(raw_sample)
+
+                variant_dict = {
+                    key: (
+                        {key2: line_s[idx2] for key2, idx2 in idx.items()}
+                        if isinstance(idx, dict)
+                        else line_s[idx]
+                    )
+                    for key, idx in field_index.items()
+                }
+                variant_dict["sample"] = unique_sample
+
+                sample_variants = samp_dict.setdefault(unique_sample, [])
+                if "&" in line_s[gene_idx]:
+                    # Example
+                    # 215184,NC_045512.2,27886,AAACGAACATGAAATT,A,PASS,1789,1756,1552,0.87,ORF7b&ORF8,gene_fusion,n.27887_27901delAACGAACATGAAATT,.,.,ivar,B.1.1.318
+                    # This only occurs (for now) as gene fusion, so we just duplicate lines with same values
+                    for gene in line_s[gene_idx].split("&"):
+                        variant_dict_copy = variant_dict.copy()
+                        variant_dict_copy["Gene"] = gene
+                        sample_variants.append(variant_dict_copy)
+                else:
+                    sample_variants.append(variant_dict)
         stderr.print("[green]\tSuccessful parsing data")
         log.info("Successful parsing long table data")
         return samp_dict
@@ -363,6 +389,18 @@ class LongTableParse:
             j_list.append(j_dict)
         return j_list
 
+    @staticmethod
+    def _dump_samples(j_list, file_path):
+        """Write the list of samples as a json array, one sample per line, so each
+        sample is encoded and written on its own instead of the whole list at once.
+        """
+        with open(file_path, "w") as fh:
+            fh.write("[")
+            for idx, item in enumerate(j_list):
+                fh.write(",\n" if idx else "\n")
+                fh.write(json.dumps(item))
+            fh.write("\n]\n")
+
     def save_to_file(self, j_list, file_tag):
         """Transform the parsed data into a json file"""
         file_name = f"long_table_{file_tag}.json"
@@ -390,8 +428,7 @@ class LongTableParse:
                 else:
                     original_table.append(item)
             try:
-                with open(file_path, "w") as fh:
-                    fh.write(json.dumps(original_table, indent=4))
+                self._dump_samples(original_table, file_path)
                 stderr.print(
                     "[green]\tParsed data successfully saved to file:", file_path
                 )
@@ -401,8 +438,7 @@ class LongTableParse:
                 log.error("Error saving parsed data to file: %s", e)
         else:
             try:
-                with open(file_path, "w") as fh:
-                    fh.write(json.dumps(j_list, indent=4))
+                self._dump_samples(j_list, file_path)
                 stderr.print(
                     "[green]\tParsed data successfully saved to file:", file_path
                 )
@@ -485,8 +521,50 @@ def parse_long_table(
         return None
 
 
+def scan_fasta_stats(fasta_file: str, chunk_size: int = 4 * 1024 * 1024) -> dict:
+    """Read a fasta file in chunks, getting its record names, total sequence length
+    and md5 in a single pass.
+
+    Args:
+        fasta_file (str): Path to the fasta file.
+        chunk_size (int, optional): Bytes read each time. Defaults to 4MB.
+
+    Returns:
+        fasta_stats (dict): {"sequence_names": list, "genome_length": int,
+        "md5": str}
+    """
+    md5_hash = hashlib.md5()
+    sequence_names = []
+    genome_length = 0
+    # Lines before the first record are not part of any sequence, same as SeqIO
+    in_record = False
+    pending = b""
+    with open(fasta_file, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            md5_hash.update(chunk)
+            lines = (pending + chunk).split(b"\n")
+            # Last line may continue in the next chunk
+            pending = lines.pop()
+            for line in lines:
+                if line.startswith(b">"):
+                    sequence_names.append(line[1:].rstrip().decode())
+                    in_record = True
+                elif in_record:
+                    genome_length += len(line.replace(b" ", b"").replace(b"\r", b""))
+    if pending.startswith(b">"):
+        sequence_names.append(pending[1:].rstrip().decode())
+    elif in_record:
+        genome_length += len(pending.replace(b" ", b"").replace(b"\r", b""))
+    return {
+        "sequence_names": sequence_names,
+        "genome_length": genome_length,
+        "md5": md5_hash.hexdigest(),
+    }
+
+
 def extract_consensus_stats(files_list: list, **kwargs) -> dict:
     """File handler to parse consensus data (fasta) into JSON structured format.
+    Consensus files are scanned in parallel, each one in a single pass.
 
     Args:
         files_list (list): A list with paths to condensus files.
@@ -497,28 +575,29 @@ def extract_consensus_stats(files_list: list, **kwargs) -> dict:
     method_name = f"{extract_consensus_stats.__name__}"
     method_log_report = BioinfoReportLog()
 
+    def _scan_consensus(consensus_file):
+        try:
+            return scan_fasta_stats(consensus_file)
+        except FileNotFoundError:
+            return None
+
     consensus_data_processed = {}
     missing_consens = []
-    for consensus_file in files_list:
-        sequence_names = []
-        genome_length = 0
-        try:
-            record_fasta = SeqIO.parse(consensus_file, "fasta")
-            for record in record_fasta:
-                sequence_names.append(record.description)
-                genome_length += len(record.seq)
-        except FileNotFoundError as e:
-            missing_consens.append(e.filename)
-            continue
-        sample_key = os.path.basename(consensus_file).split(".")[0]
-        # Update consensus data for the sample key
-        consensus_data_processed[sample_key] = {
-            "sequence_name": ", ".join(sequence_names),
-            "genome_length": genome_length,
-            "sequence_filepath": os.path.dirname(consensus_file),
-            "sequence_filename": sample_key,
-            "sequence_md5": relecov_tools.utils.calculate_md5(consensus_file),
-        }
+    with ThreadPoolExecutor(max_workers=CONSENSUS_THREADS) as executor:
+        all_stats = executor.map(_scan_consensus, files_list)
+        for consensus_file, fasta_stats in zip(files_list, all_stats):
+            if fasta_stats is None:
+                missing_consens.append(consensus_file)
+                continue
+            sample_key = os.path.basename(consensus_file).split(".")[0]
+            # Update consensus data for the sample key
+            consensus_data_processed[sample_key] = {
+                "sequence_name": ", ".join(fasta_stats["sequence_names"]),
+                "genome_length": fasta_stats["genome_length"],
+                "sequence_filepath": os.path.dirname(consensus_file),
+                "sequence_filename": sample_key,
+                "sequence_md5": fasta_stats["md5"],
+            }
     # Report missing consensus
     conserrs = len(missing_consens)
     if conserrs >= 1:
@@ -582,27 +661,50 @@ def get_software_versions_yml(files_list: list, **kwargs) -> dict:
     return version_dict
 
 
+def _metric_to_array(raw_values: list) -> np.ndarray:
+    """Convert the values of a QC metric to a float array. Missing values and
+    values that are not numbers are returned as NaN.
+    """
+    try:
+        return pd.to_numeric(
+            pd.Series(raw_values, dtype=object), errors="coerce"
+        ).to_numpy(dtype=float, na_value=np.nan)
+    except (TypeError, ValueError):
+        # Values of unexpected types (lists, dicts...) are converted one by one
+        converted = []
+        for value in raw_values:
+            try:
+                converted.append(float(value))
+            except (TypeError, ValueError):
+                converted.append(np.nan)
+        return np.array(converted, dtype=float)
+
+
 def evaluate_qc_samples(
     data: list[dict],
     thresholds: dict,
-    conditions: dict,
     invert_operator: Callable,
     is_not_evaluable: Callable,
+    not_evaluable_params: set | None = None,
 ) -> tuple[list[dict], list[str]]:
     """
     Perform QC evaluation on a list of sample data dictionaries using provided threshold logic.
+    Each metric is converted to an array once and compared against its threshold for
+    all samples at the same time.
 
     Args:
     data : list of dict
         Each dict represents a sample and contains metrics to be evaluated.
     thresholds : dict
         A dictionary where keys are metric names and values are tuples (operator, threshold).
-    conditions : dict
-        A dictionary where keys are metric names and values are condition functions.
+        Operator must be one of QC_OPERATORS.
     invert_operator : function
         Function that returns the inverse of a comparison operator.
     is_not_evaluable : function
         Function to detect if a metric value should be skipped
+    not_evaluable_params : set, optional
+        Metrics whose not evaluable values are skipped. In any other metric
+        those values make the sample fail as invalid.
 
     Returns:
     Tuple of:
@@ -611,58 +713,46 @@ def evaluate_qc_samples(
     - warning_messages : List[str]
         List of warning messages that occurred during evaluation.
     """
-    warning_messages = []
-
-    for sample in data:
-        try:
-            qc_status = "pass"
-            failed_reasons = []
-
-            for param, condition in conditions.items():
-                value = (
-                    float(sample.get(param))
-                    if isinstance(sample.get(param), str)
-                    else sample.get(param)
+    failed_reasons: list[list[str]] = [[] for _ in data]
+    sample_warnings: list[list[str]] = [[] for _ in data]
+    sample_ids = [sample.get("sequencing_sample_id", "unknown") for sample in data]
+    exempt_params = not_evaluable_params or set()
+
+    for param, (op, th) in thresholds.items():
+        if op not in QC_OPERATORS:
+            raise ValueError(f"Unknown QC operator '{op}' for {param}")
+        raw_values = [sample.get(param) for sample in data]
+        values = _metric_to_array(raw_values)
+        skipped = np.zeros(len(data), dtype=bool)
+        # Only strings that are not numbers can be placeholders or invalid values
+        for idx in np.flatnonzero(np.isnan(values)):
+            value = raw_values[idx]
+            if not isinstance(value, str):
+                continue
+            skipped[idx] = True
+            if param in exempt_params and is_not_evaluable(value):
+                log.info(
+                    "%s is not evaluable for %s in sample %s",
+                    value,
+                    param,
+                    sample_ids[idx],
                 )
-                try:
-                    if value is None or not condition(value):
-                        if is_not_evaluable(value):
-                            log.info(
-                                "%s is not evaluable for %s in sample %s",
-                                value,
-                                param,
-                                sample.get("sequencing_sample_id", "unknown"),
-                            )
-                            continue
-                        qc_status = "fail"
-                        op, th = thresholds[param]
-                        inverted_op = invert_operator(op)
-                        failed_reasons.append(f"({param} {inverted_op} {th})")
-                except (TypeError, ValueError):
-                    if is_not_evaluable(value):
-                        continue
-                    qc_status = "fail"
-                    failed_reasons.append(f"({param} = {value} invalid)")
-                    msg = (
-                        f"Sample {sample.get('sequencing_sample_id', 'unknown')} "
-                        f"has unevaluable value for {param}: {value}"
-                    )
-                    warning_messages.append(msg)
-
-            sample["qc_test"] = qc_status
-            if qc_status == "fail" and failed_reasons:
-                sample["qc_failed"] = " -- ".join(failed_reasons)
-
-            msg = (
-                "valid",
-                f"{sample.get('sequencing_sample_id', 'unknown')} evaluated: {qc_status}",
+                continue
+            failed_reasons[idx].append(f"({param} = {value} invalid)")
+            sample_warnings[idx].append(
+                f"Sample {sample_ids[idx]} has unevaluable value for {param}: {value}"
             )
-
-        except (TypeError, ValueError, AttributeError) as e:
-            sample["qc_test"] = "fail"
-            sample["qc_failed"] = f"(evaluation_error = {str(e)})"
-            sample_id = sample.get("sequencing_sample_id", "unknown")
-            msg = f"Error evaluating sample {sample_id}: {e}"
-            warning_messages.append(msg)
-
+        # Missing values (NaN) never meet the threshold
+        with np.errstate(invalid="ignore"):
+            failed = ~QC_OPERATORS[op](values, th) & ~skipped
+        failed_reason = f"({param} {invert_operator(op)} {th})"
+        for idx in np.flatnonzero(failed):
+            failed_reasons[idx].append(failed_reason)
+
+    for sample, reasons in zip(data, failed_reasons):
+        sample["qc_test"] = "fail" if reasons else "pass"
+        if reasons:
+            sample["qc_failed"] = " -- ".join(reasons)
+
+    warning_messages = [msg for msgs in sample_warnings for msg in msgs]
     return data, warning_messages
@@ -1,18 +1,83 @@
 #!/usr/bin/env python
-from jsonschema import FormatChecker, exceptions
+from jsonschema import FormatChecker, exceptions, validators
 import datetime
+import functools
 
 import relecov_tools.config_json
 
+# Placeholders accepted in numeric fields and in string fields with date format
+NUMERIC_PLACEHOLDERS = [
+    "Data Not Evaluable [NCIT:C186292]",
+    "Not Applicable [GENEPIO:0001619]",
+]
+DATE_PLACEHOLDERS = ["Not Applicable [GENEPIO:0001619]"]
+_exceptions_tables = {}
+
+
+@functools.lru_cache(maxsize=None)
+def get_placeholder_exceptions():
+    """Get the placeholder values allowed as exceptions, including the configured
+    not_provided_field.
+
+    Returns:
+        numeric_exceptions (frozenset): Values allowed for integer/number fields
+        date_exceptions (frozenset): Values allowed for string fields with date format
+    """
+    not_provided = relecov_tools.config_json.ConfigJson(
+        extra_config=True
+    ).get_topic_data("generic", "not_provided_field")
+    numeric_exceptions = frozenset([not_provided] + NUMERIC_PLACEHOLDERS)
+    date_exceptions = frozenset([not_provided] + DATE_PLACEHOLDERS)
+    return numeric_exceptions, date_exceptions
+
+
+def get_property_exceptions(prop_schema):
+    """Get the accepted placeholders for each validator of a property schema
+
+    Args:
+        prop_schema (dict): Schema of a single property
+
+    Returns:
+        prop_exceptions (dict): {validator: frozenset(accepted instances)}
+    """
+    numeric_exceptions, date_exceptions = get_placeholder_exceptions()
+    prop_exceptions = {}
+    if prop_schema.get("type") in ["integer", "number"]:
+        prop_exceptions["type"] = numeric_exceptions
+    if prop_schema.get("type") == "string" and prop_schema.get("format") == "date":
+        prop_exceptions["format"] = date_exceptions
+    return prop_exceptions
+
+
+def get_exceptions_table(schema):
+    """Compile the exceptions of every property in the schema, once per schema
+
+    Args:
+        schema (dict): Dictionary representing the JSON schema.
+
+    Returns:
+        exceptions_table (dict): {(property, validator): frozenset(accepted instances)}
+    """
+    cached = _exceptions_tables.get(id(schema))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    exceptions_table = {}
+    for prop_name, prop_schema in schema.get("properties", {}).items():
+        for validator, accepted in get_property_exceptions(prop_schema).items():
+            exceptions_table[(prop_name, validator)] = accepted
+    _exceptions_tables[id(schema)] = (schema, exceptions_table)
+    return exceptions_table
+
 
 def validate_with_exceptions(schema, data, errors):
     """Filter validation errors based on known exceptions.
 
     This function filters out specific validation errors from the provided list
     of errors based on exceptions defined in the schema. It allows:
-      - Numeric fields (integer/float) to contain the placeholder
-        'Not Provided [SNOMED:434941000124101]'.
-      - String fields with format 'date' to contain the same placeholder.
+      - Numeric fields (integer/float) to contain the placeholders
+        'Not Provided [SNOMED:434941000124101]', 'Data Not Evaluable [NCIT:C186292]'
+        and 'Not Applicable [GENEPIO:0001619]'.
+      - String fields with format 'date' to contain 'Not Provided' or 'Not Applicable'.
 
     Args:
         schema (dict): Dictionary representing the JSON schema.
@@ -22,64 +87,52 @@ def validate_with_exceptions(schema, data, errors):
     Returns:
         filtered_errors (list): List of validation errors excluding known exceptions.
     """
+    exceptions_table = get_exceptions_table(schema)
     filtered_errors = []
 
     for error in errors:
         property_path = ".".join(str(p) for p in error.path)
-        prop_schema = schema["properties"].get(property_path, {})
-
-        # allow not provided for numeric types
-        if (
-            error.validator == "type"
-            and error.instance
-            == relecov_tools.config_json.ConfigJson(extra_config=True).get_topic_data(
-                "generic", "not_provided_field"
-            )
-            and prop_schema.get("type") in ["integer", "number"]
-        ):
-            continue
-
-        # allow not provided for date format types
-        if (
-            error.validator == "format"
-            and error.instance
-            == relecov_tools.config_json.ConfigJson(extra_config=True).get_topic_data(
-                "generic", "not_provided_field"
-            )
-            and prop_schema.get("type") == "string"
-            and prop_schema.get("format") == "date"
-        ):
+        accepted = exceptions_table.get((property_path, error.validator))
+        if accepted and isinstance(error.instance, str) and error.instance in accepted:
             continue
+        # Keep all other errors
+        filtered_errors.append(error)
 
-        # allow not evaluable for numeric types
-        if (
-            error.validator == "type"
-            and error.instance == "Data Not Evaluable [NCIT:C186292]"
-            and prop_schema.get("type") in ["integer", "number"]
-        ):
-            continue
+    return filtered_errors
 
-        # allow not applicable for numeric types
-        if (
-            error.validator == "type"
-            and error.instance == "Not Applicable [GENEPIO:0001619]"
-            and prop_schema.get("type") in ["integer", "number"]
-        ):
-            continue
 
-        # allow not applicable for date format types
-        if (
-            error.validator == "format"
-            and error.instance == "Not Applicable [GENEPIO:0001619]"
-            and prop_schema.get("type") == "string"
-            and prop_schema.get("format") == "date"
-        ):
-            continue
+@functools.lru_cache(maxsize=None)
+def extend_with_exceptions(validator_class):
+    """Extend a jsonschema validator class so the allowed placeholders do not
+    generate type or format errors in the first place
 
-        # Keep all other errors
-        filtered_errors.append(error)
+    Args:
+        validator_class (jsonschema.Validator): Class to extend e.g. Draft202012Validator
 
-    return filtered_errors
+    Returns:
+        extended_class (jsonschema.Validator): Validator class skipping the exceptions
+    """
+    type_validator = validator_class.VALIDATORS["type"]
+    format_validator = validator_class.VALIDATORS["format"]
+    placeholders = frozenset().union(*get_placeholder_exceptions())
+
+    def skip_exceptions(keyword, keyword_validator):
+        def validate_keyword(validator, value, instance, schema):
+            if isinstance(instance, str) and instance in placeholders:
+                accepted = get_property_exceptions(schema).get(keyword)
+                if accepted and instance in accepted:
+                    return
+            yield from keyword_validator(validator, value, instance, schema)
+
+        return validate_keyword
+
+    return validators.extend(
+        validator_class,
+        {
+            "type": skip_exceptions("type", type_validator),
+            "format": skip_exceptions("format", format_validator),
+        },
+    )
 
 
 def make_date_checker(start_date, end_date):
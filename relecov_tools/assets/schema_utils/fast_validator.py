@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import logging
+import re
+
+from relecov_tools.assets.schema_utils.custom_validators import (
+    get_property_exceptions,
+)
+
+log = logging.getLogger(__name__)
+
+# Keywords that do not take part in validation
+ANNOTATION_KEYWORDS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "$defs",
+    "title",
+    "description",
+    "version",
+    "examples",
+    "default",
+    "label",
+    "header",
+    "ontology",
+    "classification",
+    "fill_mode",
+    "identifiers_org_prefix",
+}
+TYPE_CHECKS = {
+    "string": "type(v) is str",
+    "integer": "(type(v) is int or (type(v) is float and v.is_integer()))",
+    "number": "(type(v) is int or type(v) is float)",
+    "boolean": "(v is True or v is False)",
+    "null": "v is None",
+    "array": "type(v) is list",
+    "object": "type(v) is dict",
+}
+NUMERIC_CHECK = "(type(v) is int or type(v) is float)"
+BOUND_CHECKS = {
+    "minimum": "v >= {}",
+    "maximum": "v <= {}",
+    "exclusiveMinimum": "v > {}",
+    "exclusiveMaximum": "v < {}",
+}
+_compiled_factories = {}
+_compiled_property_factories = {}
+
+
+class UnsupportedSchema(Exception):
+    pass
+
+
+def resolve_ref(json_schema, ref):
+    """Get the subschema for a local reference such as #/$defs/enums/organism"""
+    if not ref.startswith("#/"):
+        raise UnsupportedSchema(f"Non local $ref {ref}")
+    subschema = json_schema
+    for part in ref[2:].split("/"):
+        part = part.replace("~1", "/").replace("~0", "~")
+        try:
+            subschema = subschema[part]
+        except (KeyError, TypeError):
+            raise UnsupportedSchema(f"Could not resolve $ref {ref}")
+    return subschema
+
+
+def required_condition(subschema):
+    """Python condition for a subschema containing only a required clause"""
+    if set(subschema) - ANNOTATION_KEYWORDS != {"required"}:
+        raise UnsupportedSchema(f"Unsupported subschema {subschema}")
+    return " and ".join(f"{json.dumps(x)} in instance" for x in subschema["required"])
+
+
+class CodeGenerator:
+    """Generate the source of a function that tells if a sample is valid for the
+    given schema, with every supported keyword of each property inlined.
+    """
+
+    def __init__(self, json_schema):
+        self.json_schema = json_schema
+        self.constants = {}
+        self.lines = []
+
+    def add_constant(self, prefix, value):
+        name = f"{prefix}_{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def emit(self, line, indent=2):
+        self.lines.append("    " * indent + line)
+
+    def property_checks(self, prop_schema):
+        """Return the list of conditions that make the property value invalid"""
+        if "$ref" in prop_schema:
+            ref_schema = resolve_ref(self.json_schema, prop_schema["$ref"])
+            merged_schema = {k: v for k, v in prop_schema.items() if k != "$ref"}
+            for key, value in ref_schema.items():
+                if key in merged_schema and merged_schema[key] != value:
+                    raise UnsupportedSchema("$ref overlapping with property keywords")
+                merged_schema[key] = value
+            prop_schema = merged_schema
+        unsupported = (
+            set(prop_schema)
+            - ANNOTATION_KEYWORDS
+            - set(BOUND_CHECKS)
+            - {"type", "enum", "format", "minLength", "maxLength", "pattern"}
+        )
+        if unsupported:
+            raise UnsupportedSchema(f"Unsupported keywords {unsupported}")
+        checks = []
+        # Placeholders that validate_with_exceptions accepts for this property
+        prop_exceptions = {
+            keyword: self.add_constant("EXCEPTIONS", accepted)
+            for keyword, accepted in get_property_exceptions(prop_schema).items()
+        }
+        prop_type = prop_schema.get("type")
+        if prop_type is not None:
+            types = prop_type if isinstance(prop_type, list) else [prop_type]
+            if any(t not in TYPE_CHECKS for t in types):
+                raise UnsupportedSchema(f"Unsupported type {prop_type}")
+            type_check = " or ".join(TYPE_CHECKS[t] for t in types)
+            if "type" in prop_exceptions:
+                type_check += f" or (type(v) is str and v in {prop_exceptions['type']})"
+            checks.append(f"not ({type_check})")
+        if "enum" in prop_schema:
+            enum = prop_schema["enum"]
+            if not all(isinstance(x, str) for x in enum):
+                raise UnsupportedSchema("Only enums of strings are supported")
+            name = self.add_constant("ENUM", frozenset(enum))
+            checks.append(f"not (type(v) is str and v in {name})")
+        for keyword, template in BOUND_CHECKS.items():
+            if keyword in prop_schema:
+                bound = prop_schema[keyword]
+                if type(bound) not in (int, float):
+                    raise UnsupportedSchema(f"Invalid {keyword} {bound}")
+                checks.append(f"{NUMERIC_CHECK} and not {template.format(repr(bound))}")
+        if "minLength" in prop_schema:
+            checks.append(
+                f"type(v) is str and len(v) < {int(prop_schema['minLength'])}"
+            )
+        if "maxLength" in prop_schema:
+            checks.append(
+                f"type(v) is str and len(v) > {int(prop_schema['maxLength'])}"
+            )
+        if "pattern" in prop_schema:
+            name = self.add_constant("PATTERN", re.compile(prop_schema["pattern"]))
+            checks.append(f"type(v) is str and not {name}.search(v)")
+        if "format" in prop_schema:
+            fmt = json.dumps(prop_schema["format"])
+            check = f"not conforms(v, {fmt})"
+            if "format" in prop_exceptions:
+                exempt = f"(type(v) is str and v in {prop_exceptions['format']})"
+                check = f"not {exempt} and {check}"
+            checks.append(check)
+        return checks
+
+    def generate(self):
+        """Generate the source code of make_checker(conforms) -> is_valid(instance)"""
+        schema = self.json_schema
+        unsupported = set(schema) - ANNOTATION_KEYWORDS
+        unsupported -= {"type", "required", "properties", "allOf", "anyOf"}
+        if unsupported:
+            raise UnsupportedSchema(f"Unsupported top level keywords {unsupported}")
+        if schema.get("type", "object") != "object":
+            raise UnsupportedSchema("Schema type must be object")
+        self.emit("def make_checker(conforms):", 0)
+        self.emit("def is_valid(instance):", 1)
+        self.emit("if type(instance) is not dict:")
+        self.emit("    return False")
+        for field in schema.get("required", []):
+            self.emit(f"if {json.dumps(field)} not in instance:")
+            self.emit("    return False")
+        any_of_clauses = []
+        for subschema in schema.get("allOf", []):
+            if set(subschema) - ANNOTATION_KEYWORDS == {"anyOf"}:
+                any_of_clauses.append(subschema["anyOf"])
+            else:
+                self.emit(f"if not ({required_condition(subschema)}):")
+                self.emit("    return False")
+        if "anyOf" in schema:
+            any_of_clauses.append(schema["anyOf"])
+        for clause in any_of_clauses:
+            conditions = " or ".join(f"({required_condition(x)})" for x in clause)
+            self.emit(f"if not ({conditions}):")
+            self.emit("    return False")
+        self.emit("get = instance.get")
+        for prop_name, prop_schema in schema.get("properties", {}).items():
+            try:
+                checks = self.property_checks(prop_schema)
+            except UnsupportedSchema as e:
+                # Samples with this property always go through the full validator
+                log.debug(f"Property {prop_name} not compiled: {e}")
+                self.emit(f"if {json.dumps(prop_name)} in instance:")
+                self.emit("    return False")
+                continue
+            if not checks:
+                continue
+            self.emit(f"v = get({json.dumps(prop_name)}, MISSING)")
+            self.emit("if v is not MISSING and (")
+            for idx, check in enumerate(checks):
+                operator = "" if idx == 0 else "or "
+                self.emit(f"    {operator}({check})")
+            self.emit("):")
+            self.emit("    return False")
+        self.emit("return True")
+        self.emit("return is_valid", 1)
+        return "\n".join(self.lines) + "\n"
+
+    def generate_properties(self):
+        """Generate the source code of make_property_checks(conforms) -> checks,
+        a dict with a function telling if a value is invalid for each property
+        that can be compiled.
+        """
+        self.emit("def make_property_checks(conforms):", 0)
+        compiled_props = []
+        for prop_name, prop_schema in self.json_schema.get("properties", {}).items():
+            try:
+                checks = self.property_checks(prop_schema)
+            except UnsupportedSchema as e:
+                log.debug(f"Property {prop_name} not compiled: {e}")
+                continue
+            func_name = f"is_invalid_{len(compiled_props)}"
+            compiled_props.append((prop_name, func_name))
+            self.emit(f"def {func_name}(v):", 1)
+            if not checks:
+                self.emit("return False")
+                continue
+            self.emit("return (")
+            for idx, check in enumerate(checks):
+                operator = "" if idx == 0 else "or "
+                self.emit(f"    {operator}({check})")
+            self.emit(")")
+        self.emit("return {", 1)
+        for prop_name, func_name in compiled_props:
+            self.emit(f"{json.dumps(prop_name)}: {func_name},")
+        self.emit("}", 1)
+        return "\n".join(self.lines) + "\n"
+
+
+def get_schema_hash(json_schema):
+    """Hash used to identify the compiled code of each schema"""
+    schema_dump = json.dumps(json_schema, sort_keys=True, default=str)
+    return hashlib.sha256(schema_dump.encode()).hexdigest()
+
+
+def compile_factory(generator, source, factory_name, schema_hash):
+    """Compile the generated source and return the factory function defined in it"""
+    namespace = dict(generator.constants, MISSING=object())
+    code = compile(source, f"<fast_validator_{schema_hash[:12]}>", "exec")
+    exec(code, namespace)
+    return namespace[factory_name]
+
+
+def get_fast_checker(json_schema, format_checker=None):
+    """Get a fast function telling if a sample is fully valid against the schema.
+    Code is generated once per schema hash, and only answers True when the full
+    jsonschema validation (including the accepted placeholder exceptions) would not
+    report any error, so any sample returning False must be validated as usual.
+
+    Args:
+        json_schema (dict): Loaded JSON schema as a dictionary
+        format_checker (FormatChecker, optional): Checker used for format keywords,
+        same as in the jsonschema validator. Formats are not checked if None.
+
+    Returns:
+        is_valid (function): Function returning True if the sample is valid, or
+        None if the schema uses keywords that cannot be compiled.
+    """
+    schema_hash = get_schema_hash(json_schema)
+    if schema_hash not in _compiled_factories:
+        try:
+            generator = CodeGenerator(json_schema)
+            source = generator.generate()
+        except UnsupportedSchema as e:
+            log.info(f"Schema could not be compiled, using jsonschema only: {e}")
+            _compiled_factories[schema_hash] = None
+        else:
+            _compiled_factories[schema_hash] = compile_factory(
+                generator, source, "make_checker", schema_hash
+            )
+    make_checker = _compiled_factories[schema_hash]
+    if make_checker is None:
+        return None
+    if format_checker is None:
+        return make_checker(lambda instance, fmt: True)
+    return make_checker(format_checker.conforms)
+
+
+def get_property_checkers(json_schema, format_checker=None):
+    """Get a function for each property of the schema telling if a value is invalid
+    for it, so values can be checked column by column instead of sample by sample.
+    A property is only included when its keywords can be compiled, and a value
+    returning False would not get any error from the full jsonschema validation
+    of that property (including the accepted placeholder exceptions).
+
+    Args:
+        json_schema (dict): Loaded JSON schema as a dictionary
+        format_checker (FormatChecker, optional): Checker used for format keywords,
+        same as in the jsonschema validator. Formats are not checked if None.
+
+    Returns:
+        property_checks (dict): {property: is_invalid(value)} for compiled properties
+    """
+    schema_hash = get_schema_hash(json_schema)
+    if schema_hash not in _compiled_property_factories:
+        generator = CodeGenerator(json_schema)
+        source = generator.generate_properties()
+        _compiled_property_factories[schema_hash] = compile_factory(
+            generator, source, "make_property_checks", schema_hash
+        )
+    make_property_checks = _compiled_property_factories[schema_hash]
+    if format_checker is None:
+        return make_property_checks(lambda instance, fmt: True)
+    return make_property_checks(format_checker.conforms)
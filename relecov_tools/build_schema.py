@@ -14,6 +14,7 @@ import relecov_tools.assets.schema_utils.jsonschema_draft
 import relecov_tools.assets.schema_utils.metadatalab_template
 from relecov_tools.config_json import ConfigJson
 from relecov_tools.base_module import BaseModule
+from relecov_tools.lookup_store import LookupStore
 from datetime import datetime
 from openpyxl.worksheet.datavalidation import DataValidation
 
@@ -228,13 +229,7 @@ class BuildSchema(BaseModule):
         `collecting_institution`. We intentionally reuse that same source for
         collecting/submitting/sequencing to keep the three schema enums aligned.
         """
-        json_path = os.path.join(
-            os.path.dirname(__file__),
-            "conf",
-            "laboratory_address.json",
-        )
-        with open(json_path, encoding="utf-8") as fh:
-            lab_data = json.load(fh)
+        lab_data = LookupStore.from_conf("laboratory_address.json")
 
         fields = [
             "collecting_institution",
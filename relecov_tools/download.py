@@ -283,7 +283,8 @@ class Download(BaseModule):
         samples_to_delete = []
         lab_code = local_folder.split("/")[-2]
         # TODO: Move these prefixes to configuration.json
-        new_meta_file = self.tag_filename("lab_metadata_" + lab_code + ".xlsx")
+        meta_extension = os.path.splitext(metadata_file)[1].lower()
+        new_meta_file = self.tag_filename("lab_metadata_" + lab_code + meta_extension)
         sample_data_file = self.tag_filename("samples_data_" + lab_code + ".json")
         sample_data_path = os.path.join(local_folder, sample_data_file)
         os.rename(metadata_file, os.path.join(local_folder, new_meta_file))
@@ -367,24 +368,63 @@ class Download(BaseModule):
 
     def read_metadata_file(self, meta_f_path, return_data=True):
         """Read Excel file, check if the header matches with the one defined in config.
+        Flat csv/tsv/parquet metadata files are read through their columnar reader.
 
         Args:
-            meta_f_path (str): Path to the Excel file.
+            meta_f_path (str): Path to the Excel/csv/tsv/parquet file.
 
         Raises:
             MetadataError: If the header in the Excel is different from config.
 
         Returns:
-            ws_metadata_lab: worksheet (openpyxl or simulated from pandas)
+            ws_metadata_lab: worksheet (openpyxl or list of rows from pandas)
             metadata_header: column names of the header
             header_row: row where the header is located in the sheet (1-based)
         """
 
+        def check_metadata_header(metadata_header):
+            if meta_column_list != metadata_header[1:]:
+                diffs = [
+                    x
+                    for x in set(metadata_header[1:] + meta_column_list)
+                    if x not in meta_column_list or x not in metadata_header
+                ]
+                self.log.error(
+                    f"Config field metadata_lab_heading is different from metadata file header for {self.current_folder}"
+                )
+                stderr.print(
+                    f"[red]Header in metadata file is different from config file for {self.current_folder}, aborting"
+                )
+                stderr.print("[red]Differences: ", diffs)
+                raise MetadataError(f"Metadata header different from config: {diffs}")
+            return
+
         warnings.simplefilter(action="ignore", category=UserWarning)
         header_flag = self.metadata_processing.get("header_flag")
         sheet_name = self.metadata_processing.get("excel_sheet")
         meta_column_list = self.metadata_lab_heading
 
+        if relecov_tools.utils.is_metadata_table(meta_f_path):
+            stderr.print(f"Reading metadata file for {self.current_folder}")
+            try:
+                meta_df, header_row = relecov_tools.utils.read_metadata_table_df(
+                    meta_f_path, header_flag
+                )
+            except KeyError:
+                error_text = "Header could not be found for metadata file %s"
+                raise MetadataError(str(error_text % os.path.basename(meta_f_path)))
+            except (ImportError, ParserError, EmptyDataError) as e:
+                raise MetadataError(
+                    f"Failed to read metadata file {os.path.basename(meta_f_path)}: {e}"
+                )
+            metadata_header = list(meta_df.columns)
+            check_metadata_header(metadata_header)
+            if return_data:
+                meta_df = meta_df.astype(object).where(meta_df.notna(), None)
+                return meta_df.values.tolist(), metadata_header, header_row
+            else:
+                return True
+
         try:
             stderr.print(f"Reading metadata file for {self.current_folder}")
             wb_file = openpyxl_load_workbook(meta_f_path, data_only=True)
@@ -404,20 +444,7 @@ class Download(BaseModule):
             metadata_header = [
                 x.value for x in ws_metadata_lab[header_row] if x.value is not None
             ]
-            if meta_column_list != metadata_header[1:]:
-                diffs = [
-                    x
-                    for x in set(metadata_header[1:] + meta_column_list)
-                    if x not in meta_column_list or x not in metadata_header
-                ]
-                self.log.error(
-                    f"Config field metadata_lab_heading is different from .xlsx header for {self.current_folder}"
-                )
-                stderr.print(
-                    f"[red]Header in metadata file is different from config file for {self.current_folder}, aborting"
-                )
-                stderr.print("[red]Differences: ", diffs)
-                raise MetadataError(f"Metadata header different from config: {diffs}")
+            check_metadata_header(metadata_header)
             if return_data:
                 return ws_metadata_lab, metadata_header, header_row
             else:
@@ -444,23 +471,7 @@ class Download(BaseModule):
                 metadata_header = [
                     str(h).strip() for h in df.iloc[header_row] if pd.notna(h)
                 ]
-
-                if meta_column_list != metadata_header[1:]:
-                    diffs = [
-                        x
-                        for x in set(metadata_header[1:] + meta_column_list)
-                        if x not in meta_column_list or x not in metadata_header
-                    ]
-                    self.log.error(
-                        f"Config field metadata_lab_heading is different from .xlsx header for {self.current_folder}"
-                    )
-                    stderr.print(
-                        f"[red]Header in metadata file is different from config file for {self.current_folder}, aborting"
-                    )
-                    stderr.print("[red]Differences: ", diffs)
-                    raise MetadataError(
-                        f"Metadata header different from config: {diffs}"
-                    )
+                check_metadata_header(metadata_header)
 
                 if return_data:
                     ws_metadata_lab = df.iloc[header_row + 1 :].values.tolist()
@@ -519,7 +530,11 @@ class Download(BaseModule):
         index_fastq_r1 = meta_header.index("Sequence file R1")
         index_fastq_r2 = meta_header.index("Sequence file R2")
         counter = header_row
-        for row in islice(metadata_ws.values, header_row, metadata_ws.max_row):
+        if isinstance(metadata_ws, list):
+            metadata_rows = metadata_ws
+        else:
+            metadata_rows = islice(metadata_ws.values, header_row, metadata_ws.max_row)
+        for row in metadata_rows:
             counter += 1
             sample_id = row[index_sampleID]
             if sample_id:
@@ -625,7 +640,9 @@ class Download(BaseModule):
         ]
 
         meta_files = [
-            f for f in remote_files_list if f.endswith(".xlsx") and f not in lock_files
+            f
+            for f in remote_files_list
+            if relecov_tools.utils.is_metadata_file(f) and f not in lock_files
         ]
         # Check if metadata file is locked by another program
         if lock_files and not meta_files:
@@ -964,8 +981,7 @@ class Download(BaseModule):
             self.current_folder = folder.split("/")[0]
             self.log.info("Merging md5sum files from %s...", self.current_folder)
             stderr.print(f"[blue]Merging md5sum files from {self.current_folder}...")
-            md5flags = [".md5", "md5sum", "md5checksum"]
-            md5sumlist = [fi for fi in files if any(flag in fi for flag in md5flags)]
+            md5sumlist = [fi for fi in files if relecov_tools.utils.is_md5_file(fi)]
             if not md5sumlist:
                 error_text = "No md5sum could be found in remote folder %s"
                 stderr.print(f"[yellow]{error_text % folder}")
@@ -1013,6 +1029,7 @@ class Download(BaseModule):
         """Read an excel file, return a dict with a dataframe for each sheet in it.
         Process the given sheet with metadata, removing all rows until header is found.
         Also fill the given unique_id col with any other alternative ID cols if possible.
+        csv/tsv/parquet files are returned as a single metadata_sheet dataframe.
 
         Args:
             excel_file (str): Path to the local excel file with metadata
@@ -1051,6 +1068,15 @@ class Download(BaseModule):
                         self.include_error(entry=errtxt, sample=new_id)
             return meta_df
 
+        if relecov_tools.utils.is_metadata_table(excel_file):
+            # Flat metadata files only contain the metadata sheet
+            try:
+                meta_df, _ = relecov_tools.utils.read_metadata_table_df(
+                    excel_file, header_flag
+                )
+            except ImportError as e:
+                raise MetadataError(str(e))
+            return {metadata_sheet: filldf_unique_id_col(meta_df)}
         # Get every sheet from the first excel file
         excel_df = pd.read_excel(excel_file, dtype=str, sheet_name=None)
         meta_df = excel_df[metadata_sheet]
@@ -1135,7 +1161,10 @@ class Download(BaseModule):
             if not downloaded_metadata:
                 continue
             # Create a temporal name to avoid duplicated filenames
-            meta_filename = "_".join([folder.split("/")[-1], "metadata_temp.xlsx"])
+            meta_extension = os.path.splitext(downloaded_metadata)[1].lower()
+            meta_filename = "_".join(
+                [folder.split("/")[-1], "metadata_temp" + meta_extension]
+            )
             local_meta = os.path.join(output_dir, meta_filename)
             os.rename(downloaded_metadata, local_meta)
 
@@ -1148,8 +1177,12 @@ class Download(BaseModule):
                 tmp_folder_parent = main_folder
             temporal_foldername = f"{date_and_time}_tmp_processing"
             temp_folder = os.path.join(tmp_folder_parent, temporal_foldername)
-            # Get every file except the excel ones as they are going to be merged
-            filelist = [fi for fi in target_folders[folder] if not fi.endswith(".xlsx")]
+            # Get every file except the metadata ones as they are going to be merged
+            filelist = [
+                fi
+                for fi in target_folders[folder]
+                if not relecov_tools.utils.is_metadata_file(fi)
+            ]
             if not folders_with_metadata.get(temp_folder):
                 log_text = "Trying to merge metadata from %s in %s"
                 self.log.info(log_text % (main_folder, temp_folder))
@@ -9,6 +9,7 @@ import os
 import relecov_tools.utils
 from Bio import SeqIO
 from relecov_tools.config_json import ConfigJson
+from relecov_tools.lookup_store import LookupStore
 
 # import site
 
@@ -158,25 +159,28 @@ class GisaidUpload:
             if field not in col_df:
                 df_data.insert(4, field, "")
 
-        config_lab_json = ConfigJson(extra_config=True)
-        lab_json_conf = config_lab_json.get_topic_data(
+        lab_json_conf = config_json.get_topic_data(
             "read_lab_metadata", "laboratory_data"
         )
-        lab_json_file = os.path.join(
-            os.path.dirname(os.path.realpath(__file__)), "conf", lab_json_conf["file"]
+        lab_store = LookupStore.from_conf(
+            lab_json_conf["file"], index_fields=["collecting_institution"]
         )
-        lab_json = relecov_tools.utils.read_json_file(lab_json_file)
-        for lab in lab_json:
-            for i in range(len(df_data)):
-                if lab["collecting_institution"] == df_data["covv_orig_lab"][i]:
-                    df_data["covv_location"][i] = " / ".join(
-                        [
-                            "Europe",
-                            lab["geo_loc_country"],
-                            lab["geo_loc_state"],
-                            lab["geo_loc_city"],
-                        ]
-                    )
+        # Single pass over the samples using the institution name index
+        orig_labs = df_data[["covv_orig_lab"]].to_dict(orient="records")
+        lab_matches = lab_store.join(
+            orig_labs, "covv_orig_lab", store_field="collecting_institution"
+        )
+        for idx, lab in enumerate(lab_matches):
+            if lab is None:
+                continue
+            df_data.loc[idx, "covv_location"] = " / ".join(
+                [
+                    "Europe",
+                    lab["geo_loc_country"],
+                    lab["geo_loc_state"],
+                    lab["geo_loc_city"],
+                ]
+            )
 
         df_data.replace("not provided", "unknown", inplace=True)
         df_data_comp = self.complete_mand_fields(df_data)
@@ -73,6 +73,23 @@ class LogSum:
         )
         return
 
+    def add_sample_errors(self, entry, samples, key=None, path=None):
+        """Add the same error entry to each one of the given samples, logging it once
+
+        Args:
+            entry (str): Content message of the error.
+            samples (list(str)): Name of the samples which failed with this error.
+            key (str, optional): Name of the key holding the logs. Defaults to None.
+        """
+        if self.lab_code:
+            key = self.lab_code
+        log.error(f"{entry} ({len(samples)} samples)")
+        for sample in samples:
+            self.update_summary(
+                log_type="errors", key=key, entry=entry, sample=sample, path=path
+            )
+        return
+
     def add_warning(self, entry, key=None, sample=None, path=None):
         """Run update_summary() with log_type as warnings"""
         if self.lab_code:
@@ -83,6 +100,22 @@ class LogSum:
         )
         return
 
+    def add_stats(self, stats, key=None):
+        """Include a dictionary of process statistics (e.g. reused/processed counts)
+        in the logs under the "stats" field of the given key
+
+        Args:
+            stats (dict): Statistics to be added. Existing values are updated.
+            key (str, optional): Name of the key holding the logs. Defaults to None.
+        """
+        if self.lab_code:
+            key = self.lab_code
+        log.info(f"Process stats: {stats}")
+        self.feed_key(key=key)
+        current_key = str(key).replace("./", "")
+        self.logs[current_key].setdefault("stats", {}).update(stats)
+        return
+
     def update_summary(self, log_type, key, entry, sample=None, path=None):
         """Create a dictionary with a defined structure for each new key. Add the
         entry to the dictionary if it already exists. Add it to samples if its a sample
@@ -94,12 +127,11 @@ class LogSum:
             sample (str, optional): Name of a sample within key if the log is for it
             one sample instead of the whole key/folder. Defaults to None.
         """
-        feed_dict = OrderedDict({"valid": True, "errors": [], "warnings": []})
         # Removing strange characters
         current_key = str(key).replace("./", "")
         entry, sample = (str(entry), str(sample))
-        if current_key not in self.logs.keys():
-            self.logs[current_key] = copy.deepcopy(feed_dict)
+        if current_key not in self.logs:
+            self.logs[current_key] = self.new_log_entry()
             self.logs[current_key]["samples"] = OrderedDict()
         if self.path:
             self.logs[current_key].update({"path": str(self.path)})
@@ -107,16 +139,21 @@ class LogSum:
             self.logs[current_key].update({"path": str(path)})
         if log_type is None:
             if sample != "None" and sample not in self.logs[current_key]["samples"]:
-                self.logs[current_key]["samples"][sample] = copy.deepcopy(feed_dict)
+                self.logs[current_key]["samples"][sample] = self.new_log_entry()
             return
         if sample == "None":
             self.logs[current_key][log_type].append(entry)
         else:
-            if sample not in self.logs[current_key]["samples"].keys():
-                self.logs[current_key]["samples"][sample] = copy.deepcopy(feed_dict)
+            if sample not in self.logs[current_key]["samples"]:
+                self.logs[current_key]["samples"][sample] = self.new_log_entry()
             self.logs[current_key]["samples"][sample][log_type].append(entry)
         return
 
+    @staticmethod
+    def new_log_entry():
+        """Empty record for a new key or sample in the logs"""
+        return OrderedDict({"valid": True, "errors": [], "warnings": []})
+
     def prepare_final_logs(self, logs):
         """Sets valid field to false if any errors were found for each key/sample
 
@@ -163,6 +200,9 @@ class LogSum:
                         merged_logs[key][field] = list(
                             dict.fromkeys(merged_logs[key][field])
                         )
+                    if values.get("stats"):
+                        merged_logs[key].setdefault("stats", {})
+                        merged_logs[key]["stats"].update(values["stats"])
                     merged_logs[key].setdefault("samples", {})
                     for sample, vals in new_logs[key].get("samples", {}).items():
                         if sample not in merged_logs[key]["samples"].keys():
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+import hashlib
+import logging
+import os
+import pickle
+
+import relecov_tools.utils
+from relecov_tools.config_json import ConfigJson
+
+log = logging.getLogger(__name__)
+
+
+class LookupStore:
+    """Indexed and cached view of a JSON lookup file such as laboratory_address.json
+
+    The JSON file is expected to be a dictionary of records (dicts) keyed by a
+    primary code (e.g. the CCN of each institution). Secondary indexes can be
+    requested on any record field (e.g. collecting_institution) to allow O(1)
+    lookups by value instead of scanning every record.
+
+    The parsed data and its indexes are pickled under ~/.relecov_tools/cache the
+    first time a file is loaded, and reused as long as the source JSON is not
+    modified. Stores are also memoized per process, so every module asking for
+    the same file during a run shares a single instance.
+    """
+
+    _cache_dir = os.path.join(os.path.dirname(ConfigJson._extra_config_path), "cache")
+    _stores = {}
+
+    def __init__(self, data: dict, source: str | None = None):
+        if not isinstance(data, dict):
+            raise TypeError(f"Lookup file {source} must contain a dictionary")
+        self.source = source
+        self.data = data
+        self.indexes = {}
+        self.signature = None
+
+    @staticmethod
+    def normalize(value) -> str:
+        """Normalise a value so it can be used as index key"""
+        return str(value).strip().lower()
+
+    @classmethod
+    def load(cls, json_file: str, index_fields: list | tuple = ()):
+        """Return the store for the given JSON file, building it if needed
+
+        Args:
+            json_file (str): Path to the JSON lookup file.
+            index_fields (list, optional): Record fields to index. Defaults to ().
+
+        Returns:
+            store (LookupStore): Indexed store with the content of json_file
+        """
+        json_file = os.path.realpath(json_file)
+        stat = os.stat(json_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        store = cls._stores.get(json_file)
+        if store is None or store.signature != signature:
+            store = cls._load_pickle(json_file, signature)
+            if store is None:
+                store = cls(relecov_tools.utils.read_json_file(json_file), json_file)
+                store.signature = signature
+                store.build_indexes(index_fields)
+                store._dump_pickle()
+            cls._stores[json_file] = store
+        missing_fields = [f for f in index_fields if f not in store.indexes]
+        if missing_fields:
+            store.build_indexes(missing_fields)
+            store._dump_pickle()
+        return store
+
+    @classmethod
+    def from_conf(cls, file_name: str, index_fields: list | tuple = ()):
+        """Load a lookup file located in relecov_tools/conf folder"""
+        conf_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), "conf", file_name
+        )
+        return cls.load(conf_path, index_fields=index_fields)
+
+    @classmethod
+    def _pickle_path(cls, json_file: str) -> str:
+        name_hash = hashlib.md5(json_file.encode()).hexdigest()[:12]
+        base_name = os.path.splitext(os.path.basename(json_file))[0]
+        return os.path.join(cls._cache_dir, f"{base_name}_{name_hash}.pickle")
+
+    @classmethod
+    def _load_pickle(cls, json_file: str, signature: tuple):
+        """Load a previously pickled store if it matches the JSON file signature"""
+        pickle_path = cls._pickle_path(json_file)
+        try:
+            with open(pickle_path, "rb") as fh:
+                store = pickle.load(fh)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if not isinstance(store, cls) or getattr(store, "signature", None) != signature:
+            return None
+        log.debug(f"Loaded cached lookup store for {json_file}")
+        return store
+
+    def _dump_pickle(self):
+        """Save the store in the cache folder. Failures are not fatal"""
+        pickle_path = self._pickle_path(self.source)
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            tmp_path = f"{pickle_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as fh:
+                pickle.dump(self, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, pickle_path)
+        except OSError as e:
+            log.debug(f"Could not cache lookup store for {self.source}: {e}")
+
+    def build_indexes(self, index_fields: list | tuple):
+        """Create a value -> [primary keys] index for each given field"""
+        for field in index_fields:
+            index = {}
+            for key, record in self.data.items():
+                if not isinstance(record, dict) or record.get(field) in (None, ""):
+                    continue
+                index.setdefault(self.normalize(record[field]), []).append(key)
+            self.indexes[field] = index
+        return
+
+    def __contains__(self, key) -> bool:
+        return key in self.data
+
+    def __getitem__(self, key) -> dict:
+        return self.data[key]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def get(self, key, default=None):
+        """Get a record by its primary key"""
+        return self.data.get(key, default)
+
+    def items(self):
+        return self.data.items()
+
+    def get_by(self, field: str, value) -> list[dict]:
+        """Get every record whose field matches the given value"""
+        if field not in self.indexes:
+            self.build_indexes([field])
+        keys = self.indexes[field].get(self.normalize(value), [])
+        return [self.data[key] for key in keys]
+
+    def first_by(self, field: str, value):
+        """Get the first record whose field matches the given value, or None"""
+        records = self.get_by(field, value)
+        return records[0] if records else None
+
+    def join(self, samples: list[dict], sample_field: str, store_field=None):
+        """Match a list of samples to the store in a single pass
+
+        Args:
+            samples (list(dict)): Samples to be matched.
+            sample_field (str): Field in each sample containing the lookup value.
+            store_field (str, optional): Indexed field of the store used to match
+            the value. Primary keys are used if None. Defaults to None.
+
+        Returns:
+            matches (list): Record for each sample in the same order, None if no
+            match was found for that sample.
+        """
+        matches = []
+        for sample in samples:
+            value = sample.get(sample_field)
+            if value in (None, ""):
+                matches.append(None)
+            elif store_field is None:
+                matches.append(self.data.get(str(value).strip()))
+            else:
+                matches.append(self.first_by(store_field, value))
+        return matches
@@ -14,6 +14,7 @@ import relecov_tools.utils
 from relecov_tools.base_module import BaseModule
 from relecov_tools.config_json import ConfigJson
 from relecov_tools.log_summary import LogSum
+from relecov_tools.lookup_store import LookupStore
 
 log = logging.getLogger(__name__)
 
@@ -46,7 +47,7 @@ class Mail:
         institutions_file = self.config.get(
             "institutions_guide_path", "institutions_guide.json"
         )
-        institutions_data = relecov_tools.utils.read_json_file(institutions_file)
+        institutions_data = LookupStore.load(institutions_file)
 
         if institutions_data and institution_code in institutions_data:
             return institutions_data[institution_code]
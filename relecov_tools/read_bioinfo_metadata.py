@@ -2,7 +2,8 @@
 import importlib
 import os
 import re
-import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
@@ -13,6 +14,8 @@ from rich.prompt import Prompt
 
 import relecov_tools.utils
 import relecov_tools.validate
+import relecov_tools.validation_cache
+from relecov_tools.scan_index import ScanIndex
 from relecov_tools.base_module import BaseModule
 from relecov_tools.config_json import ConfigJson
 
@@ -23,6 +26,17 @@ stderr = rich.console.Console(
     force_terminal=relecov_tools.utils.rich_force_colors(),
 )
 
+# Folders that never hold analysis results, not scanned in input_folder
+SKIPPED_SCAN_DIRS = {"work", ".nextflow", ".git", "__pycache__"}
+# Max number of subfolders of input_folder walked at the same time
+SCAN_THREADS = 8
+# Max number of batch tables written at the same time when splitting by batch
+SPLIT_THREADS = 4
+# Max number of config key files parsed at the same time
+PARSE_THREADS = 4
+# Max number of result files extracted to analysis_results at the same time
+EXTRACT_THREADS = 8
+
 
 class BioinfoReportLog:
     def __init__(self, log_report=None):
@@ -81,6 +95,8 @@ class BioinfoMetadata(BaseModule):
         software_name: str | None = None,
         update: bool = False,
         soft_validation: bool = False,
+        force_rescan: bool = False,
+        extract_mode: str = "copy",
     ):
 
         super().__init__(output_dir=output_dir, called_module=__name__)
@@ -88,13 +104,29 @@ class BioinfoMetadata(BaseModule):
         # Init params
         self.update = update
         self.soft_validation = soft_validation
+        self.force_rescan = force_rescan
+        self.extract_mode = extract_mode or "copy"
+        self.scan_index = None
 
         # Init logs
         self.log_report = BioinfoReportLog()
         self.logsum = self.parent_log_summary(output_dir=output_dir)
+        # Log entries of worker threads are kept here and added in a fixed order
+        self._thread_logs = threading.local()
+        if self.extract_mode not in relecov_tools.utils.EXTRACT_MODES:
+            self.update_all_logs(
+                self.__init__.__name__,
+                "error",
+                f"Invalid extract mode '{self.extract_mode}'. Use one of {relecov_tools.utils.EXTRACT_MODES}",
+            )
+            self.log_report.print_log_report(self.__init__.__name__, ["error"])
+            raise ValueError(f"Invalid extract mode '{self.extract_mode}'")
 
         # Init config
         self.config_json = ConfigJson(extra_config=True)
+        self.not_provided_field = self.config_json.get_topic_data(
+            "generic", "not_provided_field"
+        )
 
         # Init attributes
         self._init_input_folder(input_folder)
@@ -283,6 +315,10 @@ class BioinfoMetadata(BaseModule):
         Returns:
             report (dict): The updated log report.
         """
+        buffered_logs = getattr(self._thread_logs, "entries", None)
+        if buffered_logs is not None:
+            buffered_logs.append((method_name, status, message))
+            return self.log_report.report
         report = self.log_report.update_log_report(method_name, status, message)
         if status == "error":
             self.logsum.add_error(key=method_name, entry=message)
@@ -305,6 +341,7 @@ class BioinfoMetadata(BaseModule):
         # Get the total number of files and scanned files in all folders in self.input_folder
         total_files, scanned_files_per_folder = self._walk_input_folder()
         files_found = self._find_matching_files(method_name, scanned_files_per_folder)
+        self.scan_index.save()
         # search for files matching the patterns defined in the software configuration
         if files_found:
             # If files are found, update the log report and return the files_found dictionary
@@ -328,50 +365,142 @@ class BioinfoMetadata(BaseModule):
             raise ValueError(err_msg)
 
     def _walk_input_folder(self) -> tuple[int, list[tuple[str, list[str]]]]:
-        """Walk through the input folder and collect all files.
+        """Walk through the input folder and collect all files. Folders are listed
+        with os.scandir in the same order as os.walk, and the subfolders of
+        input_folder are walked in parallel as they can be large on shared filesystems.
+        Folders not modified since the previous scan are taken from the scan index
+        instead of being listed again, unless force_rescan is set.
+
         Returns:
+            total_files (int): Number of files found
+            scanned_files_per_folder (list(tuple)): (folder_path, [file names])
+            for each scanned folder.
         """
-        total_files = 0
-        scanned_files_per_folder = []
-        for root, dirs, files in os.walk(self.input_folder, topdown=True):
-            # Skipping nextflow's work junk directory
-            # dirs[:] is used to modify the list of directories in place
-            dirs[:] = [d for d in dirs if d != "work"]
-            total_files += len(files)
-            scanned_files_per_folder.append((root, files))
+        file_patterns = {
+            topic_key: topic_scope.get("fn")
+            for topic_key, topic_scope in self.software_config.items()
+        }
+        self.scan_index = ScanIndex(
+            self.input_folder, file_patterns, force_rescan=self.force_rescan
+        )
+        root_files, root_dirs = self.scan_index.list_folder(
+            self.input_folder, self._list_folder
+        )
+        scanned_files_per_folder = [(self.input_folder, root_files)]
+        with ThreadPoolExecutor(max_workers=SCAN_THREADS) as executor:
+            for subtree in executor.map(self._walk_subtree, root_dirs):
+                scanned_files_per_folder.extend(subtree)
+        total_files = sum(len(files) for _, files in scanned_files_per_folder)
         return total_files, scanned_files_per_folder
 
-    def _find_matching_files(
-        self, method_name: str, scanned_files_per_folder: list[tuple[str, list[str]]]
-    ) -> dict[str, list[str]]:
-        """For each topic in the software configuration, search for matching files.
+    @staticmethod
+    def _list_folder(folder: str) -> tuple[list[str], list[str]]:
+        """List the files of a folder and the subfolders that should be scanned.
+        Symlinks to folders are not followed, same as os.walk.
 
         Args:
-        scanned_files_per_folder (list[tuple[str, list[str]]]): A list of tuples containing the root path and a list of files in that path.
-        method_name (str): The name of the method being logged.
+            folder (str): Path to the folder
 
         Returns:
-        files_found (dict): A dictionary containing file paths found based on the definitions provided in the bioinformatic JSON file within the software scope (self.software_config).
+            file_names (list(str)): Names of the files in the folder
+            subfolders (list(str)): Names of the subfolders to be scanned
         """
-        files_found = {}
-        # Iterate over each topic in the software configuration
+        file_names, subfolders = [], []
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            return file_names, subfolders
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                file_names.append(entry.name)
+            elif entry.name not in SKIPPED_SCAN_DIRS and not entry.is_symlink():
+                subfolders.append(entry.name)
+        return file_names, subfolders
+
+    def _walk_subtree(self, top: str) -> list[tuple[str, list[str]]]:
+        """Walk a folder tree top-down, returning (folder, [file names]) for each one"""
+        scanned_files_per_folder = []
+        pending = [top]
+        while pending:
+            folder = pending.pop()
+            files, subfolders = self.scan_index.list_folder(folder, self._list_folder)
+            scanned_files_per_folder.append((folder, files))
+            # Reversed so subfolders are walked in the same order as os.walk
+            pending.extend(reversed(subfolders))
+        return scanned_files_per_folder
+
+    def _build_file_matcher(self, method_name: str):
+        """Compile the file pattern (fn) of each topic in the software configuration.
+
+        Args:
+            method_name (str): The name of the method being logged.
+
+        Returns:
+            topic_patterns (list(tuple)): (topic_key, compiled pattern) for each topic
+            any_pattern (re.Pattern): Combination of all the patterns, used to discard
+            files not matching any topic at once. None if they cannot be combined.
+        """
+        topic_patterns = []
         for topic_key, topic_scope in self.software_config.items():
             # if topic has not fn (file pattern) defined, skip it
             if not self._topic_has_file_pattern(topic_key, topic_scope, method_name):
                 continue
+            topic_patterns.append((topic_key, re.compile(topic_scope["fn"])))
+        patterns = [pattern.pattern for _, pattern in topic_patterns]
+        # Backreferences would point to other groups once patterns are combined
+        if not patterns or any(re.search(r"\\\d|\(\?P=", x) for x in patterns):
+            return topic_patterns, None
+        try:
+            any_pattern = re.compile("|".join(f"(?:{x})" for x in patterns))
+        except re.error:
+            any_pattern = None
+        return topic_patterns, any_pattern
 
-            # get file pattern from topic scope now that we know it has a valid pattern
-            file_pattern = topic_scope["fn"]
+    def _find_matching_files(
+        self, method_name: str, scanned_files_per_folder: list[tuple[str, list[str]]]
+    ) -> dict[str, list[str]]:
+        """Classify each scanned file in a single pass, finding the topics of the
+        software configuration whose file pattern matches its path.
 
-            # Search for files matching the pattern in the scanned files
-            for root_path, file_list in scanned_files_per_folder:
-                if matching_files := self._get_matching_files_for_pattern(
-                    file_list, root_path, file_pattern
-                ):
-                    # If matching files are found, add them to the files_found dictionary
-                    # set default to an empty list if the topic_key is not already present
-                    files_found.setdefault(topic_key, []).extend(matching_files)
+        Args:
+        scanned_files_per_folder (list[tuple[str, list[str]]]): A list of tuples containing the root path and a list of files in that path.
+        method_name (str): The name of the method being logged.
 
+        Returns:
+        files_found (dict): A dictionary containing file paths found based on the definitions provided in the bioinformatic JSON file within the software scope (self.software_config).
+        """
+        topic_patterns, any_pattern = self._build_file_matcher(method_name)
+        matches = {topic_key: [] for topic_key, _ in topic_patterns}
+        for root_path, file_list in scanned_files_per_folder:
+            # Reuse the classification of the previous scan if the folder is unchanged
+            folder_topics = self.scan_index.get_topics(root_path)
+            if folder_topics is None:
+                folder_topics = {}
+                for file_name in file_list:
+                    file_path = os.path.join(root_path, file_name)
+                    if any_pattern is not None and not any_pattern.search(file_path):
+                        continue
+                    file_topics = [
+                        topic_key
+                        for topic_key, pattern in topic_patterns
+                        if pattern.search(file_path)
+                    ]
+                    if file_topics:
+                        folder_topics[file_name] = file_topics
+                self.scan_index.set_topics(root_path, folder_topics)
+            for file_name in file_list:
+                for topic_key in folder_topics.get(file_name, ()):
+                    matches[topic_key].append(os.path.join(root_path, file_name))
+        # Keep the order of the topics in the software configuration
+        files_found = {
+            topic_key: file_paths
+            for topic_key, file_paths in matches.items()
+            if file_paths
+        }
         return files_found
 
     def _topic_has_file_pattern(
@@ -402,27 +531,6 @@ class BioinfoMetadata(BaseModule):
             return False
         return True
 
-    def _get_matching_files_for_pattern(
-        self, file_list: list[str], root_path: str, file_pattern: str
-    ) -> list[str]:
-        """Return a list of files in file_list under root_path that match file_pattern.
-        Args:
-            file_list (list[str]): A list of file names to search for.
-            root_path (str): The root path where the files are located.
-            file_pattern (str): The regex pattern to match the files.
-        Returns:
-            matching_files (list[str]): A list of file paths that match the file_pattern.
-        """
-        matching_files = []
-        # Iterate over each file in the file_list
-        for file_name in file_list:
-            file_path = os.path.join(root_path, file_name)
-            # Check if the file matches the pattern
-            # update matching_files with the file matching the pattern
-            if re.search(file_pattern, file_path):
-                matching_files.append(file_path)
-        return matching_files
-
     def mapping_over_table(
         self,
         j_data: list[dict],
@@ -491,9 +599,7 @@ class BioinfoMetadata(BaseModule):
             else:
                 errors.append(sample_name)
                 for field in mapping_fields:
-                    row[field] = self.config_json.get_topic_data(
-                        "generic", "not_provided_field"
-                    )
+                    row[field] = self.not_provided_field
 
         # work around when map_data comes from several per-sample tables/files instead of single table
         # get the dirname where the tables/files are or basename of the table_name
@@ -577,9 +683,7 @@ class BioinfoMetadata(BaseModule):
                 raw_val = map_data[sample_name][table_field]
             except KeyError as e:
                 field_errors[sample_name] = {schema_field: str(e)}
-                row[schema_field] = self.config_json.get_topic_data(
-                    "generic", "not_provided_field"
-                )
+                row[schema_field] = self.not_provided_field
             # Replace NA values if needed
             raw_val = self.replace_na_value_if_needed(schema_field, raw_val)
             # get the expected type from the JSON schema
@@ -630,9 +734,7 @@ class BioinfoMetadata(BaseModule):
                     field_valid[software_key] = {json_field: field}
                 except KeyError as e:
                     field_errors[software_key] = {json_field: str(e)}
-                    row[json_field] = self.config_json.get_topic_data(
-                        "generic", "not_provided_field"
-                    )
+                    row[json_field] = self.not_provided_field
 
     def validate_sample_names(self) -> None:
         """Validate that the sequencing_sample_id from the JSON input is present in the samples_id.txt.
@@ -728,63 +830,122 @@ class BioinfoMetadata(BaseModule):
         extra_json_data: list[dict] = []
         j_data_mapped = j_data
 
-        # Iterate over each key in the software configuration
-        for key in self.software_config:
-            # skip workflow_summary and fixed_values keys that will be handled later
-            if key in ("workflow_summary", "fixed_values"):
-                continue
-
-            self.current_config_key = key
-            map_method_name = f"{method_name}:{self.software_name}.{key}"
+        # Parse the files of every config key concurrently, mapping is done afterwards
+        keys_to_parse = [
+            key
+            for key in self.software_config
+            if key not in ("workflow_summary", "fixed_values") and key in files_dict
+        ]
+        parse_failed = threading.Event()
+
+        def parse_key(key):
+            """Parse the files of a key unless a previous key already failed"""
+            if parse_failed.is_set():
+                return None, [], None
+            parsed = self._run_with_buffered_logs(
+                self._process_config_key,
+                key,
+                files_dict[key],
+                file_tag,
+                output_dir,
+                metadata=j_data,
+            )
+            if parsed[2] is not None:
+                parse_failed.set()
+            return parsed
 
-            if key not in files_dict:
-                self.update_all_logs(
-                    method_name,
-                    "warning",
-                    f"No file path found for '{self.software_name}.{key}'",
-                )
-                continue
+        executor = ThreadPoolExecutor(max_workers=PARSE_THREADS)
+        parsed_keys = {key: executor.submit(parse_key, key) for key in keys_to_parse}
 
-            stderr.print(f"[blue]Start processing {self.software_name}.{key}")
-            self.log.info(f"Start processing {self.software_name}.{key}")
+        try:
+            # Iterate over each key in the software configuration
+            for key in self.software_config:
+                # skip workflow_summary and fixed_values keys that will be handled later
+                if key in ("workflow_summary", "fixed_values"):
+                    continue
 
-            # Process the config key to get data to map and extra data if any
-            data_to_map, extra_data = self._process_config_key(
-                key, files_dict[key], file_tag, output_dir, metadata=j_data
-            )
+                self.current_config_key = key
+                map_method_name = f"{method_name}:{self.software_name}.{key}"
 
-            if extra_data:
-                extra_json_data.append(extra_data)
+                if key not in files_dict:
+                    self.update_all_logs(
+                        method_name,
+                        "warning",
+                        f"No file path found for '{self.software_name}.{key}'",
+                    )
+                    continue
 
-            # get mapping fields from the software configuration
-            mapping_fields = self.software_config[key].get("content")
-            if not mapping_fields:
-                self.update_all_logs(
-                    map_method_name,
-                    "warning",
-                    f"No metadata found to perform mapping from '{self.software_name}.{key}' despite 'content' fields being defined.",
-                )
-                self.log_report.print_log_report(map_method_name, ["warning"])
-                continue
+                # Get data to map and extra data if any, logs are added in config order
+                parsed, key_logs, parse_error = parsed_keys[key].result()
+                for log_entry in key_logs:
+                    self.update_all_logs(*log_entry)
+                if parse_error is not None:
+                    error_methods = [log[0] for log in key_logs if log[1] == "error"]
+                    for error_method in dict.fromkeys(error_methods):
+                        self.log_report.print_log_report(error_method, ["error"])
+                    raise parse_error
+                data_to_map, extra_data = parsed
+
+                if extra_data:
+                    extra_json_data.append(extra_data)
+
+                # get mapping fields from the software configuration
+                mapping_fields = self.software_config[key].get("content")
+                if not mapping_fields:
+                    self.update_all_logs(
+                        map_method_name,
+                        "warning",
+                        f"No metadata found to perform mapping from '{self.software_name}.{key}' despite 'content' fields being defined.",
+                    )
+                    self.log_report.print_log_report(map_method_name, ["warning"])
+                    continue
 
-            # If data_to_map is not empty, perform mapping
-            if data_to_map:
-                j_data_mapped = self.mapping_over_table(
-                    j_data=j_data,
-                    map_data=data_to_map,
-                    mapping_fields=mapping_fields,
-                    table_name=files_dict[key],
-                )
-            else:
-                self.update_all_logs(
-                    method_name,
-                    "warning",
-                    f"No metadata found to perform standard mapping when processing '{self.software_name}.{key}'",
-                )
+                # If data_to_map is not empty, perform mapping
+                if data_to_map:
+                    j_data_mapped = self.mapping_over_table(
+                        j_data=j_data,
+                        map_data=data_to_map,
+                        mapping_fields=mapping_fields,
+                        table_name=files_dict[key],
+                    )
+                else:
+                    self.update_all_logs(
+                        method_name,
+                        "warning",
+                        f"No metadata found to perform standard mapping when processing '{self.software_name}.{key}'",
+                    )
+        finally:
+            # Keys not started yet are not parsed once a key failed
+            executor.shutdown(cancel_futures=True)
 
         self.log_report.print_log_report(method_name, ["valid", "warning"])
         return j_data_mapped, extra_json_data
 
+    def _run_with_buffered_logs(
+        self, func, *args, **kwargs
+    ) -> tuple[Any, list[tuple], BaseException | None]:
+        """
+        Runs func in a worker thread, keeping its log entries apart so they can
+        be added to the log report afterwards in a fixed order. Any exception,
+        including SystemExit from sys.exit(), is returned with the log entries
+        so the caller can add them before raising it again.
+
+        Args:
+            func (callable): Method to run.
+            *args, **kwargs: Arguments for func.
+
+        Returns:
+            tuple: (func result, log entries, raised exception)
+        """
+        self._thread_logs.entries = []
+        try:
+            result = func(*args, **kwargs)
+            return result, self._thread_logs.entries, None
+        except BaseException as e:
+            return None, self._thread_logs.entries, e
+        finally:
+            self._thread_logs.entries = None
+
     def _process_config_key(
         self,
         key: str,
@@ -806,12 +967,16 @@ class BioinfoMetadata(BaseModule):
         Returns:
             tuple: (data_to_map, extra_json_data)
         """
+        stderr.print(f"[blue]Start processing {self.software_name}.{key}")
+        self.log.info(f"Start processing {self.software_name}.{key}")
         config = self.software_config[key]
         file_name = config.get("fn")
         func_name = config.get("function")
         # If func_name is None, it means we will handle the file as a table with a default function
         if func_name is None:
-            data = self.extract_sample_metadata_from_table(file_path, file_name)
+            data = self.extract_sample_metadata_from_table(
+                file_path, file_name, config_key=key
+            )
         # If func_name is defined, we will process the file using the function defined in the config
         # and present in assets.pipeline_utils
         else:
@@ -831,7 +996,7 @@ class BioinfoMetadata(BaseModule):
         return data, None
 
     def extract_sample_metadata_from_table(
-        self, file_list: list, conf_tab_name: str
+        self, file_list: list, conf_tab_name: str, config_key: str | None = None
     ) -> dict:
         """Reads a tabular file in different formats and returns a dictionary containing
         the corresponding data for each sample.
@@ -839,38 +1004,40 @@ class BioinfoMetadata(BaseModule):
         Args:
             file_list (list): A list of file path/s to be processed.
             conf_tab_name (str): Name of the table in the defined config file.
+            config_key (str, optional): Config key of the table. Defaults to current_config_key.
 
         Returns:
             data (dict): A dictionary containing metadata as defined in handling_files.
         """
         method_name = f"{self.add_bioinfo_results_metadata.__name__}:{self.extract_sample_metadata_from_table.__name__}"
         # get file extension and sample index column position
-        file_ext = os.path.splitext(conf_tab_name)[1]
-        sample_idx_col_pos = self.get_sample_idx_col_pos(self.current_config_key)
+        # gzip compressed tables are read the same way as uncompressed ones
+        file_ext = os.path.splitext(conf_tab_name.removesuffix(".gz"))[1]
+        config_key = config_key or self.current_config_key
+        sample_idx_col_pos = self.get_sample_idx_col_pos(config_key)
         # allowed file extensions and their separators
         ext_dict = {".csv": ",", ".tsv": "\t", ".tab": "\t"}
 
-        mapping_fields = self.software_config[self.current_config_key].get("content")
+        mapping_fields = self.software_config[config_key].get("content")
 
         if not mapping_fields:
             return {}
 
-        if conf_tab_name.endswith(".gz"):
-            inner_ext = os.path.splitext(conf_tab_name.strip(".gz"))[1]
-            if inner_ext in ext_dict:
-                self.update_all_logs(
-                    method_name,
-                    "warning",
-                    f"Expected tabular file '{conf_tab_name}' is compressed and cannot be processed.",
-                )
+        if conf_tab_name.endswith(".gz") and file_ext not in ext_dict:
             return {}
 
+        # Only the columns used in mapping are read from the table
+        table_columns = [
+            schema_field if isinstance(table_field, dict) else table_field
+            for schema_field, table_field in mapping_fields.items()
+        ]
         if file_ext in ext_dict:
             try:
                 return relecov_tools.utils.read_csv_file_return_dict(
                     file_name=file_list[0],
                     sep=ext_dict[file_ext],
                     key_position=sample_idx_col_pos,
+                    columns=table_columns,
                 )
             except FileNotFoundError as e:
                 self.update_all_logs(
@@ -985,7 +1152,7 @@ class BioinfoMetadata(BaseModule):
             or (isinstance(raw_val, float) and np.isnan(raw_val))
         )
         if is_na and field not in required_fields:
-            return self.config_json.get_topic_data("generic", "not_provided_field")
+            return self.not_provided_field
         return raw_val
 
     def map_and_extract_bioinfo_paths(
@@ -1005,6 +1172,13 @@ class BioinfoMetadata(BaseModule):
         method_name = self.map_and_extract_bioinfo_paths.__name__
         sample_name_error = 0
         multiple_sample_files = self.get_multiple_sample_files()
+        sample_paths_index = self._build_sample_paths_index(
+            files_found_dict,
+            [self._get_sample_name(row) for row in j_data],
+            multiple_sample_files,
+        )
+        # Files to extract, extracted together once all paths are assigned
+        extract_jobs: list[tuple[str, str, str, str | None]] = []
 
         for row in j_data:
             # ger sample_name that will be a combination of sequencing_sample_id and unique_sample_id
@@ -1032,7 +1206,7 @@ class BioinfoMetadata(BaseModule):
             for key, files in files_found_dict.items():
                 # select matching file paths based on sample_name and key
                 file_paths = self._select_matching_paths(
-                    files, sample_name, key, multiple_sample_files
+                    files, sample_name, key, multiple_sample_files, sample_paths_index
                 )
                 # set matched file paths to appropriate field in json row
                 path_key = self._assign_file_paths_to_row(
@@ -1041,13 +1215,12 @@ class BioinfoMetadata(BaseModule):
 
                 # Extract files to analysis_results folder if configured
                 if self.software_config[key].get("extract"):
-                    self.extract_file(
-                        file=file_paths,
-                        dest_folder=base_cod_path,
-                        sample_name=sample_name,
-                        path_key=path_key,
+                    extract_jobs.extend(
+                        (filepath, base_cod_path, sample_name, path_key)
+                        for filepath in file_paths
                     )
 
+        self.extract_files(extract_jobs)
         self.log_report.print_log_report(method_name, ["warning"])
         if sample_name_error == 0:
             self.update_all_logs(method_name, "valid", "File paths added successfully.")
@@ -1055,8 +1228,84 @@ class BioinfoMetadata(BaseModule):
 
         return j_data
 
+    @staticmethod
+    def _find_sample_tokens(
+        file_path: str, sample_names: set[str], name_lengths: list[int]
+    ) -> set[str]:
+        """Find the sample names present in a file path as whole tokens, that is,
+        not preceded or followed by a letter or digit, so sample S1 does not match
+        S10.sorted.bam. Names found inside a longer sample name in the same position
+        (S1 in S1_1.consensus.fa) are ignored.
+
+        Args:
+            file_path (str): Path to the file.
+            sample_names (set[str]): Names of the samples in metadata.
+            name_lengths (list[int]): Different lengths of the sample names.
+
+        Returns:
+            set[str]: Sample names found in the path.
+        """
+        path_len = len(file_path)
+        found = []
+        for start in range(path_len):
+            if start and file_path[start - 1].isalnum():
+                continue
+            for length in name_lengths:
+                end = start + length
+                if end > path_len or (end < path_len and file_path[end].isalnum()):
+                    continue
+                if file_path[start:end] in sample_names:
+                    found.append((start, end))
+        return {
+            file_path[start:end]
+            for start, end in found
+            if not any(
+                x_start <= start and end <= x_end and (x_start, x_end) != (start, end)
+                for x_start, x_end in found
+            )
+        }
+
+    def _build_sample_paths_index(
+        self,
+        files_found_dict: dict,
+        sample_names: list[str | None],
+        multi_sample_keys: list[str],
+    ) -> dict[str, dict[str, list[str]]]:
+        """Build an index of the files found for each sample and config key, so
+        each path is only searched once for sample names.
+
+        Args:
+            files_found_dict (dict): Mapping of config keys to file paths found.
+            sample_names (list[str]): Names of the samples in metadata.
+            multi_sample_keys (list[str]): List of keys that allow multiple samples.
+
+        Returns:
+            dict: {config key: {sample name: [file paths]}}
+        """
+        sample_names = {name for name in sample_names if name}
+        name_lengths = sorted({len(name) for name in sample_names}, reverse=True)
+        samples_per_path = {}
+        sample_paths_index = {}
+        for key, files in files_found_dict.items():
+            if key in multi_sample_keys:
+                continue
+            key_index = sample_paths_index.setdefault(key, {})
+            for file_path in files:
+                if file_path not in samples_per_path:
+                    samples_per_path[file_path] = self._find_sample_tokens(
+                        file_path, sample_names, name_lengths
+                    )
+                for sample_name in samples_per_path[file_path]:
+                    key_index.setdefault(sample_name, []).append(file_path)
+        return sample_paths_index
+
     def _select_matching_paths(
-        self, files: list[str], sample_name: str, key: str, multi_sample_keys: list[str]
+        self,
+        files: list[str],
+        sample_name: str,
+        key: str,
+        multi_sample_keys: list[str],
+        sample_paths_index: dict[str, dict[str, list[str]]],
     ) -> list[str]:
         """
         Selects matching file paths for a given sample name and config key.
@@ -1065,16 +1314,18 @@ class BioinfoMetadata(BaseModule):
             sample_name (str): The sample name to match against file paths.
             key (str): The configuration key to check against multi-sample keys.
             multi_sample_keys (list[str]): List of keys that allow multiple samples.
+            sample_paths_index (dict): Files of each sample per key, from
+            _build_sample_paths_index.
         Returns:
             list[str]: Matching paths or placeholder.
         """
         if not files:
-            return [self.config_json.get_topic_data("generic", "not_provided_field")]
+            return [self.not_provided_field]
         # if key is in multi_sample_keys, return all files
         if key in multi_sample_keys:
             return files
         # else return files that match the sample_name
-        return [f for f in files if sample_name in f]
+        return list(sample_paths_index[key].get(sample_name, []))
 
     def _assign_file_paths_to_row(
         self,
@@ -1096,9 +1347,7 @@ class BioinfoMetadata(BaseModule):
             # for each file_path in file_paths
             for f in file_paths:
                 # If not provided append and continue
-                if f == self.config_json.get_topic_data(
-                    "generic", "not_provided_field"
-                ):
+                if f == self.not_provided_field:
                     analysis_results_paths.append(f)
                     continue
                 # check if configured as extract or function
@@ -1173,6 +1422,49 @@ class BioinfoMetadata(BaseModule):
             )
         return sample_idx_col_pos
 
+    def extract_files(self, extract_jobs: list[tuple]) -> None:
+        """Extract files to their analysis_results folders concurrently. Log
+        entries are added in the same order as the jobs. When several files go
+        to the same destination path only the first one is extracted, so no two
+        threads write the same file. Missing files (not_provided_field) are
+        logged for each sample and key.
+
+        Args:
+            extract_jobs (list(tuple)): (file path, dest folder, sample name, path key)
+        """
+        jobs_by_destination = {}
+        for filepath, dest_folder, sample_name, path_key in extract_jobs:
+            if filepath == self.not_provided_field:
+                destination = (filepath, dest_folder, sample_name, path_key)
+            else:
+                destination = os.path.join(
+                    dest_folder, "analysis_results", os.path.basename(filepath)
+                )
+            jobs_by_destination.setdefault(
+                destination, (filepath, dest_folder, sample_name, path_key)
+            )
+        with ThreadPoolExecutor(max_workers=EXTRACT_THREADS) as executor:
+            futures = [
+                executor.submit(
+                    self._run_with_buffered_logs,
+                    self.extract_file,
+                    file=[filepath],
+                    dest_folder=dest_folder,
+                    sample_name=sample_name,
+                    path_key=path_key,
+                )
+                for filepath, dest_folder, sample_name, path_key in (
+                    jobs_by_destination.values()
+                )
+            ]
+            for future in futures:
+                _, job_logs, job_error = future.result()
+                for log_entry in job_logs:
+                    self.update_all_logs(*log_entry)
+                if job_error is not None:
+                    raise job_error
+        return
+
     def extract_file(
         self,
         file: list[str],
@@ -1180,7 +1472,10 @@ class BioinfoMetadata(BaseModule):
         sample_name: str | None = None,
         path_key: str | None = None,
     ) -> bool:
-        """Copy input file to the given destination, include sample name and key in log
+        """Extract input file to the given destination, include sample name and key in log.
+        Files are hardlinked, reflinked, symlinked or copied depending on extract_mode,
+        falling back to a copy when that is not possible.
+
         Args:
             file (list[str]): Paths of the files that are going to be copied
             dest_folder (str): Folder with files from batch of samples
@@ -1196,9 +1491,7 @@ class BioinfoMetadata(BaseModule):
             if os.path.isfile(out_filepath):
                 self.log.debug(f"{out_filepath} already exists, not extracted")
                 continue
-            if filepath == self.config_json.get_topic_data(
-                "generic", "not_provided_field"
-            ):
+            if filepath == self.not_provided_field:
                 self.update_all_logs(
                     self.extract_file.__name__,
                     "warning",
@@ -1206,7 +1499,12 @@ class BioinfoMetadata(BaseModule):
                 )
                 continue
             try:
-                shutil.copy(filepath, out_filepath)
+                relecov_tools.utils.extract_file(
+                    filepath, out_filepath, mode=self.extract_mode
+                )
+            except FileExistsError:
+                self.log.debug(f"{out_filepath} already exists, not extracted")
+                continue
             except (IOError, PermissionError) as e:
                 self.update_all_logs(
                     self.extract_file.__name__,
@@ -1224,14 +1522,10 @@ class BioinfoMetadata(BaseModule):
             data_by_batch (dict(list(dict))): Dictionary containing parts of j_data corresponding to each
             different folder with samples (batch) included in the original json metadata used as input
         """
-        unique_batchs = {x.get("sequence_file_path_R1") for x in j_data}
-        data_by_batch = {batch_dir: {} for batch_dir in unique_batchs}
-        for batch_dir in data_by_batch:
-            data_by_batch[batch_dir]["j_data"] = [
-                samp
-                for samp in j_data
-                if samp.get("sequence_file_path_R1") == batch_dir
-            ]
+        data_by_batch = {}
+        for samp in j_data:
+            batch_dir = samp.get("sequence_file_path_R1")
+            data_by_batch.setdefault(batch_dir, {"j_data": []})["j_data"].append(samp)
         return data_by_batch
 
     def split_tables_by_batch(
@@ -1248,62 +1542,107 @@ class BioinfoMetadata(BaseModule):
             batch_data (list(dict)): Metadata corresponding to a single folder with samples (folder)
             output_dir (str): Output location for the generated tabular file
         """
+        self.split_tables_by_batches(
+            files_found_dict, [(file_tag, batch_data, output_dir)]
+        )
+        return
 
-        def extract_batch_rows_to_file(file, new_filename):
-            """Create a new table file only with rows matching samples in batch_data"""
-            ext_dict = {".csv": ",", ".tsv": "\t", ".tab": "\t"}
-            file_extension = os.path.splitext(file)[1]
-            file_df = pd.read_csv(
-                file, sep=ext_dict.get(file_extension), header=header_pos
-            )
-            sample_col = file_df.columns[sample_col_pos]
-            file_df[sample_col] = file_df[sample_col].astype(str)
-            file_df = file_df[file_df[sample_col].isin(batch_samples)]
+    def split_tables_by_batches(
+        self,
+        files_found_dict: dict,
+        batches: list[tuple[str, list[dict], str]],
+    ) -> None:
+        """Split each table configured as split_by_batch into one table per batch,
+        with only the rows of the samples present in that batch metadata. Each table
+        is read once and its rows grouped by batch in a single pass.
 
+        Args:
+            files_found_dict (dict): A dictionary containing file paths identified for each configuration item.
+            batches (list(tuple)): (file_tag, batch_data, output_dir) for each batch.
+            file_tag is added to the new table file name, batch_data is the metadata
+            of the batch and output_dir the location for its tables.
+        """
+        method_name = self.split_tables_by_batches.__name__
+        ext_dict = {".csv": ",", ".tsv": "\t", ".tab": "\t"}
+        # Group samples by the batches they belong to. Usually each sample belongs
+        # to a single batch, so each group of rows is written to a single table.
+        batch_groups = {}
+        sample_groups = {}
+        for batch_idx, (_, batch_data, _) in enumerate(batches):
+            for row in batch_data:
+                sample_name = self._get_sample_name(row)
+                sample_groups.setdefault(sample_name, set()).add(batch_idx)
+        for sample_name, batch_idxs in sample_groups.items():
+            group = batch_groups.setdefault(
+                tuple(sorted(batch_idxs)), len(batch_groups)
+            )
+            sample_groups[sample_name] = group
+        groups_per_batch = [[] for _ in batches]
+        for batch_idxs, group in batch_groups.items():
+            for batch_idx in batch_idxs:
+                groups_per_batch[batch_idx].append(group)
+
+        def write_batch_table(file_df, group_rows, batch_idx, file, key):
+            """Create a new table file only with rows matching samples in the batch"""
+            file_tag, batch_data, output_dir = batches[batch_idx]
+            if self.software_config[key].get("filepath_name"):
+                filepath_key = self.software_config[key].get("filepath_name")
+                new_filename = os.path.basename(
+                    list({row[filepath_key] for row in batch_data})[0]
+                )
+            else:
+                base, ext = os.path.splitext(os.path.basename(file))
+                new_filename = f"{base}_{file_tag}{ext}"
+            rows = [group_rows[g] for g in groups_per_batch[batch_idx]]
+            rows = [x for x in rows if x is not None]
+            positions = np.sort(np.concatenate(rows)) if rows else []
             os.makedirs(os.path.join(output_dir, "analysis_results"), exist_ok=True)
             output_path = os.path.join(output_dir, "analysis_results", new_filename)
-            sep = ext_dict.get(file_extension, ",")
-            file_df.to_csv(output_path, index=False, sep=sep)
+            sep = ext_dict.get(os.path.splitext(file)[1], ",")
+            file_df.iloc[positions].to_csv(output_path, index=False, sep=sep)
             return
 
-        method_name = self.split_tables_by_batch.__name__
-        # sample names are created by concatenating sequencing_sample_id and unique_sample_id
-        # if unique_sample_id is not present, it will use only sequencing_sample_id.
-        batch_samples = [
-            (
-                f"{row.get('sequencing_sample_id')}_{row.get('unique_sample_id')}"
-                if row.get("unique_sample_id")
-                else row.get("sequencing_sample_id")
-            )
-            for row in batch_data
-        ]
         for key, files in files_found_dict.items():
             if not self.software_config[key].get("split_by_batch"):
                 continue
             header_pos = self.software_config[key].get("header_row_idx", 1) - 1
             sample_col_pos = self.get_sample_idx_col_pos(key)
+            log_type = (
+                "error" if self.software_config[key].get("required") else "warning"
+            )
             for file in files:
                 try:
-                    if self.software_config[key].get("filepath_name"):
-                        filepath_key = self.software_config[key].get("filepath_name")
-                        new_filename = os.path.basename(
-                            list({row[filepath_key] for row in batch_data})[0]
-                        )
-                    else:
-                        base, ext = os.path.splitext(os.path.basename(file))
-                        new_filename = f"{base}_{file_tag}{ext}"
-                    extract_batch_rows_to_file(file, new_filename)
-                except Exception as e:
-                    log_type = (
-                        "error"
-                        if self.software_config[key].get("required")
-                        else "warning"
+                    file_df = pd.read_csv(
+                        file,
+                        sep=ext_dict.get(os.path.splitext(file)[1]),
+                        header=header_pos,
                     )
+                    sample_col = file_df.columns[sample_col_pos]
+                    file_df[sample_col] = file_df[sample_col].astype(str)
+                    row_groups = file_df[sample_col].map(sample_groups)
+                    group_indices = row_groups.groupby(row_groups, sort=False).indices
+                except Exception as e:
                     self.update_all_logs(
                         method_name,
                         log_type,
                         f"Could not create batch table for {file}: {e}",
                     )
+                    continue
+                group_rows = [group_indices.get(g) for g in range(len(batch_groups))]
+                with ThreadPoolExecutor(max_workers=SPLIT_THREADS) as executor:
+                    futures = [
+                        executor.submit(
+                            write_batch_table, file_df, group_rows, batch_idx, file, key
+                        )
+                        for batch_idx in range(len(batches))
+                    ]
+                for future in futures:
+                    if future.exception() is not None:
+                        self.update_all_logs(
+                            method_name,
+                            log_type,
+                            f"Could not create batch table for {file}: {future.exception()}",
+                        )
         return
 
     def merge_metadata(self, batch_filepath: str, batch_data: list[dict]) -> list[dict]:
@@ -1466,9 +1805,15 @@ class BioinfoMetadata(BaseModule):
         """
         self.j_data = self.filter_properties(self.j_data)
 
+        cache = None
+        if self.config_json.get_topic_data("generic", "validation_cache"):
+            cache = relecov_tools.validation_cache.ValidationCache(self.json_schema)
         valid_rows, invalid_rows = relecov_tools.validate.Validate.validate_instances(
-            self.j_data, self.json_schema, "sequencing_sample_id"
+            self.j_data, self.json_schema, "sequencing_sample_id", cache=cache
         )
+        if cache is not None:
+            cache.save()
+            self.logsum.add_stats(cache.get_stats(), key=out_path)
 
         for sample in valid_rows:
             self.logsum.feed_key(
@@ -1476,15 +1821,8 @@ class BioinfoMetadata(BaseModule):
             )
 
         if invalid_rows:
-            unique_failed_samples = list(
-                {
-                    sample
-                    for samples in invalid_rows["samples"].values()
-                    for sample in samples
-                }
-            )
-            for error_message, failed_samples in invalid_rows["samples"].items():
-                field_with_error = invalid_rows["fields"][error_message]
+            unique_failed_samples = set(invalid_rows.sample_ids)
+            for error_message, field_with_error, failed_samples in invalid_rows.items():
                 sample_list = "', '".join(failed_samples)
                 error_text = f"{error_message} in field '{field_with_error}' for {len(failed_samples)} sample/s: '{sample_list}'"
                 log_fn = (
@@ -1493,10 +1831,9 @@ class BioinfoMetadata(BaseModule):
                     else self.logsum.add_warning
                 )
                 log_fn(key=out_path, entry=error_text)
-                for fail_samp in failed_samples:
-                    self.logsum.add_error(
-                        key=out_path, sample=fail_samp, entry=error_text
-                    )
+                self.logsum.add_sample_errors(
+                    key=out_path, samples=failed_samples, entry=error_text
+                )
 
             if not self.soft_validation:
                 self.parent_create_error_summary(
@@ -1538,6 +1875,7 @@ class BioinfoMetadata(BaseModule):
         stderr.print(f"Created complete batch json file: {batch_filepath}")
 
         data_by_batch = self.split_data_by_batch(self.j_data)
+        batches = []
         for batch_dir, batch_dict in data_by_batch.items():
             batch_data = batch_dict["j_data"]
             if not batch_data:
@@ -1550,18 +1888,18 @@ class BioinfoMetadata(BaseModule):
                     f"Data from batch {batch_dir} was completely empty. Skipped.",
                 )
                 continue
+            batch_date = batch_data[0].get("batch_id", batch_dir.split("/")[-1])
+            batches.append((batch_date + "_" + self.hex, batch_data, batch_dir))
 
+        # Tables are read once and split for all batches at the same time
+        self.log.info(f"Splitting tables for {len(batches)} batches")
+        self.split_tables_by_batches(files_found_dict, batches)
+
+        for file_tag, batch_data, batch_dir in batches:
             lab_code = batch_data[0].get(
                 "submitting_institution_id", batch_dir.split("/")[-2]
             )
-            batch_date = batch_data[0].get("batch_id", batch_dir.split("/")[-1])
-            file_tag = batch_date + "_" + self.hex
-
             self.log.info(f"Processing data from {batch_dir}")
-            self.split_tables_by_batch(
-                files_found_dict, file_tag, batch_data, batch_dir
-            )
-
             batch_filename = self.tag_filename(
                 "bioinfo_lab_metadata_" + lab_code + ".json"
             )
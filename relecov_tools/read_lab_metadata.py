@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import copy
+import hashlib
 import json
 import os
 import re
@@ -14,6 +15,7 @@ import relecov_tools.assets.schema_utils.jsonschema_draft
 import relecov_tools.utils
 from relecov_tools.base_module import BaseModule
 from relecov_tools.config_json import ConfigJson
+from relecov_tools.lookup_store import LookupStore
 
 stderr = rich.console.Console(
     stderr=True,
@@ -46,12 +48,15 @@ class LabMetadata(BaseModule):
         output_dir=None,
         files_folder=None,
         project=None,
+        incremental=False,
         **kwargs,
     ):
         super().__init__(output_dir=output_dir, called_module=__name__)
         self.log.info("Initiating read-lab-metadata process")
         self.sample_list_file = sample_list_file
         self.files_folder = files_folder
+        self.incremental = incremental
+        self._md5_files_state = None
 
         if metadata_file is None:
             self.metadata_file = relecov_tools.utils.prompt_path(
@@ -156,6 +161,7 @@ class LabMetadata(BaseModule):
             "force_submitting_institution_id_from_lab_code", True
         )
         self.json_req_files = self.project_config.get("lab_metadata_req_json", {}) or {}
+        self.hashing_threads = self.project_config.get("hashing_threads") or 4
         self.schema_name = self.relecov_sch_json["title"]
         self.schema_version = self.relecov_sch_json["version"]
         base_metadata_processing = (
@@ -191,6 +197,19 @@ class LabMetadata(BaseModule):
             self.alt_heading_equivalences
         )
         self.date = dtime.now().strftime("%Y%m%d%H%M%S")
+        # Rows are only reused if schema, project config and tool version match
+        self.fingerprint_context = json.dumps(
+            [
+                self.schema_name,
+                self.schema_version,
+                self.project,
+                self.lab_code,
+                BaseModule._current_version,
+                {k: v for k, v in self.project_config.items() if k != "required_conf"},
+            ],
+            sort_keys=True,
+            default=str,
+        )
 
     def _split_institution(self, raw: str) -> tuple[str, str]:
         """
@@ -343,32 +362,53 @@ class LabMetadata(BaseModule):
             its file names, locations and md5
         """
 
-        def safely_calculate_md5(file):
-            """Check file md5, but return Not Provided if file does not exist"""
-            self.log.info("Generating md5 hash for %s...", str(file))
-            try:
-                return relecov_tools.utils.calculate_md5(file)
-            except IOError:
-                return self.config_json.get_topic_data("generic", "not_provided_field")
-
-        # The files are and md5file are supposed to be located together
+        # The files and md5file are supposed to be located together
         dir_path = self.files_folder
-        md5_checksum_files = [
-            os.path.join(dir_path, f) for f in os.listdir(dir_path) if "md5" in f
-        ]
+        with os.scandir(dir_path) as entries:
+            dir_files = {entry.name for entry in entries if entry.is_file()}
+        # Hashes previously stored next to each file as <file>.md5 by download
+        sidecar_files = {
+            f for f in dir_files if f.endswith(".md5") and f[:-4] in dir_files
+        }
+        md5_checksum_files = sorted(
+            os.path.join(dir_path, f)
+            for f in dir_files
+            if "md5" in f and f not in sidecar_files
+        )
+        md5_dict = {}
         if md5_checksum_files:
             skip_list = self.configuration.get_topic_data(
                 "sftp_handle", "skip_when_found"
             )
-            md5_dict = relecov_tools.utils.read_md5_checksum(
-                file_name=md5_checksum_files[0], avoid_chars=skip_list
+            md5_dict = (
+                relecov_tools.utils.read_md5_checksum(
+                    file_name=md5_checksum_files[0], avoid_chars=skip_list
+                )
+                or {}
             )
-        else:
-            md5_dict = {}
+        for sidecar in sidecar_files:
+            with open(os.path.join(dir_path, sidecar), "r") as fh:
+                sidecar_hash = fh.read().split()
+            if sidecar_hash:
+                md5_dict.setdefault(sidecar[:-4], sidecar_hash[0].lower())
+        if not md5_dict:
             self.log.warning("No md5sum file found.")
             self.log.warning("Generating new md5 hashes. This might take a while...")
+
+        def file_exists(file_name):
+            """Check file in the folder listing, fallback to disk for subpaths"""
+            if file_name in dir_files:
+                return True
+            return os.path.isfile(os.path.join(dir_path, file_name))
+
         j_data = {}
+        # {file_name: [(files_dict, md5_field)]} for the hashes that must be created
+        pending_md5 = defaultdict(list)
         no_fastq_error = "No R1 fastq file was given for sample %s in metadata"
+        batch_id = dir_path.split("/")[-1]
+        logtxt = f"Setting batch_id to {batch_id} based on download dir: {dir_path}"
+        stderr.print(f"[yellow]{logtxt}")
+        self.log.info(logtxt)
         n = 0
         for sample in clean_metadata_rows:
             n += 1
@@ -397,44 +437,43 @@ class LabMetadata(BaseModule):
                 )
                 j_data[sample_id] = files_dict
                 continue
-            r1_md5 = md5_dict.get(r1_file)
-            r2_md5 = md5_dict.get(r2_file)
             files_dict["sequence_file_R1"] = r1_file
             files_dict["sequence_file_path_R1"] = dir_path
-            batch_id = dir_path.split("/")[-1]
-            logtxt = f"Setting batch_id to {batch_id} based on download dir: {dir_path}"
-            stderr.print(f"[yellow]{logtxt}")
-            self.log.info(logtxt)
-            files_dict["batch_id"] = dir_path.split("/")[-1]
-            if not os.path.exists(os.path.join(dir_path, r1_file)):
+            files_dict["batch_id"] = batch_id
+            if not file_exists(r1_file):
                 self.logsum.add_error(
                     sample=sample_id, entry="Provided R1 file not found after download"
                 )
                 continue
-            if r1_md5:
-                files_dict["sequence_file_R1_md5"] = r1_md5
-            else:
-                files_dict["sequence_file_R1_md5"] = safely_calculate_md5(
-                    os.path.join(dir_path, r1_file)
-                )
+            sample_files = {"sequence_file_R1_md5": r1_file}
             if r2_file:
                 files_dict["sequence_file_R2"] = r2_file
                 files_dict["sequence_file_path_R2"] = dir_path
-                if not os.path.exists(os.path.join(dir_path, r2_file)):
+                if not file_exists(r2_file):
                     self.logsum.add_error(
                         sample=sample_id,
                         entry="Provided R2 file not found after download",
                     )
                     continue
-                if r2_md5:
-                    files_dict["sequence_file_R2_md5"] = r2_md5
+                sample_files["sequence_file_R2_md5"] = r2_file
+            for md5_field, file_name in sample_files.items():
+                if md5_dict.get(file_name):
+                    files_dict[md5_field] = md5_dict[file_name]
                 else:
-                    files_dict["sequence_file_R2_md5"] = safely_calculate_md5(
-                        os.path.join(dir_path, r1_file)
-                    )
+                    pending_md5[file_name].append((files_dict, md5_field))
             if sample_id in j_data:
                 sample_id = "_".join([sample_id, str(n)])
             j_data[sample_id] = files_dict
+        if pending_md5:
+            self.log.info("Generating md5 hashes for %s files...", len(pending_md5))
+            md5_results = relecov_tools.utils.calculate_md5_batch(
+                [os.path.join(dir_path, f) for f in pending_md5],
+                threads=self.hashing_threads,
+            )
+            for file_name, targets in pending_md5.items():
+                md5_hash = md5_results.get(os.path.join(dir_path, file_name))
+                for files_dict, md5_field in targets:
+                    files_dict[md5_field] = md5_hash or self.not_provided_field
         if not any(val for val in j_data.values()):
             errtxt = f"No files found for the samples in {dir_path}"
             self.logsum.add_error(entry=errtxt, sample=sample_id)
@@ -764,10 +803,7 @@ class LabMetadata(BaseModule):
         for key, values in self.json_req_files.items():
             stderr.print(f"[blue]Processing {key}")
             self.log.info(f"Processing {key}")
-            f_path = os.path.join(
-                os.path.dirname(os.path.realpath(__file__)), "conf", values["file"]
-            )
-            values["j_data"] = relecov_tools.utils.read_json_file(f_path)
+            values["j_data"] = LookupStore.from_conf(values["file"])
             metadata = self.process_from_json(metadata, values)
             stderr.print(f"[green]Processed {key}")
             self.log.info(f"Processed {key}")
@@ -1023,6 +1059,207 @@ class LabMetadata(BaseModule):
 
         return valid_metadata_rows
 
+    def get_md5_files_state(self):
+        """Size and mtime of the md5 checksum files found in files_folder. These
+        files provide the hashes of every sample so they are part of all rows
+
+        Returns:
+            md5_files_state (list): [file_name, size, mtime] for each md5 file
+        """
+        if self._md5_files_state is None:
+            with os.scandir(self.files_folder) as entries:
+                dir_files = {entry.name: entry for entry in entries if entry.is_file()}
+            # <file>.md5 sidecars are hashed with the row of their own file
+            self._md5_files_state = sorted(
+                [f_name, entry.stat().st_size, entry.stat().st_mtime_ns]
+                for f_name, entry in dir_files.items()
+                if "md5" in f_name
+                and not (f_name.endswith(".md5") and f_name[:-4] in dir_files)
+            )
+        return self._md5_files_state
+
+    def row_fingerprint(self, row, sample_data=None):
+        """Create a content hash for a normalised metadata row, including its
+        entry in samples_data.json and the configuration context
+
+        Args:
+            row (dict): Normalised row from read_metadata_file()
+            sample_data (dict, optional): Row data in samples_data.json. Defaults to None.
+
+        Returns:
+            fingerprint (str): sha256 hexdigest of the row content
+        """
+        if sample_data is None and not self.sample_list_file and self.files_folder:
+            # Files are hashed later, so their size, mtime and md5 are part of the row
+            sample_data = {"md5_files": self.get_md5_files_state()}
+            for field in ("sequence_file_R1", "sequence_file_R2"):
+                if not row.get(field):
+                    continue
+                file_path = os.path.join(self.files_folder, row[field])
+                try:
+                    f_stat = os.stat(file_path)
+                    sample_data[field] = [f_stat.st_size, f_stat.st_mtime_ns]
+                except OSError:
+                    sample_data[field] = None
+                try:
+                    with open(file_path + ".md5", "r") as fh:
+                        sample_data[field + "_md5"] = fh.read().strip()
+                except OSError:
+                    pass
+        content = json.dumps(
+            [self.fingerprint_context, row, sample_data], sort_keys=True, default=str
+        )
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get_fingerprints_filename(self, metadata_filename):
+        """Name of the file storing row fingerprints for a read_lab_metadata output"""
+        return metadata_filename.replace("read_lab_metadata_", "row_fingerprints_", 1)
+
+    def get_row_log_ids(self, row):
+        """Sample names under which the logs of a row are reported"""
+        return {
+            str(row.get(self.unique_sample_id)).strip(),
+            str(row.get(self.sample_data_map_field)).strip(),
+        }
+
+    def get_sample_logs_count(self):
+        """Number of errors and warnings already stored for each sample in logsum"""
+        return {
+            sample: (len(s_logs["errors"]), len(s_logs["warnings"]))
+            for key_logs in self.logsum.logs.values()
+            for sample, s_logs in key_logs.get("samples", {}).items()
+        }
+
+    def get_rows_logs(self, rows, logs_count):
+        """Collect the errors and warnings added for each row since logs_count
+
+        Args:
+            rows (list(dict)): Rows processed after logs_count was taken
+            logs_count (dict): Output of get_sample_logs_count() before processing
+
+        Returns:
+            rows_logs (list(dict)): {"errors": [], "warnings": []} for each row
+        """
+        new_logs = {}
+        for key_logs in self.logsum.logs.values():
+            for sample, s_logs in key_logs.get("samples", {}).items():
+                n_errors, n_warnings = logs_count.get(sample, (0, 0))
+                sample_logs = new_logs.setdefault(
+                    sample, {"errors": [], "warnings": []}
+                )
+                sample_logs["errors"].extend(s_logs["errors"][n_errors:])
+                sample_logs["warnings"].extend(s_logs["warnings"][n_warnings:])
+        rows_logs = []
+        for row in rows:
+            row_logs = {}
+            for sample in self.get_row_log_ids(row):
+                if new_logs.get(sample, {}).get("errors") or new_logs.get(
+                    sample, {}
+                ).get("warnings"):
+                    row_logs[sample] = new_logs[sample]
+            rows_logs.append(row_logs)
+        return rows_logs
+
+    def replay_rows_logs(self, rows_logs):
+        """Add to logsum the errors and warnings stored for the reused rows"""
+        replayed = set()
+        for row_logs in rows_logs:
+            for sample, sample_logs in row_logs.items():
+                # Rows sharing a sample name stored the same logs
+                if sample in replayed:
+                    continue
+                replayed.add(sample)
+                for entry in sample_logs.get("errors", []):
+                    self.logsum.add_error(entry=entry, sample=sample)
+                for entry in sample_logs.get("warnings", []):
+                    self.logsum.add_warning(entry=entry, sample=sample)
+
+    def load_previous_rows(self):
+        """Collect the processed rows from previous read_lab_metadata_*.json files
+        found in output folder which have a fingerprints file. Newest files first
+
+        Returns:
+            previous_rows (dict): {fingerprint: (processed_row, row_logs)}
+        """
+        previous_rows = {}
+        if not os.path.isdir(self.output_dir):
+            return previous_rows
+        with os.scandir(self.output_dir) as entries:
+            previous_files = [
+                entry.path
+                for entry in entries
+                if entry.is_file()
+                and entry.name.startswith("read_lab_metadata_")
+                and entry.name.endswith(".json")
+                and not entry.name.endswith("_log_summary.json")
+            ]
+        previous_files.sort(key=os.path.getmtime)
+        for metadata_path in previous_files:
+            fingerprints_path = os.path.join(
+                self.output_dir,
+                self.get_fingerprints_filename(os.path.basename(metadata_path)),
+            )
+            if not os.path.isfile(fingerprints_path):
+                continue
+            try:
+                fingerprints = relecov_tools.utils.read_json_file(fingerprints_path)
+                metadata_rows = relecov_tools.utils.read_json_file(metadata_path)
+            except (OSError, ValueError) as e:
+                self.log.warning(f"Could not load previous {metadata_path}: {e}")
+                continue
+            if not isinstance(fingerprints, list):
+                self.log.debug(f"Skipping outdated fingerprints {fingerprints_path}")
+                continue
+            for record in fingerprints:
+                # Records point to their row by position and sample id
+                idx = record.get("row")
+                if not isinstance(idx, int) or not 0 <= idx < len(metadata_rows):
+                    continue
+                row = metadata_rows[idx]
+                if str(row.get(self.unique_sample_id)) != record.get("sample_id"):
+                    continue
+                # Newer files are read last, so they take precedence
+                previous_rows[record["fingerprint"]] = (row, record.get("logs", {}))
+            self.log.debug(f"Loaded previous rows from {metadata_path}")
+        return previous_rows
+
+    def split_reusable_rows(self, clean_metadata_rows):
+        """Fingerprint each row and find those already processed in a previous
+        read_lab_metadata_*.json from the same output folder
+
+        Args:
+            clean_metadata_rows (list(dict)): Rows returned by match_to_json()
+
+        Returns:
+            reused_rows (dict): {row_index: (previously processed row, row_logs)}
+            fingerprints (list(str)): Fingerprint for each row in the same order
+        """
+        samples_json = {}
+        if self.sample_list_file:
+            samples_json = relecov_tools.utils.read_json_file(self.sample_list_file)
+        fingerprints = []
+        for row in clean_metadata_rows:
+            map_value = str(row.get(self.sample_data_map_field, "")).strip()
+            fingerprints.append(self.row_fingerprint(row, samples_json.get(map_value)))
+        previous_rows = self.load_previous_rows()
+        reused_rows = {
+            idx: copy.deepcopy(previous_rows[fingerprint])
+            for idx, fingerprint in enumerate(fingerprints)
+            if fingerprint in previous_rows
+        }
+        return reused_rows, fingerprints
+
+    def process_metadata_rows(self, clean_metadata_rows):
+        """Add the extra information required for each row: json files, samples
+        data, post processing, fixed fields and ontologies"""
+        extended_metadata = self.adding_fields(clean_metadata_rows)
+        stderr.print("[blue]Including post processing information")
+        self.log.info("Including post processing information")
+        extended_metadata = self.adding_post_processing(extended_metadata)
+        extended_metadata = self.adding_copy_from_other_field(extended_metadata)
+        extended_metadata = self.adding_fixed_fields(extended_metadata)
+        return self.adding_ontology_to_enum(extended_metadata)
+
     def create_metadata_json(self):
         stderr.print("[blue]Reading Lab Metadata Excel File")
         valid_metadata_rows = self.read_metadata_file()
@@ -1038,13 +1275,51 @@ class LabMetadata(BaseModule):
         stderr.print("[blue]Including additional information")
         self.log.info("Including additional information")
 
-        extended_metadata = self.adding_fields(clean_metadata_rows)
-        stderr.print("[blue]Including post processing information")
-        self.log.info("Including post processing information")
-        extended_metadata = self.adding_post_processing(extended_metadata)
-        extended_metadata = self.adding_copy_from_other_field(extended_metadata)
-        extended_metadata = self.adding_fixed_fields(extended_metadata)
-        completed_metadata = self.adding_ontology_to_enum(extended_metadata)
+        reused_rows, fingerprints = {}, []
+        if self.incremental:
+            reused_rows, fingerprints = self.split_reusable_rows(clean_metadata_rows)
+        pending_idx = [
+            idx for idx in range(len(clean_metadata_rows)) if idx not in reused_rows
+        ]
+        logs_count = self.get_sample_logs_count()
+        if pending_idx or not reused_rows:
+            processed_rows = self.process_metadata_rows(
+                [clean_metadata_rows[idx] for idx in pending_idx]
+            )
+        else:
+            processed_rows = []
+            # Same source as adding_fields() so the output keeps its batch_id
+            if self.sample_list_file:
+                batch_data = relecov_tools.utils.read_json_file(self.sample_list_file)
+                batch_data = list(batch_data.values())
+            else:
+                batch_data = [row for row, _ in reused_rows.values()]
+            batch_id = self.get_batch_id_from_data(batch_data)
+            self.set_batch_id(batch_id)
+        processed_logs = self.get_rows_logs(
+            [clean_metadata_rows[idx] for idx in pending_idx], logs_count
+        )
+        # Reused rows were not processed again, so their logs are added back
+        self.replay_rows_logs([row_logs for _, row_logs in reused_rows.values()])
+        processed_rows = dict(zip(pending_idx, zip(processed_rows, processed_logs)))
+        completed_rows = [
+            reused_rows[idx] if idx in reused_rows else processed_rows[idx]
+            for idx in range(len(clean_metadata_rows))
+        ]
+        completed_metadata = [row for row, _ in completed_rows]
+        if self.incremental:
+            logtxt = (
+                f"Incremental mode: {len(reused_rows)} rows reused from previous "
+                f"outputs, {len(pending_idx)} rows recomputed"
+            )
+            stderr.print(f"[blue]{logtxt}")
+            self.log.info(logtxt)
+            self.logsum.add_stats(
+                {
+                    "incremental_reused_rows": len(reused_rows),
+                    "incremental_recomputed_rows": len(pending_idx),
+                }
+            )
         if not completed_metadata:
             self.log.warning("Metadata was completely empty. No output file generated")
             stderr.print("Metadata was completely empty. No output file generated")
@@ -1058,4 +1333,22 @@ class LabMetadata(BaseModule):
         file_path = os.path.join(self.output_dir, file_name)
         self.log.info("Writting output json file %s", file_path)
         relecov_tools.utils.write_json_to_file(completed_metadata, file_path)
+        if self.incremental:
+            row_fingerprints = [
+                {
+                    "row": idx,
+                    "sample_id": str(row.get(self.unique_sample_id)),
+                    "fingerprint": fingerprint,
+                    "logs": row_logs,
+                }
+                for idx, ((row, row_logs), fingerprint) in enumerate(
+                    zip(completed_rows, fingerprints)
+                )
+            ]
+            relecov_tools.utils.write_json_to_file(
+                row_fingerprints,
+                os.path.join(
+                    self.output_dir, self.get_fingerprints_filename(file_name)
+                ),
+            )
         return True
@@ -1,9 +1,12 @@
 #!/usr/bin/env python
+import json
 import logging
 import requests
 import rich.console
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 import relecov_tools.utils
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
 log = logging.getLogger(__name__)
@@ -17,7 +20,7 @@ stderr = rich.console.Console(
 
 
 class RestApi:
-    def __init__(self, server, url):
+    def __init__(self, server, url, pool_size=10):
         self.request_url = server + url
         self.headers = {"content-type": "application/json"}
         self.UNABLE_TO_CONNECT = {
@@ -25,6 +28,13 @@ class RestApi:
             "status_code": "503 Service Unavailable",
             "data": {},
         }
+        # Reuse connections between requests instead of opening one per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Samples already found in the platform by samples_already_in_db
+        self._samples_in_db = set()
 
     def get_request(
         self,
@@ -69,7 +79,7 @@ class RestApi:
             elif isinstance(credentials, (list, tuple)):
                 credentials = HTTPBasicAuth(credentials[0], credentials[1])
         try:
-            response = requests.get(
+            response = self.session.get(
                 url_http, headers=self.headers, auth=credentials, params=params
             )
             return RestApi.standardize_response(
@@ -95,7 +105,7 @@ class RestApi:
             auth = (credentials["user"], credentials["pass"])
         url_http = str(self.request_url + url)
         try:
-            response = requests.put(url_http, data=data, auth=auth)
+            response = self.session.put(url_http, data=data, auth=auth)
         except requests.ConnectionError:
             log.error("Unable to open connection towards %s", self.request_url)
             stderr.print("[red] Unable to open connection towards ", self.request_url)
@@ -120,11 +130,11 @@ class RestApi:
         try:
             if file:
                 files = {"upload_file": open(file, "rb")}
-                response = requests.post(
+                response = self.session.post(
                     url_http, files=files, data=data, headers=self.headers, auth=auth
                 )
             else:
-                response = requests.post(
+                response = self.session.post(
                     url_http, data=data, headers=self.headers, auth=auth
                 )
             return RestApi.standardize_response(
@@ -152,7 +162,7 @@ class RestApi:
         response = self.get_request(
             api_func, credentials=credentials, params=sample_data, safe=False
         )
-        log.info(str(response))
+        log.debug(str(response))
         if missing_keys := [
             key for key in ["message", "data", "status_code"] if key not in response
         ]:
@@ -169,6 +179,47 @@ class RestApi:
         else:
             raise ValueError(f"Error trying to check for sample: {response}")
 
+    def samples_already_in_db(self, api_func, credentials, samples, threads=8):
+        """Check which of the given samples already exist in the target platform,
+        using sample_already_in_db with a bounded pool of threads. Identical samples
+        are checked once, and samples found are not checked again by this instance.
+
+        Args:
+            api_func (str): Api functionality to check if a sample is present
+            credentials (dict["user": user, "pass": pass]): Credentials dictionary
+            samples (list(dict)): List of samples metadata to check
+            threads (int, optional): Max number of concurrent requests. Defaults to 8.
+
+        Returns:
+            results (list(tuple)): (in_db, error) for each sample in the same order.
+            in_db is None and error has the message if the sample could not be checked.
+        """
+        results = [None] * len(samples)
+        pending = {}
+        for idx, sample in enumerate(samples):
+            cache_key = (api_func, json.dumps(sample, sort_keys=True, default=str))
+            if cache_key in self._samples_in_db:
+                results[idx] = (True, None)
+            else:
+                pending.setdefault(cache_key, []).append(idx)
+
+        def check_sample(cache_key):
+            sample = samples[pending[cache_key][0]]
+            try:
+                in_db = self.sample_already_in_db(api_func, credentials, sample)
+            except ValueError as e:
+                return cache_key, None, str(e)
+            return cache_key, in_db, None
+
+        with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+            for cache_key, in_db, error in executor.map(check_sample, pending):
+                # Samples not found may be uploaded later, only found ones are kept
+                if in_db:
+                    self._samples_in_db.add(cache_key)
+                for idx in pending[cache_key]:
+                    results[idx] = (in_db, error)
+        return results
+
     @staticmethod
     def standardize_response(
         response,
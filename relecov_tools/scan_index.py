@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import logging
+import os
+import time
+
+from relecov_tools.config_json import ConfigJson
+
+log = logging.getLogger(__name__)
+
+
+class ScanIndex:
+    """Persistent index of the folders scanned in a bioinformatics analysis folder
+
+    For each folder the index keeps its modification time, the names of its
+    files and subfolders and the topics matched by each file. On later runs a folder is only listed again if its modification time
+    changed (files were added, removed or renamed in it), otherwise its cached
+    content and file classification are reused. Classifications are discarded
+    when the file name patterns change.
+
+    The index is saved as json in ~/.relecov_tools/cache, so the analysis folder
+    is never modified by the scan.
+    """
+
+    _cache_dir = os.path.join(os.path.dirname(ConfigJson._extra_config_path), "cache")
+    # Folders modified this close to the previous scan are listed again, as
+    # changes within the filesystem timestamp resolution would go unnoticed
+    racy_seconds = 2
+
+    def __init__(self, input_folder: str, patterns: dict, force_rescan: bool = False):
+        self.input_folder = os.path.realpath(input_folder)
+        self.scanned_folder = os.path.abspath(input_folder)
+        self.patterns_hash = hashlib.sha256(
+            json.dumps(patterns, sort_keys=True).encode()
+        ).hexdigest()
+        self.scan_start = time.time_ns()
+        self.folders = {}
+        self.new_folders = {}
+        self.reused = 0
+        self.listed = 0
+        if not force_rescan:
+            self._load()
+
+    @property
+    def cache_path(self) -> str:
+        folder_hash = hashlib.md5(self.input_folder.encode()).hexdigest()[:16]
+        return os.path.join(self._cache_dir, f"scan_index_{folder_hash}.json")
+
+    def _load(self):
+        """Load the index of a previous scan, if any"""
+        try:
+            with open(self.cache_path, "r") as fh:
+                index = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if not isinstance(index, dict) or index.get("folder") != self.input_folder:
+            return
+        self.folders = index.get("folders", {})
+        trusted_mtime = index.get("scan_start", 0) - self.racy_seconds * 10**9
+        for folder_data in self.folders.values():
+            if folder_data["mtime"] >= trusted_mtime:
+                folder_data["mtime"] = None
+            if index.get("patterns_hash") != self.patterns_hash:
+                folder_data.pop("topics", None)
+        log.debug(f"Loaded scan index {self.cache_path}")
+        return
+
+    def _relpath(self, folder: str) -> str:
+        return os.path.relpath(folder, self.scanned_folder)
+
+    def list_folder(self, folder: str, lister) -> tuple[list[str], list[str]]:
+        """List a folder using the index if it did not change since last scan.
+        Safe to call from several threads for different folders.
+
+        Args:
+            folder (str): Path to the folder
+            lister (function): Called as lister(folder) when the folder needs to
+            be listed, returning ([file names], [subfolder names])
+
+        Returns:
+            files (list(str)): Names of the files in the folder
+            subfolders (list(str)): Paths to the subfolders to be scanned
+        """
+        rel_folder = self._relpath(folder)
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return [], []
+        folder_data = self.folders.get(rel_folder)
+        if folder_data is None or folder_data["mtime"] != mtime:
+            file_names, subfolder_names = lister(folder)
+            folder_data = {
+                "mtime": mtime,
+                "files": file_names,
+                "subfolders": subfolder_names,
+            }
+            self.listed += 1
+        else:
+            self.reused += 1
+        self.new_folders[rel_folder] = folder_data
+        subfolders = [os.path.join(folder, x) for x in folder_data["subfolders"]]
+        return list(folder_data["files"]), subfolders
+
+    def get_topics(self, folder: str) -> dict | None:
+        """Get the topics matched by each file of a folder in a previous run.
+        None if they are not known for the current file patterns.
+        """
+        folder_data = self.new_folders.get(self._relpath(folder))
+        if folder_data is None:
+            return None
+        return folder_data.get("topics")
+
+    def set_topics(self, folder: str, topics: dict):
+        """Store the topics matched by each file of a folder"""
+        folder_data = self.new_folders.get(self._relpath(folder))
+        if folder_data is not None:
+            folder_data["topics"] = topics
+        return
+
+    def save(self):
+        """Save the index with the folders found in this scan in the cache folder.
+        Failures are not fatal, the next scan will list every folder again.
+        """
+        index = {
+            "folder": self.input_folder,
+            "scan_start": self.scan_start,
+            "patterns_hash": self.patterns_hash,
+            "folders": self.new_folders,
+        }
+        index_path = self.cache_path
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(tmp_path, "w") as fh:
+                json.dump(index, fh, separators=(",", ":"))
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            log.warning(f"Could not save scan index {index_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        log.info(
+            f"Scan index saved in {index_path}. Listed {self.listed} folders, "
+            f"reused {self.reused} from previous scan"
+        )
+        return
@@ -5,6 +5,7 @@ Common utility function used for relecov_tools package.
 
 import os
 import sys
+import errno
 import glob
 import hashlib
 import logging
@@ -15,9 +16,12 @@ import yaml
 import gzip
 import re
 import shutil
-from itertools import islice, product
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from Bio import SeqIO
 from rich.console import Console
+from rich.progress import Progress
 from rich.table import Table
 from datetime import datetime
 from tabulate import tabulate
@@ -70,10 +74,152 @@ def read_json_file(j_file):
     return data
 
 
+# Flat metadata formats accepted besides the xlsx template, with their separator
+METADATA_TABLE_FORMATS = {".csv": ",", ".tsv": "\t", ".tab": "\t", ".parquet": None}
+
+
+def is_metadata_table(f_name):
+    """Check if the given file is a flat metadata table (csv, tsv or parquet)"""
+    return os.path.splitext(str(f_name))[1].lower() in METADATA_TABLE_FORMATS
+
+
+# Substrings identifying md5 checksum files uploaded along with the samples
+MD5_FILE_FLAGS = (".md5", "md5sum", "md5checksum")
+
+
+def is_md5_file(f_name):
+    """Check if the given file is a md5 checksum file"""
+    return any(flag in str(f_name).lower() for flag in MD5_FILE_FLAGS)
+
+
+def table_has_header_flag(f_name, header_flag, max_lines=50):
+    """Check if header_flag is one of the fields in the first lines of a local
+    csv/tsv metadata table, where the header of the metadata is expected."""
+    extension = os.path.splitext(str(f_name))[1].lower()
+    sep = METADATA_TABLE_FORMATS.get(extension)
+    if not sep or not header_flag or not os.path.isfile(f_name):
+        return False
+    try:
+        with open(f_name, encoding="utf-8-sig", errors="replace") as fh:
+            for line in islice(fh, max_lines):
+                fields = [x.strip().strip('"') for x in line.rstrip("\r\n").split(sep)]
+                if header_flag in fields:
+                    return True
+    except OSError:
+        return False
+    return False
+
+
+def is_metadata_file(f_name, header_flag=None):
+    """Check if the given file is a metadata excel template or flat metadata table.
+    md5 checksum files are never considered metadata. Flat tables must include
+    'metadata' in their name or, if header_flag is given and the file is local,
+    contain the header_flag in their first lines.
+    """
+    if is_md5_file(f_name):
+        return False
+    if str(f_name).lower().endswith(".xlsx"):
+        return True
+    if not is_metadata_table(f_name):
+        return False
+    if "metadata" in os.path.basename(str(f_name)).lower():
+        return True
+    return table_has_header_flag(f_name, header_flag)
+
+
+def read_metadata_table_df(f_name, header_flag):
+    """Read a csv/tsv/parquet metadata file into a DataFrame with the columns
+    named after the row containing header_flag, as done for the excel template.
+    If header_flag is already one of the column names (e.g. parquet files or
+    csv without extra rows above the header) the first row is taken as header.
+
+    Args:
+        f_name (str): Path to the metadata file
+        header_flag (str): Value used to locate the header row
+
+    Raises:
+        KeyError: If header_flag could not be found in the file
+        ImportError: If a parquet file is given but no parquet engine is installed
+
+    Returns:
+        meta_df (pandas.DataFrame): Metadata rows below the header
+        heading_row (int): Row where the header is located in the file (1-based)
+    """
+    extension = os.path.splitext(str(f_name))[1].lower()
+    meta_df = None
+    if extension == ".parquet":
+        try:
+            raw_df = pd.read_parquet(f_name)
+        except ImportError as e:
+            raise ImportError(
+                f"Reading {os.path.basename(f_name)} requires pyarrow. "
+                f"Install it with 'pip install relecov-tools[parquet]': {e}"
+            )
+        if header_flag in raw_df.columns:
+            heading_row = 1
+            meta_df = raw_df
+        else:
+            raw_df = pd.concat(
+                [raw_df.columns.to_frame().T, raw_df], ignore_index=True
+            ).astype(object)
+            raw_df.columns = range(raw_df.shape[1])
+    else:
+        raw_df = pd.read_csv(
+            f_name,
+            sep=METADATA_TABLE_FORMATS.get(extension, ","),
+            header=None,
+            dtype=str,
+            keep_default_na=False,
+            na_values=[""],
+            skip_blank_lines=False,
+            encoding="utf-8-sig",
+        )
+    if meta_df is None:
+        header_mask = (raw_df == header_flag).any(axis=1)
+        if not header_mask.any():
+            raise KeyError(
+                f"Header flag '{header_flag}' could not be found in {f_name}"
+            )
+        header_idx = int(header_mask.to_numpy().argmax())
+        heading_row = header_idx + 1
+        meta_df = raw_df.iloc[header_idx + 1 :]
+        meta_df.columns = raw_df.iloc[header_idx].tolist()
+    heading = [
+        col for col in meta_df.columns if pd.notna(col) and str(col).strip() != ""
+    ]
+    meta_df = meta_df.loc[:, heading]
+    meta_df.columns = [str(col).strip() for col in heading]
+    meta_df = meta_df.dropna(how="all").reset_index(drop=True)
+    return meta_df, heading_row
+
+
+def read_metadata_table(f_name, header_flag, leave_empty=True):
+    """Read a csv/tsv/parquet metadata file and return the data in the same format
+    as read_excel_file, a list of dictionaries {header: value} for each row.
+    """
+    meta_df, heading_row = read_metadata_table_df(f_name, header_flag)
+    if leave_empty:
+        empty_value = None
+    else:
+        empty_value = relecov_tools.config_json.ConfigJson(
+            extra_config=True
+        ).get_topic_data("generic", "not_provided_field")
+    meta_df = meta_df.astype(object).where(meta_df.notna(), empty_value)
+    return meta_df.to_dict(orient="records"), heading_row
+
+
 def read_excel_file(f_name, sheet_name, header_flag, leave_empty=True):
     """Read the input excel file and return the data as a list of dictionaries.
     If openpyxl fails, fall back to pandas but return in the same format.
+    Flat csv/tsv/parquet metadata files are also accepted, sheet_name is then ignored.
     """
+    if is_metadata_table(f_name):
+        return read_metadata_table(f_name, header_flag, leave_empty=leave_empty)
+    empty_value = None
+    if not leave_empty:
+        empty_value = relecov_tools.config_json.ConfigJson(
+            extra_config=True
+        ).get_topic_data("generic", "not_provided_field")
     try:
         wb_file = openpyxl.load_workbook(f_name, data_only=True)
         ws_metadata_lab = wb_file[sheet_name]
@@ -98,13 +244,7 @@ def read_excel_file(f_name, sheet_name, header_flag, leave_empty=True):
             data_row = {}
             for idx in range(0, len(heading)):
                 if l_row[idx] is None:
-                    data_row[heading[idx]] = (
-                        None
-                        if leave_empty
-                        else relecov_tools.config_json.ConfigJson(
-                            extra_config=True
-                        ).get_topic_data("generic", "not_provided_field")
-                    )
+                    data_row[heading[idx]] = empty_value
                 else:
                     data_row[heading[idx]] = l_row[idx]
             ws_data.append(data_row)
@@ -130,13 +270,7 @@ def read_excel_file(f_name, sheet_name, header_flag, leave_empty=True):
                 for idx in range(len(heading)):
                     val = row.iloc[idx] if idx < len(row) else None
                     if pd.isna(val):
-                        data_row[heading[idx]] = (
-                            None
-                            if leave_empty
-                            else relecov_tools.config_json.ConfigJson(
-                                extra_config=True
-                            ).get_topic_data("generic", "not_provided_field")
-                        )
+                        data_row[heading[idx]] = empty_value
                     else:
                         data_row[heading[idx]] = val
                 ws_data.append(data_row)
@@ -151,43 +285,54 @@ def read_excel_file(f_name, sheet_name, header_flag, leave_empty=True):
             )
 
 
+# Dates written without separators ("20200807" or "20200807:1200")
+COMPACT_DATE_REGEX = re.compile(r"^[\d:]+")
+# Year followed by up to five 2-digit fields (month, day, hour, minute, second)
+SEPARATED_DATE_REGEX = re.compile(r"^(\d{4})((?:[ /\-_:]\d{2}){0,5})")
+DATE_FIELD_REGEX = re.compile(r"([ /\-_:])(\d{2})")
+
+
+@functools.lru_cache(maxsize=4096)
 def string_to_date(string):
-    """Convert date (Y-M-D...) from string to date. Tries iteratively with variable
-    number of digits and multiple separators, starting from seconds up to year.
+    """Convert date (Y-M-D...) from string to date. Takes the longest prefix of
+    2-digit fields after the year, either without separators or separated by the
+    same character (" ", "/", "-" or "_", ":" is accepted in any position), up to
+    seconds. Fields that do not make a valid date are dropped from the last one.
+    Results are cached as the same folder names are parsed several times.
     args:
         string (str): Date in string format to be parsed: e.g. 2020-08-07-12-00-00
     returns:
         res_date (datetime.datetime): String converted to date format
     """
-
-    def rec_date_extraction(string, digits, sep):
-        regex = r"^\d{4}"  # The string should start from year
-        for _ in range(0, digits - 4, 2):
-            new_reg = sep + "\d{2}"  # Each date param occupies 2 digits (4 for year)
-            regex = regex + new_reg
-        match = re.match(regex, string)
-        if not match:
-            match = re.match(regex, string.replace(":", sep))
-            if not match:
-                raise ValueError(f"Could not match date to given string: {string}")
-        matchdate = match.group(0)
-        # Getting the equivalent format from given digits
-        full_date = "%Y%m%d%H%M%S"[0 : digits - 2]
-        datepattern = f"{sep}%".join(full_date.split("%")).strip(sep)
-        res_date = datetime.strptime(matchdate, datepattern)
-        return res_date
-
-    seps = ["", " ", "/", "-", "_"]
-    digits_list = [x for x in range(4, 16, 2)]
-    combinations = sorted(product(digits_list, seps), reverse=True)
-    for digits, sep in combinations:
+    date_fields = []
+    compact = COMPACT_DATE_REGEX.match(string)
+    if compact:
+        digits = compact.group(0).replace(":", "")[:14]
+        if len(digits) >= 4:
+            date_fields = [int(digits[0:4])] + [
+                int(digits[idx : idx + 2]) for idx in range(4, len(digits) - 1, 2)
+            ]
+    separated = SEPARATED_DATE_REGEX.match(string)
+    if separated:
+        sep_fields = [int(separated.group(1))]
+        used_sep = None
+        for sep, value in DATE_FIELD_REGEX.findall(separated.group(2)):
+            if sep != ":":
+                if used_sep is None:
+                    used_sep = sep
+                elif sep != used_sep:
+                    break
+            sep_fields.append(int(value))
+        if len(sep_fields) > len(date_fields):
+            date_fields = sep_fields
+    while date_fields:
+        # Month and day default to 1 as in datetime.strptime
+        fields = date_fields + [1] * (3 - len(date_fields))
         try:
-            res_date = rec_date_extraction(string, digits, sep)
+            return datetime(*fields)
         except ValueError:
-            continue
-        return res_date
-    else:
-        return None
+            date_fields.pop()
+    return None
 
 
 def excel_date_to_num(date):
@@ -198,24 +343,52 @@ def excel_date_to_num(date):
         return None
 
 
-def read_csv_file_return_dict(file_name, sep=None, key_position=0):
+def read_csv_file_return_dict(file_name, sep=None, key_position=0, columns=None):
     """Read csv or tsv file, according to separator (sep), and return a dictionary
     where the main key is the first column, if key position is None otherwise
     the index value of the key position is used as key. If sep is None then
     try to assert a separator automatically depending on file extension.
+    Gzip compressed tables (e.g. table.tsv.gz) are also accepted. If columns is
+    given, only those columns (and the key column) are read from the file,
+    columns missing in the file are ignored.
     """
     if sep is None:
-        file_extension = os.path.splitext(file_name)[1]
+        file_extension = os.path.splitext(str(file_name).removesuffix(".gz"))[1]
         extdict = {".csv": ",", ".tsv": "\t", ".tab": "\t"}
         # Use space as a default separator, None would also be valid
         sep = extdict.get(file_extension, " ")
+    usecols = None
+    if columns is not None:
+        header = pd.read_csv(file_name, sep=sep, nrows=0).columns
+        key_column = header[key_position]
+        usecols = [key_column] + [x for x in dict.fromkeys(columns) if x in header]
+        usecols = list(dict.fromkeys(usecols))
     try:
         # Read all columns as strings to avoid parsing IDs as float buy try to infer datatypes afterwards
-        file_df = pd.read_csv(file_name, sep=sep, dtype="string").convert_dtypes()
+        file_df = pd.read_csv(
+            file_name, sep=sep, dtype="string", usecols=usecols
+        ).convert_dtypes()
     except FileNotFoundError:
         raise
-    key_column = file_df.columns[key_position]
-    file_data = file_df.set_index(key_column).to_dict(orient="index")
+    if usecols is not None:
+        # usecols does not keep the given order
+        file_df = file_df[usecols]
+    key_column = file_df.columns[key_position if usecols is None else 0]
+    sample_keys = file_df[key_column].tolist()
+    if len(set(sample_keys)) != len(sample_keys):
+        raise ValueError("DataFrame index must be unique for orient='index'.")
+    value_columns = [x for x in file_df.columns if x != key_column]
+    # Missing values are returned as None, same as DataFrame.to_dict()
+    column_values = [
+        file_df[col].astype(object).where(file_df[col].notna(), None).tolist()
+        for col in value_columns
+    ]
+    file_data = {
+        sample_key: dict(zip(value_columns, row_values))
+        for sample_key, row_values in zip(sample_keys, zip(*column_values))
+    }
+    if not value_columns:
+        file_data = {sample_key: {} for sample_key in sample_keys}
     return file_data
 
 
@@ -302,9 +475,98 @@ def delete_local_folder(folder):
     return True
 
 
-def calculate_md5(file_name):
-    """Calculate the md5 value for the file name"""
-    return hashlib.md5(open(file_name, "rb").read()).hexdigest()
+def calculate_md5(file_name, chunk_size=4 * 1024 * 1024):
+    """Calculate the md5 value for the file name reading it in chunks"""
+    md5_hash = hashlib.md5()
+    with open(file_name, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            md5_hash.update(chunk)
+    return md5_hash.hexdigest()
+
+
+# ioctl request to share the data blocks of a file with another one (Linux)
+FICLONE = 0x40049409
+EXTRACT_MODES = ("copy", "hardlink", "reflink", "symlink")
+
+
+def _reflink_file(src, dst):
+    """Clone src into dst sharing its data blocks. Only works on filesystems
+    with copy-on-write support (btrfs, xfs, ...)"""
+    import fcntl
+
+    with open(src, "rb") as src_fh, open(dst, "xb") as dst_fh:
+        try:
+            fcntl.ioctl(dst_fh.fileno(), FICLONE, src_fh.fileno())
+        except OSError:
+            dst_fh.close()
+            os.remove(dst)
+            raise
+
+
+def extract_file(src, dst, mode="copy"):
+    """Place src file in dst as a hardlink, reflink, symlink or copy. If the
+    given mode is not possible (e.g. src and dst are in different filesystems)
+    the file is copied instead.
+
+    Args:
+        src (str): Path to the file to be extracted
+        dst (str): Path of the extracted file
+        mode (str, optional): One of EXTRACT_MODES. Defaults to "copy".
+
+    Returns:
+        used_mode (str): Mode finally used to extract the file
+    """
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"Unknown extract mode {mode}. Use one of {EXTRACT_MODES}")
+    try:
+        if mode == "hardlink":
+            os.link(src, dst)
+        elif mode == "reflink":
+            _reflink_file(src, dst)
+        elif mode == "symlink":
+            os.symlink(os.path.realpath(src), dst)
+        else:
+            shutil.copy(src, dst)
+        return mode
+    except (ImportError, OSError) as e:
+        # Missing source or existing destination would also make the copy fail
+        unrecoverable = getattr(e, "errno", None) in (errno.ENOENT, errno.EEXIST)
+        if mode == "copy" or unrecoverable:
+            raise
+        log.debug("Could not %s %s, copying it instead: %s", mode, src, e)
+    shutil.copy(src, dst)
+    return "copy"
+
+
+def calculate_md5_batch(file_list, threads=4, description="Generating md5 hashes"):
+    """Calculate the md5 value for each file in the list using a pool of threads,
+    showing a progress bar while hashing.
+
+    Args:
+        file_list (list(str)): Paths of the files to be hashed
+        threads (int, optional): Number of files hashed at the same time. Defaults to 4.
+        description (str, optional): Text shown in the progress bar.
+
+    Returns:
+        md5_results (dict(str:str)): {file_path: md5_hash}. Hash is None for
+        files that could not be read
+    """
+    md5_results = {}
+    if not file_list:
+        return md5_results
+    with ThreadPoolExecutor(max_workers=max(1, int(threads))) as executor:
+        futures = {executor.submit(calculate_md5, file): file for file in file_list}
+        with Progress(console=stderr, transient=True) as progress:
+            task = progress.add_task(description, total=len(futures))
+            for future in as_completed(futures):
+                file = futures[future]
+                try:
+                    md5_results[file] = future.result()
+                except OSError as e:
+                    log.error("Could not generate md5 hash for %s: %s", file, e)
+                    md5_results[file] = None
+                progress.advance(task)
+    return md5_results
 
 
 def write_md5_file(file_name, md5_value):
@@ -343,6 +605,87 @@ def write_json_to_file(data, file_name):
     return True
 
 
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+def is_ndjson_file(j_file):
+    """Check if the file has a newline delimited json extension"""
+    return str(j_file).lower().endswith(NDJSON_EXTENSIONS)
+
+
+def iter_json_records(j_file, buffer_size=1 << 20):
+    """Read records one by one from a json file containing a list, or from a
+    NDJSON file (one record per line), without loading the whole file.
+
+    Args:
+        j_file (str): Path to the json/ndjson file
+        buffer_size (int, optional): Characters read at once. Defaults to 1MB.
+
+    Raises:
+        ValueError: If the file content is not valid json
+
+    Yields:
+        record: Each element of the list or each line of the NDJSON file
+    """
+    decoder = json.JSONDecoder()
+    with open(j_file, "r", encoding="utf-8") as fh:
+        buffer = fh.read(buffer_size).lstrip()
+        if not buffer.startswith("["):
+            # NDJSON: one json record per line
+            fh.seek(0)
+            for line_num, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(
+                        f"Invalid json in line {line_num} of {j_file}: {e}"
+                    )
+            return
+        pos = 1
+        eof = False
+        while True:
+            # Skip whitespaces and separators until next record or end of list
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    raise ValueError(f"Unexpected end of json list in {j_file}")
+                chunk = fh.read(buffer_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                record = end = None
+            if end is None or (end == len(buffer) and not eof):
+                # Record is incomplete, read more data and try again
+                if eof:
+                    raise ValueError(f"Invalid json record in {j_file}")
+                chunk = fh.read(buffer_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield record
+            pos = end
+
+
+def iter_chunks(iterable, chunk_size):
+    """Group the elements of an iterable in lists of chunk_size elements"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
 def compress_file(file):
     """compress a given file with gzip, adding .gz extension afterwards
 
@@ -5,16 +5,22 @@ from jsonschema import Draft202012Validator, FormatChecker
 import os
 import re
 import openpyxl
+from copy import copy
 from datetime import datetime
-from collections import defaultdict
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
 import relecov_tools.utils
 import relecov_tools.assets.schema_utils.jsonschema_draft
 import relecov_tools.assets.schema_utils.custom_validators
+import relecov_tools.assets.schema_utils.fast_validator
 import relecov_tools.sftp_client
 from relecov_tools.config_json import ConfigJson
 from relecov_tools.base_module import BaseModule
 from relecov_tools.rest_api import RestApi
+from relecov_tools.validation_cache import ValidationCache
 
 stderr = rich.console.Console(
     stderr=True,
@@ -23,6 +29,72 @@ stderr = rich.console.Console(
     force_terminal=relecov_tools.utils.rich_force_colors(),
 )
 
+# Parallel validation is only worth it above this number of samples per process
+MIN_SAMPLES_PER_PROCESS = 50
+# Number of samples held in memory at once when validating in streaming mode
+STREAM_CHUNK_SIZE = 1000
+
+
+class ValidationErrors:
+    """Compact aggregation of the errors found during validation.
+    Each error text is stored once together with its field, and the samples
+    failing with it are kept as an array of indexes to the list of failed sample
+    IDs, so an error repeated in thousands of samples does not create thousands
+    of entries. Sample lists are only built when reading the errors.
+    """
+
+    def __init__(self):
+        self.sample_ids = []
+        self.fields = {}
+        self.sample_indexes = {}
+
+    def __bool__(self):
+        return bool(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def add_sample(self, sample_id, error_records):
+        """Add the error records (error_text, error_field) of a failed sample"""
+        sample_idx = len(self.sample_ids)
+        self.sample_ids.append(sample_id)
+        for error_text, error_field in error_records:
+            indexes = self.sample_indexes.get(error_text)
+            if indexes is None:
+                indexes = self.sample_indexes[error_text] = array("I")
+            self.fields[error_text] = error_field
+            indexes.append(sample_idx)
+        return
+
+    def update(self, other):
+        """Add the errors of another ValidationErrors after the current ones"""
+        offset = len(self.sample_ids)
+        self.sample_ids.extend(other.sample_ids)
+        for error_text, other_indexes in other.sample_indexes.items():
+            indexes = self.sample_indexes.get(error_text)
+            if indexes is None:
+                indexes = self.sample_indexes[error_text] = array("I")
+            self.fields[error_text] = other.fields[error_text]
+            indexes.extend(idx + offset for idx in other_indexes)
+        return
+
+    def get_samples(self, error_text):
+        """Get the IDs of the samples that failed with the given error"""
+        sample_ids = self.sample_ids
+        return [sample_ids[idx] for idx in self.sample_indexes[error_text]]
+
+    def items(self):
+        """Iterate over (error_text, error_field, failed_sample_ids) in order"""
+        for error_text, error_field in self.fields.items():
+            yield error_text, error_field, self.get_samples(error_text)
+
+    def to_dict(self):
+        """Errors as {"fields": {error: field}, "samples": {error: [samples]}}"""
+        return {
+            "fields": dict(self.fields),
+            "samples": {error_text: samples for error_text, _, samples in self.items()},
+        }
+
 
 class Validate(BaseModule):
     def __init__(
@@ -37,6 +109,8 @@ class Validate(BaseModule):
         check_db=False,
         blocked_filenames=None,
         samples_json=None,
+        threads=1,
+        stream=False,
     ):
         """Validate json file against the schema"""
         super().__init__(output_dir=output_dir, called_module=__name__)
@@ -74,10 +148,31 @@ class Validate(BaseModule):
         self.json_data_file = json_file
         out_path = os.path.dirname(os.path.realpath(self.json_data_file))
 
-        stderr.print("[blue] Reading the json file")
-        self.log.info("Reading the json file")
-        self.json_data = relecov_tools.utils.read_json_file(json_file)
-        if not isinstance(self.json_data, list):
+        # NDJSON files are always validated in streaming mode
+        self.stream = stream or relecov_tools.utils.is_ndjson_file(json_file)
+        if self.stream:
+            if upload_files or check_db or logsum_file:
+                raise ValueError(
+                    "Streaming validation is not compatible with upload_files, "
+                    "check_db or logsum_file options"
+                )
+            stderr.print("[blue] Json file will be validated in streaming mode")
+            self.log.info("Json file will be validated in streaming mode")
+            try:
+                first_sample = next(
+                    relecov_tools.utils.iter_json_records(json_file), None
+                )
+            except ValueError as e:
+                raise ValueError(f"Invalid json file content in {json_file}: {e}")
+            # Only the first sample is loaded to get batch_id and lab_code
+            self.json_data = None
+            json_sample = [first_sample] if first_sample is not None else []
+        else:
+            stderr.print("[blue] Reading the json file")
+            self.log.info("Reading the json file")
+            self.json_data = relecov_tools.utils.read_json_file(json_file)
+            json_sample = self.json_data
+        if not isinstance(json_sample, list):
             stderr.print(f"[red]Invalid json file content in {json_file}.")
             stderr.print("Should be a list of dicts. Create it with read-lab-metadata")
             self.log.error(f"[red]Invalid json file content in {json_file}.")
@@ -86,20 +181,20 @@ class Validate(BaseModule):
             )
             raise TypeError(f"Invalid json file content in {json_file}")
         try:
-            batch_id = self.get_batch_id_from_data(self.json_data)
+            batch_id = self.get_batch_id_from_data(json_sample)
         except ValueError:
             raise ValueError(f"Provided json file {json_file} is empty")
         except AttributeError as e:
             raise ValueError(f"Invalid json file content in {json_file}: {e}")
         try:
             unique_institutions = set(
-                [x.get("submitting_institution_id") for x in self.json_data]
+                [x.get("submitting_institution_id") for x in json_sample]
             )
             if len(unique_institutions) > 1:
                 self.log.warning(
                     f"All samples in {json_file} should be from the same submitting institution. Found {unique_institutions}"
                 )
-            self.lab_code = self.json_data[0]["submitting_institution_id"]
+            self.lab_code = json_sample[0]["submitting_institution_id"]
             self.log.info(f"Laboratory code set to {self.lab_code}")
         except Exception as e:
             self.log.warning(f"Could not extract lab_code from json_data: {e}")
@@ -114,6 +209,7 @@ class Validate(BaseModule):
         self.logsum_file = logsum_file
         self.upload_files = upload_files
         self.check_db = check_db
+        self.threads = threads or 1
         raw_blocked = blocked_filenames or []
         self.blocked_filenames = {
             os.path.basename(x) for x in raw_blocked if isinstance(x, str)
@@ -241,9 +337,375 @@ class Validate(BaseModule):
             raise ValueError(error_text)
         return sample_id_field
 
+    @staticmethod
+    def build_validator(json_schema, date_range=None):
+        """Create the validator used for the samples
+
+        Args:
+            json_schema (dict): Loaded JSON schema as a dictionary
+            date_range (tuple(datetime.date), optional): (start, end) dates accepted
+            in date fields. Any valid date is accepted if not given.
+
+        Returns:
+            validator (Draft202012Validator): Validator with format checks enabled
+        """
+        if date_range:
+            format_checker = (
+                relecov_tools.assets.schema_utils.custom_validators.make_date_checker(
+                    *date_range
+                )
+            )
+        else:
+            format_checker = FormatChecker()
+        validator_class = (
+            relecov_tools.assets.schema_utils.custom_validators.extend_with_exceptions(
+                Draft202012Validator
+            )
+        )
+        return validator_class(json_schema, format_checker=format_checker)
+
+    @staticmethod
+    def get_property_label(schema_props, error_field):
+        """Extract the label for the given property given a list of schema properties"""
+        try:
+            err_field_label = schema_props[error_field]["label"]
+        except KeyError:
+            return error_field
+        return err_field_label
+
+    @staticmethod
+    def is_compilable_validator(validator):
+        """Only standard validators can use the checks compiled from the schema"""
+        supported_validators = (
+            Draft202012Validator,
+            relecov_tools.assets.schema_utils.custom_validators.extend_with_exceptions(
+                Draft202012Validator
+            ),
+        )
+        return type(validator) in supported_validators
+
+    @staticmethod
+    def get_fast_check(json_schema, validator):
+        """Get the compiled fast-path check for the given schema and validator.
+        Only standard validators can be compiled, None is returned otherwise.
+        """
+        if not Validate.is_compilable_validator(validator):
+            return None
+        return relecov_tools.assets.schema_utils.fast_validator.get_fast_checker(
+            json_schema, validator.format_checker
+        )
+
+    @staticmethod
+    def get_property_checks(json_schema, validator):
+        """Get the compiled per-property checks for the given schema and validator.
+        Only standard validators can be compiled, None is returned otherwise.
+        """
+        if not Validate.is_compilable_validator(validator):
+            return None
+        return relecov_tools.assets.schema_utils.fast_validator.get_property_checkers(
+            json_schema, validator.format_checker
+        )
+
+    @staticmethod
+    def prevalidate_columns(json_data, property_checks):
+        """Check the values of each compiled property column by column. Each
+        distinct value of a column is only checked once, as most columns have a
+        few repeated values (enums, dates, placeholders...).
+
+        Args:
+            json_data (list(dict)): List of samples with processed metadata
+            property_checks (dict): {property: is_invalid(value)} from
+            get_property_checks()
+
+        Returns:
+            valid_properties (list(set)): Properties of each sample whose value
+            would not raise any error in the jsonschema validation.
+        """
+        valid_properties = [set() for _ in json_data]
+        for prop_name, is_invalid in property_checks.items():
+            checked_values = {}
+            for sample_props, item_row in zip(valid_properties, json_data):
+                if prop_name not in item_row:
+                    continue
+                value = item_row[prop_name]
+                # Type is part of the key as 1, 1.0 and True are equal in python
+                value_key = (type(value), value)
+                try:
+                    invalid = checked_values[value_key]
+                except KeyError:
+                    invalid = checked_values[value_key] = is_invalid(value)
+                except TypeError:
+                    # Unhashable values like lists or dicts
+                    invalid = is_invalid(value)
+                if not invalid:
+                    sample_props.add(prop_name)
+        return valid_properties
+
+    @staticmethod
+    def iter_property_errors(validator, prop_name, subschema, value, memo=None):
+        """Validate the value of a property. Errors of string values are stored in
+        memo and copied for other samples with the same value, as the same wrong
+        value is usually repeated in many samples of a batch.
+        """
+        if memo is None or type(value) is not str:
+            yield from validator.descend(
+                value, subschema, path=prop_name, schema_path=prop_name
+            )
+            return
+        memo_key = (prop_name, value)
+        if memo_key not in memo:
+            memo[memo_key] = list(
+                validator.descend(
+                    value, subschema, path=prop_name, schema_path=prop_name
+                )
+            )
+        for error in memo[memo_key]:
+            # Errors are modified later, so each sample gets its own copy
+            error_copy = copy(error)
+            error_copy.path = error_copy.relative_path = deque(error.relative_path)
+            error_copy.schema_path = error_copy.relative_schema_path = deque(
+                error.relative_schema_path
+            )
+            yield error_copy
+
+    @staticmethod
+    def get_structural_validators(validator):
+        """Split the validator in two validators for the keywords placed before
+        and after "properties" in the schema. Keywords that validate nothing
+        ($defs, $id...) are kept in both so references are still resolved.
+
+        Args:
+            validator (jsonschema.Validator()): Validator used for the samples
+
+        Returns:
+            structural_validators (tuple): (validator for keywords before
+            "properties", validator for keywords after it), or None if the
+            schema cannot be split
+        """
+        schema = validator.schema
+        keywords = list(schema)
+        if "properties" not in schema or "unevaluatedProperties" in schema:
+            return None
+        prop_idx = keywords.index("properties")
+        # additionalProperties needs the property names, but not their schemas
+        props_stub = {prop_name: True for prop_name in schema["properties"]}
+
+        def sub_validator(sub_keywords):
+            sub_schema = {
+                keyword: value
+                for keyword, value in schema.items()
+                if keyword in sub_keywords or keyword not in validator.VALIDATORS
+            }
+            if "additionalProperties" in sub_schema:
+                sub_schema["properties"] = props_stub
+            return validator.evolve(schema=sub_schema)
+
+        return (
+            sub_validator(keywords[:prop_idx]),
+            sub_validator(keywords[prop_idx + 1 :]),
+        )
+
+    @staticmethod
+    def iter_sample_errors(item_row, validator, valid_properties=(), memo=None):
+        """Same as validator.iter_errors(item_row), yielding the same errors in the
+        same order, but without validating the properties already known as valid.
+        Properties are validated one by one and the rest of keywords with the
+        validators from get_structural_validators().
+
+        Args:
+            item_row (dict): Sample with processed metadata
+            validator (jsonschema.Validator()): Validator used for the sample
+            valid_properties (set, optional): Properties whose value is valid
+            memo (dict, optional): Errors of each property value already found in
+            other samples, see iter_property_errors(), and structural validators
+
+        Yields:
+            error (jsonschema.ValidationError): Each error found in the sample
+        """
+        if valid_properties is None or not isinstance(item_row, dict):
+            yield from validator.iter_errors(item_row)
+            return
+        if memo is None:
+            memo = {}
+        if "structural_validators" not in memo:
+            memo["structural_validators"] = Validate.get_structural_validators(
+                validator
+            )
+        structural_validators = memo["structural_validators"]
+        if structural_validators is None:
+            yield from validator.iter_errors(item_row)
+            return
+        before_validator, after_validator = structural_validators
+        yield from before_validator.iter_errors(item_row)
+        # Same as jsonschema "properties" keyword, skipping valid ones
+        for prop_name, subschema in validator.schema["properties"].items():
+            if prop_name not in item_row or prop_name in valid_properties:
+                continue
+            for error in Validate.iter_property_errors(
+                validator, prop_name, subschema, item_row[prop_name], memo
+            ):
+                error.schema_path.appendleft("properties")
+                yield error
+        yield from after_validator.iter_errors(item_row)
+
+    @staticmethod
+    def get_samples_errors(
+        json_data, json_schema, validator, fast_check=None, property_checks=None
+    ):
+        """Validate a list of samples and format their errors. Samples failing
+        fast_check are prevalidated column by column with property_checks, so the
+        jsonschema validation only goes through their invalid properties and the
+        structural rules of the schema (required, anyOf...).
+
+        Args:
+            json_data (list(dict)): List of samples with processed metadata
+            json_schema (dict): Loaded JSON schema as a dictionary
+            validator (jsonschema.Validator()): Validator used for the samples
+            fast_check (function, optional): Compiled check from get_fast_check()
+            property_checks (dict, optional): Compiled checks from get_property_checks()
+
+        Returns:
+            samples_errors (list(list)): Error records of each sample, same as
+            get_sample_errors()
+        """
+        if fast_check is not None:
+            failed_idx = [
+                idx
+                for idx, item_row in enumerate(json_data)
+                if not fast_check(item_row)
+            ]
+        else:
+            failed_idx = list(range(len(json_data)))
+        samples_errors = [[] for _ in json_data]
+        failed_samples = [json_data[idx] for idx in failed_idx]
+        if property_checks:
+            valid_properties = Validate.prevalidate_columns(
+                failed_samples, property_checks
+            )
+        else:
+            valid_properties = [None] * len(failed_samples)
+        memo = {}
+        for idx, item_row, sample_props in zip(
+            failed_idx, failed_samples, valid_properties
+        ):
+            samples_errors[idx] = Validate.get_sample_errors(
+                item_row,
+                json_schema,
+                validator,
+                valid_properties=sample_props,
+                memo=memo,
+            )
+        return samples_errors
+
+    @staticmethod
+    def get_sample_errors(
+        item_row,
+        json_schema,
+        validator,
+        fast_check=None,
+        valid_properties=None,
+        memo=None,
+    ):
+        """Validate a single sample and format its errors
+
+        Args:
+            item_row (dict): Sample with processed metadata
+            json_schema (dict): Loaded JSON schema as a dictionary
+            validator (jsonschema.Validator()): Validator used for the sample
+            fast_check (function, optional): Compiled check from get_fast_check().
+            Samples passing it are valid and skip the jsonschema validation.
+            valid_properties (set, optional): Properties already known as valid
+            from prevalidate_columns(), which are not validated again.
+            memo (dict, optional): Errors already found for the same property
+            values in other samples. See iter_property_errors()
+
+        Returns:
+            error_records (list(tuple)): (error_text, error_field) for each error
+            found in the sample. Empty list if the sample is valid.
+        """
+        if fast_check is not None and fast_check(item_row):
+            return []
+        schema_props = json_schema["properties"]
+        get_property_label = Validate.get_property_label
+        # Collect all errors (don't raise immediately)
+        validation_errors = list(
+            Validate.iter_sample_errors(item_row, validator, valid_properties, memo)
+        )
+
+        # Run the custom validator to check if errors should be ignored
+        validation_errors = relecov_tools.assets.schema_utils.custom_validators.validate_with_exceptions(
+            json_schema, item_row, validation_errors
+        )
+        error_records = []
+        for error in validation_errors:
+            if error.cause:
+                # Probably generated by a custom validator or format_checker
+                error.message = str(error.cause)
+            try:
+                if error.validator == "required":
+                    error_field = list(error.message.split("'"))[1]
+                elif error.validator == "anyOf":
+                    # AnyOf errors include multiple clauses so they need some processing
+                    multi_errdict = {}
+                    for suberror in error.context:
+                        error_type = suberror.validator
+                        suberr_label = get_property_label(
+                            schema_props, suberror.validator_value[0]
+                        )
+                        label_message = suberror.message.replace(
+                            suberror.validator_value[0], suberr_label
+                        )
+                        if suberror.validator in multi_errdict:
+                            multi_errdict[error_type].append(
+                                (suberr_label, label_message)
+                            )
+                        else:
+                            multi_errdict[error_type] = [(suberr_label, label_message)]
+                    error_field = ""
+                    multi_message = {}
+                    # Combine the different error messages from this AnyOf in a single message
+                    for errtype, fieldtups in multi_errdict.items():
+                        failed_fields = " or ".join([t[0] for t in fieldtups])
+                        clean_message = (
+                            fieldtups[0][1].replace(fieldtups[0][0], "").strip("'")
+                        )
+                        if error_field:
+                            error_field = error_field + " and"
+                        error_field = error_field + failed_fields
+                        multi_message[errtype] = f"{failed_fields}: {clean_message}"
+                    # Override error.message with the combination of the sub-messages
+                    error.message = "Any of the following: " + " --- ".join(
+                        multi_message.values()
+                    )
+                elif error.absolute_path:
+                    error_field = str(error.absolute_path[0])
+                else:
+                    error_field = error.validator + " error: " + error.message
+            except Exception as ex:
+                errtxt = (
+                    f"Error extracting error_field from: {error.validator_value}, {ex}"
+                )
+                error_records.append((errtxt, error.validator_value))
+                continue
+
+            # Try to get the human-readable label from the schema
+            err_field_label = get_property_label(schema_props, error_field)
+            # Format the error message
+            error.message = error.message.replace(error_field, err_field_label)
+            error_text = f"Error in column {err_field_label}: {error.message}"
+            error_records.append((error_text, error_field))
+        return error_records
+
     @staticmethod
     def validate_instances(
-        json_data, json_schema, sample_id_field=None, validator=None
+        json_data,
+        json_schema,
+        sample_id_field=None,
+        validator=None,
+        threads=1,
+        date_range=None,
+        index_offset=0,
+        cache=None,
     ):
         """Validate data instances against a validated JSON schema
 
@@ -253,11 +715,22 @@ class Validate(BaseModule):
             sample_id_field (str, optional): Metadata field used as ID to
             identify the samples associated with each error.
             validator (jsonschema.Validator(), optional): Validator with any custom
-            characteristics included. Default is Draft202012Validator()
+            characteristics included. Default is build_validator(json_schema,
+            date_range). Cannot be given with threads > 1.
+            threads (int, optional): Number of processes used to validate the
+            samples. Defaults to 1 (no parallelization).
+            date_range (tuple(datetime.date), optional): (start, end) dates used
+            to build the default validator. Each process builds its own one, as
+            validators cannot be shared between processes.
+            index_offset (int, optional): Position of the first sample in the whole
+            dataset, used to name samples without ID when validating in chunks.
+            cache (ValidationCache, optional): Cache of previous results. Samples
+            found in it are not validated again, and new results are added to it.
 
         Returns:
             validated_json_data (list(dict)): List of successfully validated samples
-            errors (dict): Custom dict used to summarize validation errors.
+            errors (ValidationErrors): Errors found with the samples failing each one.
+            Use errors.to_dict() to get them as:
             '''
                 errors = {
                     "fields": {
@@ -271,119 +744,103 @@ class Validate(BaseModule):
                 }
             '''
         """
-
-        def get_property_label(schema_props, error_field):
-            """Extract the label for the given property given a list of schema properties"""
-            try:
-                err_field_label = schema_props[error_field]["label"]
-            except KeyError:
-                return error_field
-            return err_field_label
-
-        # Create default validator if not given.
-        if not validator:
-            validator = Draft202012Validator(
-                json_schema, format_checker=FormatChecker()
+        if validator is not None and (threads or 1) > 1:
+            raise ValueError(
+                "A custom validator cannot be used with threads > 1, as validators "
+                "cannot be shared between processes. Use date_range instead"
             )
-        schema_props = json_schema["properties"]
-
         validated_json_data = []
-        errors = defaultdict(dict)
+        errors = ValidationErrors()
 
         stderr.print("[blue] Start processing the JSON file")
 
-        # Start validation
-        for idx, item_row in enumerate(json_data):
-            sample_id_value = item_row.get(sample_id_field, f"UnknownSample#{idx}")
-
-            # Collect all errors (don't raise immediately)
-            validation_errors = list(validator.iter_errors(item_row))
+        if cache is not None:
+            sample_hashes = [cache.sample_hash(item_row) for item_row in json_data]
+            cached_errors = [cache.get(sample_hash) for sample_hash in sample_hashes]
+            pending_data = [
+                item_row
+                for item_row, cached in zip(json_data, cached_errors)
+                if cached is None
+            ]
+        else:
+            pending_data = json_data
 
-            # Run the custom validator to check if errors should be ignored
-            validation_errors = relecov_tools.assets.schema_utils.custom_validators.validate_with_exceptions(
-                json_schema, item_row, validation_errors
+        threads = min(
+            threads or 1,
+            os.cpu_count() or 1,
+            len(pending_data) // MIN_SAMPLES_PER_PROCESS,
+        )
+        if threads > 1:
+            # Split samples in ordered chunks, several per process to balance load
+            chunk_size = -(-len(pending_data) // (threads * 4))
+            chunks = [
+                pending_data[idx : idx + chunk_size]
+                for idx in range(0, len(pending_data), chunk_size)
+            ]
+            with ProcessPoolExecutor(
+                max_workers=threads,
+                initializer=_init_validation_worker,
+                initargs=(json_schema, date_range),
+            ) as executor:
+                samples_errors = chain.from_iterable(
+                    executor.map(_validate_samples_chunk, chunks)
+                )
+                samples_errors = list(samples_errors)
+        else:
+            # Create default validator if not given.
+            if not validator:
+                validator = Validate.build_validator(json_schema, date_range)
+            samples_errors = Validate.get_samples_errors(
+                pending_data,
+                json_schema,
+                validator,
+                Validate.get_fast_check(json_schema, validator),
+                Validate.get_property_checks(json_schema, validator),
             )
 
-            if not validation_errors:
+        if cache is not None:
+            # Fill the gaps of the cached results with the new ones, keeping order
+            new_errors = iter(samples_errors)
+            samples_errors = []
+            for sample_hash, cached in zip(sample_hashes, cached_errors):
+                if cached is None:
+                    cached = next(new_errors)
+                    cache.set(sample_hash, cached)
+                samples_errors.append(cached)
+
+        # Merge errors following the order of the samples
+        for idx, (item_row, error_records) in enumerate(zip(json_data, samples_errors)):
+            if not error_records:
                 validated_json_data.append(item_row)
+                continue
+            sample_id_value = item_row.get(
+                sample_id_field, f"UnknownSample#{idx + index_offset}"
+            )
+            errors.add_sample(sample_id_value, error_records)
+        return validated_json_data, errors
 
-            else:
-                # Process remaining errors
-                for error in validation_errors:
-                    if error.cause:
-                        # Probably generated by a custom validator or format_checker
-                        error.message = str(error.cause)
-                    try:
-                        if error.validator == "required":
-                            error_field = list(error.message.split("'"))[1]
-                        elif error.validator == "anyOf":
-                            # AnyOf errors include multiple clauses so they need some processing
-                            multi_errdict = {}
-                            for suberror in error.context:
-                                error_type = suberror.validator
-                                suberr_label = get_property_label(
-                                    schema_props, suberror.validator_value[0]
-                                )
-                                label_message = suberror.message.replace(
-                                    suberror.validator_value[0], suberr_label
-                                )
-                                if suberror.validator in multi_errdict:
-                                    multi_errdict[error_type].append(
-                                        (suberr_label, label_message)
-                                    )
-                                else:
-                                    multi_errdict[error_type] = [
-                                        (suberr_label, label_message)
-                                    ]
-                            error_field = ""
-                            multi_message = {}
-                            # Combine the different error messages from this AnyOf in a single message
-                            for errtype, fieldtups in multi_errdict.items():
-                                failed_fields = " or ".join([t[0] for t in fieldtups])
-                                clean_message = (
-                                    fieldtups[0][1]
-                                    .replace(fieldtups[0][0], "")
-                                    .strip("'")
-                                )
-                                if error_field:
-                                    error_field = error_field + " and"
-                                error_field = error_field + failed_fields
-                                multi_message[errtype] = (
-                                    f"{failed_fields}: {clean_message}"
-                                )
-                            # Override error.message with the combination of the sub-messages
-                            error.message = "Any of the following: " + " --- ".join(
-                                multi_message.values()
-                            )
-                        elif error.absolute_path:
-                            error_field = str(error.absolute_path[0])
-                        else:
-                            error_field = error.validator + " error: " + error.message
-                    except Exception as ex:
-                        errtxt = f"Error extracting error_field from: {error.validator_value}, {ex}"
-                        error_field = str(error)
-                        errors["fields"][errtxt] = error.validator_value
-                        errors["samples"].setdefault(errtxt, []).append(sample_id_value)
-                        continue
-
-                    # Try to get the human-readable label from the schema
-                    err_field_label = get_property_label(schema_props, error_field)
-                    # Format the error message
-                    error.message = error.message.replace(error_field, err_field_label)
-                    error_text = f"Error in column {err_field_label}: {error.message}"
+    @staticmethod
+    def exclude_samples(samples, excluded_samples):
+        """Get the samples not included in excluded_samples, keeping their order.
+        Samples are compared by identity, as every list of valid/invalid samples
+        is built from the same objects in json_data. This keeps the partition
+        linear instead of comparing every pair of dicts.
 
-                    # Log errors for summary
-                    errors["fields"][error_text] = error_field
-                    errors["samples"].setdefault(error_text, []).append(sample_id_value)
+        Args:
+            samples (list(dict)): Samples to be filtered
+            excluded_samples (list(dict)): Samples to be removed
 
-                # Add the invalid row to the list
-        return validated_json_data, errors
+        Returns:
+            filtered_samples (list(dict)): Samples not present in excluded_samples
+        """
+        excluded_ids = {id(sample) for sample in excluded_samples}
+        return [sample for sample in samples if id(sample) not in excluded_ids]
 
     def summarize_errors(self, errors):
         """Summarize errors from validation process and add them to log_summary
 
         Args:
-            errors (dict): Error dict from validate_instances()
+            errors (ValidationErrors): Errors from validate_instances()
         """
 
         def truncate_error_message(error_text, max_length):
@@ -399,25 +856,23 @@ class Validate(BaseModule):
         stderr.print("[blue] --------------------")
         self.log.info("Validation summary:")
         max_length = 250
-        for error_type, failed_samples in errors["samples"].items():
+        for error_type, field_with_error, failed_samples in errors.items():
             count = len(failed_samples)
-            field_with_error = errors["fields"][error_type]
             error_text = f"{count} samples failed validation for {field_with_error}: {error_type}"
             truncated_msg = truncate_error_message(error_text, max_length)
             self.logsum.add_warning(entry=truncated_msg)
-            for failsamp in failed_samples:
-                err_msg = truncate_error_message(error_type, max_length)
-                self.logsum.add_error(sample=failsamp, entry=err_msg)
+            # Same message object is shared by all the failed samples
+            err_msg = truncate_error_message(error_type, max_length)
+            self.logsum.add_sample_errors(entry=err_msg, samples=failed_samples)
             stderr.print(f"[red]{truncated_msg}")
             stderr.print("[red] --------------------")
         return
 
     def create_invalid_metadata(self, invalid_json, metadata, out_folder):
         """Create a new sub excel file having only the samples that were invalid.
-        Samples name are checking the Sequencing sample id which are in
-        column B (index 1).
-        The rows that match the value collected from json file on tag
-        collecting_lab_sample_id are removed from excel
+        Samples are identified by the column labeled as sample_id_field in the
+        schema. The header block and the rows matching the ID of an invalid sample
+        are kept in the original sheet and the rest of rows are removed.
         """
         if self.sample_id_field is None:
             log_text = (
@@ -441,13 +896,13 @@ class Validate(BaseModule):
             raise FileNotFoundError(
                 f"Unable to create excel file for invalid samples. Metadata file {metadata} does not exist"
             )
-        sample_list = []
         stderr.print("Start preparation of invalid samples...")
         self.log.info("Start preparation of invalid samples")
-        for row in invalid_json:
-            sid = row.get(self.sample_id_field)
-            if sid is not None:
-                sample_list.append(str(sid))
+        sample_set = {
+            str(row.get(self.sample_id_field))
+            for row in invalid_json
+            if row.get(self.sample_id_field) is not None
+        }
         wb = openpyxl.load_workbook(metadata)
         try:
             ws_sheet = wb[self.excel_sheet]
@@ -462,53 +917,26 @@ class Validate(BaseModule):
         )
         # Check if mandatory colum ($tag) is defined in metadata.
         try:
-            header_row = [
-                idx + 1
-                for idx, x in enumerate(ws_sheet.values)
-                if any(
-                    isinstance(v, str) and v.strip() == tag for v in x if v is not None
-                )
-            ][0]
-        except IndexError:
+            header_row, id_col = next(
+                (row_idx, col_idx)
+                for row_idx, row in enumerate(ws_sheet.values, start=1)
+                for col_idx, v in enumerate(row)
+                if isinstance(v, str) and v.strip() == tag
+            )
+        except StopIteration:
             self.log.error(
                 f"Column with tag '{tag}' not found in any row of the Excel sheet."
             )
             stderr.print(f"[red]Column with tag '{tag}' not found. Cannot continue.")
-            raise
-        row_to_del = []
-        row_iterator = ws_sheet.iter_rows(
-            min_row=header_row + 1, max_row=ws_sheet.max_row
-        )
-        consec_empty_rows = 0
-        id_col = [
-            idx
-            for idx, val in enumerate(ws_sheet[header_row])
-            if isinstance(val.value, str) and val.value.strip() == tag
-        ][0]
-        for row in row_iterator:
-            # if no data in 10 consecutive rows, break loop
-            if not any(row[x].value for x in range(10)):
-                row_to_del.append(row[0].row)
-                consec_empty_rows += 1
-            if consec_empty_rows > 10:
-                break
-            consec_empty_rows = 0
-            if str(row[id_col].value) not in sample_list:
-                row_to_del.append(row[0].row)
+            raise IndexError(f"Column with tag '{tag}' not found in {metadata}")
+        rows_to_keep = list(range(1, header_row + 1))
+        for row in ws_sheet.iter_rows(
+            min_row=header_row + 1, max_row=ws_sheet.max_row, max_col=id_col + 1
+        ):
+            if str(row[id_col].value) in sample_set:
+                rows_to_keep.append(row[id_col].row)
         stderr.print("Collected rows to create the excel file")
-        if len(row_to_del) > 0:
-            row_to_del.sort(reverse=True)
-            for idx in row_to_del:
-                try:
-                    ws_sheet.delete_rows(idx)
-                except TypeError as e:
-                    self.log.error(
-                        "Unable to delete row %s from metadata file because of",
-                        idx,
-                        e,
-                    )
-                    stderr.print(f"[red] Unable to delete row {idx} becuase of {e}")
-                    raise
+        Validate.keep_sheet_rows(ws_sheet, rows_to_keep)
         os.makedirs(out_folder, exist_ok=True)
         new_name = "invalid_" + os.path.basename(metadata)
         m_file = os.path.join(out_folder, new_name)
@@ -517,6 +945,57 @@ class Validate(BaseModule):
         stderr.print(f"Saved excel file with the invalid samples: {m_file}")
         return m_file
 
+    @staticmethod
+    def keep_sheet_rows(ws_sheet, rows_to_keep):
+        """Keep only the given rows of a worksheet, editing it in place. Each kept
+        row is moved up to its new position with its values and styles, and the
+        rows left below are deleted at once, so the sheet is never shifted row by
+        row. The sheet itself is kept, along with its defined names, column widths,
+        frozen panes, data validations and conditional formatting.
+
+        Args:
+            ws_sheet (openpyxl.Worksheet): Sheet to be filtered
+            rows_to_keep (list(int)): Number of the rows (1-based) to keep, sorted
+
+        Returns:
+            ws_sheet (openpyxl.Worksheet): Same sheet with the selected rows
+        """
+        # Merged cells are only kept if none of their rows are moved
+        for merged_range in list(ws_sheet.merged_cells.ranges):
+            if not (
+                merged_range.max_row <= len(rows_to_keep)
+                and all(
+                    rows_to_keep[idx - 1] == idx
+                    for idx in range(merged_range.min_row, merged_range.max_row + 1)
+                )
+            ):
+                ws_sheet.unmerge_cells(merged_range.coord)
+        max_col = ws_sheet.max_column
+        for new_idx, row_idx in enumerate(rows_to_keep, start=1):
+            if new_idx == row_idx:
+                continue
+            # Kept rows only move up, so row_idx has not been overwritten yet
+            for col_idx in range(1, max_col + 1):
+                cell = ws_sheet.cell(row=row_idx, column=col_idx)
+                new_cell = ws_sheet.cell(row=new_idx, column=col_idx)
+                new_cell.value = cell.value
+                new_cell._style = copy(cell._style)
+                new_cell.hyperlink = copy(cell.hyperlink) if cell.hyperlink else None
+                new_cell.comment = copy(cell.comment) if cell.comment else None
+            row_dim = ws_sheet.row_dimensions[row_idx]
+            new_dim = ws_sheet.row_dimensions[new_idx]
+            new_dim.height = row_dim.height
+            new_dim.hidden = row_dim.hidden
+        if ws_sheet.max_row > len(rows_to_keep):
+            ws_sheet.delete_rows(
+                len(rows_to_keep) + 1, ws_sheet.max_row - len(rows_to_keep)
+            )
+        for row_idx in [
+            idx for idx in ws_sheet.row_dimensions if idx > len(rows_to_keep)
+        ]:
+            del ws_sheet.row_dimensions[row_idx]
+        return ws_sheet
+
     def create_validated_json(self, valid_json_data, out_folder):
         """Create a copy of the input json file, keeping only the validated samples
 
@@ -615,13 +1094,13 @@ class Validate(BaseModule):
         Returns:
             list[dict]: Updated list of invalid samples, including any re-detected ones from the log.
         """
-        log_invalid_samples = []
+        log_invalid_samples = set()
         self.log.info("Updating invalid samples with previous log_summary")
         if self.lab_code in previous_logsum.keys():
             for samp, logs in previous_logsum[self.lab_code].get("samples", {}).items():
                 if not logs["valid"]:
                     self.log.debug(f"Found sample {samp} invalid in log_summary")
-                    log_invalid_samples.append(samp)
+                    log_invalid_samples.add(samp)
         else:
             errtxt = f"Lab code {self.lab_code} not found in {self.logsum_file} to update invalid samples"
             self.log.warning(errtxt)
@@ -630,11 +1109,9 @@ class Validate(BaseModule):
 
         samp_id = "sequencing_sample_id"
         updated_invalid = [
-            x
-            for x in self.json_data
-            if x.get(samp_id) in log_invalid_samples and x not in invalid_json
+            x for x in self.json_data if x.get(samp_id) in log_invalid_samples
         ]
-        invalid_json.extend([x for x in updated_invalid if x not in invalid_json])
+        invalid_json.extend(Validate.exclude_samples(updated_invalid, invalid_json))
         return invalid_json
 
     def upload_validation_results(
@@ -862,15 +1339,24 @@ class Validate(BaseModule):
             "user": self.db_user,
             "pass": self.db_pass,
         }
-        api_rest = RestApi(server_url, api_url)
+        db_threads = self.config.get_topic_data("update_db", "check_db_threads") or 8
+        api_rest = RestApi(server_url, api_url, pool_size=db_threads)
         apifunc = p_settings[self.db_platform]["check_sample"]
-        for sample in self.json_data:
+        self.log.info(
+            f"Checking {len(self.json_data)} samples in {self.db_platform} db"
+        )
+        db_results = api_rest.samples_already_in_db(
+            apifunc,
+            credentials,
+            self.json_data,
+            threads=db_threads,
+        )
+        valid_ids = {id(x) for x in valid_json_data}
+        samples_in_db = []
+        for sample, (samp_in_db, error) in zip(self.json_data, db_results):
             sample_seqid = sample.get("sequencing_sample_id")
-            self.log.info(f"Checking sample {sample_seqid} in {self.db_platform} db")
-            try:
-                samp_in_db = api_rest.sample_already_in_db(apifunc, credentials, sample)
-            except ValueError as e:
-                errtxt = f"Could not check for sample {sample_seqid} in db: {e}"
+            if error is not None:
+                errtxt = f"Could not check for sample {sample_seqid} in db: {error}"
                 stderr.print(f"[red]{errtxt}")
                 self.log.error(errtxt)
                 self.logsum.add_error(errtxt, sample=sample_seqid)
@@ -880,35 +1366,73 @@ class Validate(BaseModule):
                 stderr.print(f"[yellow]{errtxt}")
                 self.log.error(errtxt)
                 self.logsum.add_error(errtxt, sample=sample_seqid)
-                if sample in valid_json_data:
-                    valid_json_data.remove(sample)
-                    invalid_json.append(sample)
-            else:
-                self.log.info("Sample not found in db.")
+                if id(sample) in valid_ids:
+                    samples_in_db.append(sample)
+        self.log.info(
+            f"{len(samples_in_db)} valid samples were already in {self.db_platform} db"
+        )
+        if samples_in_db:
+            valid_json_data = Validate.exclude_samples(valid_json_data, samples_in_db)
+            invalid_json.extend(samples_in_db)
         return valid_json_data, invalid_json
 
-    def validate(self):
-        """Validate samples from metadata, create an excel with invalid samples,
-        and a json file with the validated ones.
+    def prepare_validator(self):
+        """Validate the schema and build the validator with the configured dates
+
+        Returns:
+            validator (jsonschema.Validator): Validator with custom checks included
+            date_range (tuple(datetime.date)): (start, end) dates used by validator
         """
         self.log.info("Validate the given schema")
         self.validate_schema()
         self.log.info("Preparing validator based on config")
         starting_date = self.config.get_topic_data("generic", "starting_date")
-        date_checker = (
-            relecov_tools.assets.schema_utils.custom_validators.make_date_checker(
-                datetime.strptime(starting_date, "%Y-%m-%d").date(),
-                datetime.now().date(),
-            )
+        date_range = (
+            datetime.strptime(starting_date, "%Y-%m-%d").date(),
+            datetime.now().date(),
         )
-        validator = Draft202012Validator(self.json_schema, format_checker=date_checker)
+        validator = Validate.build_validator(self.json_schema, date_range)
+        return validator, date_range
+
+    def load_validation_cache(self, date_range):
+        """Load the cache of previous validation results if enabled in config
+
+        Args:
+            date_range (tuple(datetime.date)): (start, end) dates used by validator
+
+        Returns:
+            cache (ValidationCache): Cache for this schema and config, or None
+        """
+        if not self.config.get_topic_data("generic", "validation_cache"):
+            return None
+        return ValidationCache(self.json_schema, date_range)
+
+    def save_validation_cache(self, cache):
+        """Save the new results in the cache and add its hit rate to log summary"""
+        if cache is None:
+            return
+        cache.save()
+        self.logsum.add_stats(cache.get_stats())
+        return
+
+    def validate(self):
+        """Validate samples from metadata, create an excel with invalid samples,
+        and a json file with the validated ones.
+        """
+        validator, date_range = self.prepare_validator()
+        cache = self.load_validation_cache(date_range)
         self.log.info("Starting validation process of JSON file against schema")
         valid_json_data, errors = Validate.validate_instances(
             self.json_data,
             self.json_schema,
             sample_id_field=self.sample_id_field,
-            validator=validator,
+            # With several processes each one builds its validator from date_range
+            validator=validator if self.threads <= 1 else None,
+            threads=self.threads,
+            date_range=date_range,
+            cache=cache,
         )
+        self.save_validation_cache(cache)
         for sample in valid_json_data:
             sample_id_value = sample.get(self.sample_id_field)
             self.logsum.feed_key(sample=sample_id_value)
@@ -919,11 +1443,88 @@ class Validate(BaseModule):
             )
         else:
             stderr.print("[green]No errors found during metadata validation!")
-        invalid_json = [x for x in self.json_data if x not in valid_json_data]
+        invalid_json = Validate.exclude_samples(self.json_data, valid_json_data)
         return valid_json_data, invalid_json
 
+    def execute_stream_validation(self):
+        """Validate the json file in chunks of STREAM_CHUNK_SIZE samples, so only
+        one chunk is loaded at a time. Valid and invalid samples are written as
+        NDJSON (one sample per line) while they are validated, and invalid excel
+        is created at the end with the IDs read back from the invalid NDJSON.
+        The error summary and the log summary still keep the ID of each sample.
+        """
+        validator, date_range = self.prepare_validator()
+        cache = self.load_validation_cache(date_range)
+        os.makedirs(self.out_folder, exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(self.json_data_file))[0]
+        valid_file = os.path.join(self.out_folder, f"validated_{base_name}.ndjson")
+        invalid_file = os.path.join(self.out_folder, f"invalid_{base_name}.ndjson")
+        errors = ValidationErrors()
+        valid_count = invalid_count = 0
+        self.log.info("Starting streaming validation of JSON file against schema")
+        records = relecov_tools.utils.iter_json_records(self.json_data_file)
+        chunks = relecov_tools.utils.iter_chunks(records, STREAM_CHUNK_SIZE)
+        with (
+            open(valid_file, "w", encoding="utf-8") as valid_fh,
+            open(invalid_file, "w", encoding="utf-8") as invalid_fh,
+        ):
+            for chunk_idx, chunk in enumerate(chunks):
+                valid_chunk, chunk_errors = Validate.validate_instances(
+                    chunk,
+                    self.json_schema,
+                    sample_id_field=self.sample_id_field,
+                    # Each process builds its validator from date_range
+                    validator=validator if self.threads <= 1 else None,
+                    threads=self.threads,
+                    date_range=date_range,
+                    index_offset=chunk_idx * STREAM_CHUNK_SIZE,
+                    cache=cache,
+                )
+                errors.update(chunk_errors)
+                for sample in valid_chunk:
+                    self.logsum.feed_key(sample=sample.get(self.sample_id_field))
+                    valid_fh.write(json.dumps(sample, ensure_ascii=False) + "\n")
+                for sample in Validate.exclude_samples(chunk, valid_chunk):
+                    invalid_fh.write(json.dumps(sample, ensure_ascii=False) + "\n")
+                valid_count += len(valid_chunk)
+                invalid_count += len(chunk) - len(valid_chunk)
+        self.save_validation_cache(cache)
+        total_count = valid_count + invalid_count
+        if errors:
+            self.summarize_errors(errors)
+            stderr.print(f"[red]{valid_count}/{total_count} samples were valid")
+        else:
+            stderr.print("[green]No errors found during metadata validation!")
+        if valid_count:
+            self.log.info("Saved validated samples in %s", valid_file)
+            stderr.print(f"Saved validated samples in {valid_file}")
+        else:
+            os.remove(valid_file)
+            log_text = "All the samples were invalid. No valid file created"
+            self.logsum.add_error(entry=log_text)
+            stderr.print(f"[red]{log_text}")
+        if invalid_count:
+            log_text = "Summary: %s valid and %s invalid samples"
+            self.logsum.add_warning(entry=log_text % (valid_count, invalid_count))
+            self.log.info("Saved invalid samples in %s", invalid_file)
+            self.validate_invexcel_args()
+            self.create_invalid_metadata(
+                relecov_tools.utils.iter_json_records(invalid_file),
+                self.metadata,
+                self.out_folder,
+            )
+        else:
+            os.remove(invalid_file)
+            stderr.print("[green]Sucessful validation, no invalid file created!!")
+            self.log.info("Sucessful validation, no invalid file created.")
+        self.parent_create_error_summary(called_module="validate")
+        return
+
     def execute_validation_process(self):
         """Execute all the validation process start to end"""
+        if self.stream:
+            self.execute_stream_validation()
+            return
         valid_json_data, invalid_json = self.validate()
         if self.check_db:
             stderr.print(
@@ -947,7 +1548,7 @@ class Validate(BaseModule):
             invalid_json = self.update_invalid_with_logsum(
                 invalid_json, self.logsum.logs
             )
-        valid_json_data = [x for x in valid_json_data if x not in invalid_json]
+        valid_json_data = Validate.exclude_samples(valid_json_data, invalid_json)
         if self.upload_files:
             stderr.print(f"Starting uploading process for {self.lab_code}...")
             self.log.info(f"Starting uploading process for {self.lab_code}...")
@@ -967,3 +1568,32 @@ class Validate(BaseModule):
         # Always create a summary log file for validation process
         self.parent_create_error_summary(called_module="validate")
         return
+
+
+_worker_schema = None
+_worker_validator = None
+_worker_fast_check = None
+_worker_property_checks = None
+
+
+def _init_validation_worker(json_schema, date_range):
+    """Compile the validator once in each process of the validation pool"""
+    global _worker_schema, _worker_validator, _worker_fast_check
+    global _worker_property_checks
+    _worker_schema = json_schema
+    _worker_validator = Validate.build_validator(json_schema, date_range)
+    _worker_fast_check = Validate.get_fast_check(json_schema, _worker_validator)
+    _worker_property_checks = Validate.get_property_checks(
+        json_schema, _worker_validator
+    )
+
+
+def _validate_samples_chunk(chunk):
+    """Return the list of error records of each sample in the chunk"""
+    return Validate.get_samples_errors(
+        chunk,
+        _worker_schema,
+        _worker_validator,
+        _worker_fast_check,
+        _worker_property_checks,
+    )
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+import hashlib
+import json
+import logging
+import os
+import time
+from itertools import islice
+
+import relecov_tools
+from relecov_tools.assets.schema_utils.custom_validators import (
+    get_placeholder_exceptions,
+)
+from relecov_tools.assets.schema_utils.fast_validator import get_schema_hash
+from relecov_tools.config_json import ConfigJson
+
+log = logging.getLogger(__name__)
+
+
+class ValidationCache:
+    """Persistent cache of the validation errors found for each sample
+
+    Results are stored per (schema hash, validator config) in a JSON file under
+    ~/.relecov_tools/cache, mapping the hash of each sample content to the end
+    date accepted by the validator and the error records returned by
+    Validate.get_sample_errors (empty if the sample was valid).
+    The validator config includes the starting date, the placeholder exceptions
+    and the relecov-tools version, so any change on them starts a new cache. The
+    end date (usually today) is not part of it: valid results are reused on later
+    days, while results with errors are only reused with the same end date, as a
+    date out of range may be accepted now. At most max_entries results are kept,
+    the least recently used ones are dropped when new results are added. Cache files not used in
+    max_age_days are removed when saving.
+    """
+
+    _cache_dir = os.path.join(os.path.dirname(ConfigJson._extra_config_path), "cache")
+    max_age_days = 30
+    max_entries = 200000
+
+    def __init__(self, json_schema: dict, date_range: tuple | None = None):
+        self.schema_hash = get_schema_hash(json_schema)
+        start_date, end_date = tuple(date_range or (None, None))
+        self.end_date = str(end_date) if end_date else None
+        validator_config = json.dumps(
+            [
+                relecov_tools.__version__,
+                str(start_date) if start_date else None,
+                [sorted(x, key=str) for x in get_placeholder_exceptions()],
+            ],
+            default=str,
+        )
+        self.config_hash = hashlib.sha256(validator_config.encode()).hexdigest()
+        self.cache_path = os.path.join(
+            self._cache_dir,
+            f"validation_{self.schema_hash[:16]}_{self.config_hash[:16]}.json",
+        )
+        self.results = self._load_json()
+        self.updated = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def sample_hash(sample: dict) -> str:
+        """Hash of the canonical json dump of a sample"""
+        sample_dump = json.dumps(
+            sample, sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(sample_dump.encode()).hexdigest()
+
+    def get(self, sample_hash: str):
+        """Get the cached error records of a sample, or None if not cached or if
+        they were found with a different end date"""
+        cached = self.results.get(sample_hash)
+        error_records = None
+        if isinstance(cached, tuple):
+            end_date, error_records = cached
+            if error_records and end_date != self.end_date:
+                error_records = None
+        if error_records is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Move it to the end so the most recently used results are kept
+        self.results[sample_hash] = self.results.pop(sample_hash)
+        return error_records
+
+    def set(self, sample_hash: str, error_records: list):
+        """Store the error records found for a sample"""
+        self.results.pop(sample_hash, None)
+        self.results[sample_hash] = (self.end_date, list(error_records))
+        if len(self.results) > self.max_entries:
+            del self.results[next(iter(self.results))]
+        self.updated = True
+        return
+
+    def get_stats(self) -> dict:
+        """Cache hits and misses of this run, to be included in the log summary"""
+        total = self.hits + self.misses
+        hit_rate = round(100 * self.hits / total, 2) if total else 0
+        return {
+            "validation_cache_hits": self.hits,
+            "validation_cache_misses": self.misses,
+            "validation_cache_hit_rate": f"{hit_rate}%",
+        }
+
+    def _load_json(self) -> dict:
+        """Load previous results for the same schema and validator config.
+        Entries not matching [end_date, [[error_text, error_field], ...]] are skipped
+        """
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as fh:
+                cached_results = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cached_results, dict):
+            return {}
+        results = {}
+        for sample_hash, cached in cached_results.items():
+            try:
+                end_date, error_records = cached
+                results[sample_hash] = (
+                    end_date,
+                    [(error_text, field) for error_text, field in error_records],
+                )
+            except (TypeError, ValueError):
+                continue
+        log.debug(f"Loaded {len(results)} cached validation results")
+        return results
+
+    def save(self):
+        """Save the results in the cache folder. Failures are not fatal"""
+        try:
+            if self.updated:
+                excess = len(self.results) - self.max_entries
+                if excess > 0:
+                    for sample_hash in list(islice(self.results, excess)):
+                        del self.results[sample_hash]
+                os.makedirs(self._cache_dir, exist_ok=True)
+                tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as fh:
+                    json.dump(self.results, fh, ensure_ascii=False, default=str)
+                os.replace(tmp_path, self.cache_path)
+                self.updated = False
+            elif os.path.isfile(self.cache_path):
+                os.utime(self.cache_path)
+            self._remove_old_caches()
+        except OSError as e:
+            log.debug(f"Could not save validation cache {self.cache_path}: {e}")
+        return
+
+    def _remove_old_caches(self):
+        """Remove validation caches not used in the last max_age_days"""
+        min_mtime = time.time() - self.max_age_days * 86400
+        for entry in os.scandir(self._cache_dir):
+            if (
+                entry.name.startswith("validation_")
+                and entry.name.endswith(".json")
+                and entry.stat().st_mtime < min_mtime
+            ):
+                os.remove(entry.path)
+        return
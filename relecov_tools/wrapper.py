@@ -161,7 +161,12 @@ class Wrapper(BaseModule):
             raise ValueError(f"Couldnt find local path for {key} in log after download")
         files = [os.path.join(local_folder, file) for file in os.listdir(local_folder)]
         try:
-            metadata_file = [x for x in files if re.search("lab_metadata.*.xlsx", x)][0]
+            metadata_file = [
+                x
+                for x in files
+                if re.search("lab_metadata", x)
+                and relecov_tools.utils.is_metadata_file(x)
+            ][0]
             samples_file = [x for x in files if re.search("samples_data.*.json", x)][0]
         except IndexError:
             raise ValueError("No metadata/samples files found after download")
@@ -275,7 +280,9 @@ class Wrapper(BaseModule):
         samples_per_lab = defaultdict(int)
         for folder, files in finished_folders.items():
             lab = folder.split("/")[0]
-            seq_files = [f for f in files if not f.endswith(".xlsx")]
+            seq_files = [
+                f for f in files if not relecov_tools.utils.is_metadata_file(f)
+            ]
             samples_per_lab[lab] += len(seq_files)
         total_count = sum(samples_per_lab.values())
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+import os
+import re
+import sys
+import random
+import argparse
+import tempfile
+import time
+import tracemalloc
+from relecov_tools.assets.pipeline_utils.utils import LongTableParse
+
+HEADING = [
+    "SAMPLE",
+    "CHROM",
+    "POS",
+    "REF",
+    "ALT",
+    "FILTER",
+    "DP",
+    "REF_DP",
+    "ALT_DP",
+    "AF",
+    "GENE",
+    "EFFECT",
+    "HGVS_C",
+    "HGVS_P",
+    "HGVS_P_1LETTER",
+    "CALLER",
+    "LINEAGE",
+]
+
+
+def legacy_parse_file(parser):
+    """Previous implementation of LongTableParse.parse_file, kept as reference.
+    Sample ids are resolved with the current method so only reading differs.
+    """
+    with open(parser.file_path, encoding="utf-8-sig") as fh:
+        lines = fh.readlines()
+    headings_from_csv = lines[0].strip().split(",")
+    heading_index = {
+        heading: headings_from_csv.index(heading)
+        for heading in parser.long_table_heading.values()
+    }
+    samp_dict = {}
+    for line in lines[1:]:
+        line_s = line.strip().split(",")
+        raw_sample = line_s[heading_index["SAMPLE"]].strip()
+        unique_sample = parser._raw_to_unique.get(raw_sample)
+        if unique_sample is None:
+            unique_sample = parser._resolve_sample(raw_sample)
+        if unique_sample not in samp_dict:
+            samp_dict[unique_sample] = []
+        variant_dict = {
+            key: line_s[heading_index[value]]
+            for key, value in parser.long_table_heading.items()
+        }
+        variant_dict["sample"] = unique_sample
+        if re.search("&", line_s[heading_index["GENE"]]):
+            for gene in re.split("&", line_s[heading_index["GENE"]]):
+                variant_dict_copy = variant_dict.copy()
+                variant_dict_copy["Gene"] = gene
+                samp_dict[unique_sample].append(variant_dict_copy)
+        else:
+            samp_dict[unique_sample].append(variant_dict)
+    return samp_dict
+
+
+def build_long_table(file_path, rows, samples, seed):
+    """Write a synthetic variants_long_table.csv sorted by sample as ivar/viralrecon do"""
+    random.seed(seed)
+    genes = ["ORF1ab", "S", "ORF3a", "E", "M", "ORF7b&ORF8", "N"]
+    effects = ["missense_variant", "synonymous_variant", "gene_fusion"]
+    rows_per_sample = max(1, rows // samples)
+    with open(file_path, "w") as fh:
+        fh.write(",".join(HEADING) + "\n")
+        for sample_idx in range(samples):
+            sample = f"SEQ{sample_idx}_U{sample_idx}"
+            for _ in range(rows_per_sample):
+                pos = random.randint(1, 29903)
+                ref, alt = random.sample("ACGT", 2)
+                dp = random.randint(10, 5000)
+                alt_dp = random.randint(0, dp)
+                fh.write(
+                    f"{sample},MN908947.3,{pos},{ref},{alt},PASS,{dp},{dp - alt_dp},"
+                    f"{alt_dp},{alt_dp / dp:.2f},{random.choice(genes)},"
+                    f"{random.choice(effects)},c.{pos}{ref}>{alt},.,.,ivar,B.1.1.7\n"
+                )
+    metadata = [
+        {"sequencing_sample_id": f"SEQ{idx}", "unique_sample_id": f"U{idx}"}
+        for idx in range(samples)
+    ]
+    return metadata
+
+
+def run_parser(parse_func, file_path, metadata, output_folder):
+    """Return (seconds, peak memory MB, result) of parsing the long table"""
+    parser = LongTableParse(
+        file_path=file_path,
+        pipeline_name="viralrecon",
+        output_folder=output_folder,
+        metadata=metadata,
+    )
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = parse_func(parser)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare LongTableParse.parse_file with its previous implementation"
+    )
+    parser.add_argument(
+        "-n",
+        "--rows",
+        type=int,
+        default=2000000,
+        help="Number of variant rows in the generated long table.",
+    )
+    parser.add_argument(
+        "-s",
+        "--samples",
+        type=int,
+        default=2000,
+        help="Number of samples in the generated long table.",
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=str,
+        default=None,
+        help="Use this variants_long_table.csv instead of a generated one.",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the table.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.file:
+            file_path, metadata = os.path.realpath(args.file), []
+        else:
+            file_path = os.path.join(tmp_dir, "variants_long_table.csv")
+            metadata = build_long_table(file_path, args.rows, args.samples, args.seed)
+        legacy_time, legacy_peak, legacy_result = run_parser(
+            legacy_parse_file, file_path, metadata, tmp_dir
+        )
+        new_time, new_peak, new_result = run_parser(
+            LongTableParse.parse_file, file_path, metadata, tmp_dir
+        )
+        if legacy_result != new_result:
+            print("Parsed data differs from the previous implementation")
+            sys.exit(1)
+        total = sum(len(variants) for variants in new_result.values())
+        del legacy_result
+        parser = LongTableParse(
+            file_path=file_path,
+            pipeline_name="viralrecon",
+            output_folder=tmp_dir,
+            metadata=metadata,
+        )
+        j_list = parser.convert_to_json(new_result)
+        start = time.perf_counter()
+        parser.save_to_file(j_list, "benchmark")
+        save_time = time.perf_counter() - start
+
+    print(f"Parsed {total} variants from {len(new_result)} samples")
+    print(f"previous parse_file: {legacy_time:.2f}s, peak {legacy_peak:.0f}MB")
+    print(f"parse_file: {new_time:.2f}s, peak {new_peak:.0f}MB")
+    print(f"save_to_file: {save_time:.2f}s")
+    print(f"speedup: x{legacy_time / new_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
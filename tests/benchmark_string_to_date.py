@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+import os
+import re
+import sys
+import random
+import argparse
+import timeit
+from datetime import datetime
+from itertools import product
+from relecov_tools.utils import string_to_date
+
+
+def legacy_string_to_date(string):
+    """Previous recursive implementation of utils.string_to_date, kept as reference"""
+
+    def rec_date_extraction(string, digits, sep):
+        regex = r"^\d{4}"
+        for _ in range(0, digits - 4, 2):
+            regex = regex + sep + r"\d{2}"
+        match = re.match(regex, string)
+        if not match:
+            match = re.match(regex, string.replace(":", sep))
+            if not match:
+                raise ValueError(f"Could not match date to given string: {string}")
+        matchdate = match.group(0)
+        full_date = "%Y%m%d%H%M%S"[0 : digits - 2]
+        datepattern = f"{sep}%".join(full_date.split("%")).strip(sep)
+        return datetime.strptime(matchdate, datepattern)
+
+    seps = ["", " ", "/", "-", "_"]
+    digits_list = [x for x in range(4, 16, 2)]
+    combinations = sorted(product(digits_list, seps), reverse=True)
+    for digits, sep in combinations:
+        try:
+            return rec_date_extraction(string, digits, sep)
+        except ValueError:
+            continue
+    return None
+
+
+def build_corpus(size, seed):
+    """Generate folder names like the ones uploaded by laboratories to the sftp"""
+    random.seed(seed)
+    templates = [
+        "{Y}{m}{d}",
+        "{Y}{m}{d}_{tag}",
+        "{Y}-{m}-{d}",
+        "{Y}_{m}_{d}_{tag}",
+        "{Y}{m}{d}{H}{M}{S}",
+        "{Y}{m}{d}{H}{M}{S}_tmp_processing",
+        "{Y}-{m}-{d} {H}:{M}:{S}",
+        "{Y}/{m}/{d}",
+        "{Y}{m}",
+        "{tag}_{Y}{m}{d}",
+        "{tag}",
+        "invalid_samples",
+    ]
+    tags = ["RUN1", "NextSeq", "lab", "batch2", "resubmission", "ONT_run"]
+    corpus = []
+    for _ in range(size):
+        values = {
+            "Y": str(random.randint(2019, 2026)),
+            "m": f"{random.randint(1, 13):02d}",
+            "d": f"{random.randint(1, 31):02d}",
+            "H": f"{random.randint(0, 24):02d}",
+            "M": f"{random.randint(0, 59):02d}",
+            "S": f"{random.randint(0, 59):02d}",
+            "tag": random.choice(tags),
+        }
+        corpus.append(random.choice(templates).format(**values))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare utils.string_to_date with its previous implementation"
+    )
+    parser.add_argument(
+        "-n",
+        "--size",
+        type=int,
+        default=5000,
+        help="Number of folder names in the generated corpus.",
+    )
+    parser.add_argument(
+        "-f",
+        "--folder",
+        type=str,
+        default=None,
+        help="Use the names of the subfolders found in this folder as corpus instead.",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of passes over the corpus, as folders are parsed more than once.",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the corpus.")
+    args = parser.parse_args()
+
+    if args.folder:
+        corpus = [
+            entry.name
+            for lab in os.scandir(args.folder)
+            if lab.is_dir()
+            for entry in os.scandir(lab.path)
+            if entry.is_dir()
+        ]
+    else:
+        corpus = build_corpus(args.size, args.seed)
+    if not corpus:
+        print("No folder names found to benchmark")
+        sys.exit(1)
+
+    mismatches = [
+        name for name in corpus if legacy_string_to_date(name) != string_to_date(name)
+    ]
+    if mismatches:
+        print(f"{len(mismatches)} results differ from the previous implementation:")
+        for name in mismatches[:10]:
+            print(f"  {name}: {legacy_string_to_date(name)} != {string_to_date(name)}")
+        sys.exit(1)
+
+    string_to_date.cache_clear()
+    legacy_time = timeit.timeit(
+        lambda: [legacy_string_to_date(x) for x in corpus], number=args.repeat
+    )
+    string_to_date.cache_clear()
+    cold_time = timeit.timeit(
+        lambda: [string_to_date.__wrapped__(x) for x in corpus], number=args.repeat
+    )
+    cached_time = timeit.timeit(
+        lambda: [string_to_date(x) for x in corpus], number=args.repeat
+    )
+    total = len(corpus) * args.repeat
+    print(f"Parsed {len(corpus)} folder names {args.repeat} times ({total} calls)")
+    print(f"previous string_to_date: {legacy_time:.4f}s")
+    print(f"string_to_date (no cache): {cold_time:.4f}s")
+    print(f"string_to_date (cached): {cached_time:.4f}s")
+    print(f"speedup: x{legacy_time / cold_time:.1f} / x{legacy_time / cached_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
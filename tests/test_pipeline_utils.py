@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+import pytest
+from Bio import SeqIO
+
+import relecov_tools.assets.pipeline_utils.viralrecon as viralrecon
+import relecov_tools.utils
+from relecov_tools.assets.pipeline_utils.utils import LongTableParse, scan_fasta_stats
+
+PASSING_SAMPLE = {
+    "per_sgene_ambiguous": 1.5,
+    "per_sgene_coverage": "99.5",
+    "per_ldmutations": "75.0",
+    "number_of_sgene_frameshifts": 0,
+    "number_of_unambiguous_bases": 29000,
+    "number_of_Ns": "150",
+    "per_genome_greater_10x": 99.0,
+    "per_reads_host": 2.0,
+}
+
+
+def evaluate(**changes):
+    sample = {**PASSING_SAMPLE, "sequencing_sample_id": "S1", **changes}
+    return viralrecon.quality_control_evaluation([sample])[0]
+
+
+def test_qc_pass_and_fail_reasons():
+    assert evaluate()["qc_test"] == "pass"
+    sample = evaluate(number_of_Ns="6000", per_sgene_coverage=None)
+    assert sample["qc_test"] == "fail"
+    assert sample["qc_failed"] == (
+        "(per_sgene_coverage < 98.0) -- (number_of_Ns > 5000)"
+    )
+
+
+def test_qc_not_evaluable_only_exempt_for_ldmutations():
+    assert evaluate(per_ldmutations="Not Evaluable")["qc_test"] == "pass"
+    sample = evaluate(per_sgene_coverage="Not Evaluable")
+    assert sample["qc_test"] == "fail"
+    assert sample["qc_failed"] == "(per_sgene_coverage = Not Evaluable invalid)"
+
+
+LONG_TABLE = (
+    "SAMPLE,CHROM,POS,REF,ALT,FILTER,DP,REF_DP,ALT_DP,AF,GENE,EFFECT,HGVS_C,"
+    "HGVS_P,HGVS_P_1LETTER,CALLER,LINEAGE\n"
+    "S1,NC_045512.2,241,C,T,PASS,100,1,99,0.99,orf1ab,"
+    '"upstream_gene_variant,intron_variant",c.-25C>T,.,.,ivar,B.1\n'
+    "\n"
+    "S1,NC_045512.2,27886,AAAC,A,PASS,1789,1756,1552,0.87,ORF7b&ORF8,gene_fusion,"
+    '"n.27887_27889del,extra",.,.,ivar,B.1\n'
+)
+
+
+def test_long_table_quoted_fields_and_blank_lines(tmp_path):
+    file_path = tmp_path / "variants_long_table.csv"
+    file_path.write_text(LONG_TABLE)
+    parser = LongTableParse(
+        file_path=str(file_path),
+        pipeline_name="viralrecon",
+        output_folder=str(tmp_path / "out"),
+        metadata=[{"sequencing_sample_id": "S1", "unique_sample_id": "U1"}],
+    )
+    samp_dict = parser.parse_file()
+    assert list(samp_dict) == ["U1"]
+    variants = samp_dict["U1"]
+    assert variants[0] == {
+        "sample": "U1",
+        "chromosome": "NC_045512.2",
+        "pos": "241",
+        "ref": "C",
+        "alt": "T",
+        "Filter": "PASS",
+        "dp": "100",
+        "ref_dp": "1",
+        "alt_dp": "99",
+        "af": "0.99",
+        "gene": "orf1ab",
+        "effect": "upstream_gene_variant,intron_variant",
+        "hgvs_c": "c.-25C>T",
+        "hgvs_p": ".",
+        "hgvs_p_1_letter": ".",
+        "caller": "ivar",
+        "lineage": "B.1",
+    }
+    # Gene fusions are split in one variant per gene
+    assert [variant["Gene"] for variant in variants[1:]] == ["ORF7b", "ORF8"]
+    for variant in variants[1:]:
+        assert variant["hgvs_c"] == "n.27887_27889del,extra"
+        assert variant["lineage"] == "B.1"
+
+
+FASTA = (
+    b">sample_1 consensus\r\n"
+    b"ACGTNNNNAC\r\n"
+    b"GT NN AC\r\n"
+    b">sample_2\n"
+    b"\n"
+    b"NNNNACGTACGTACGT\n"
+    b"ACG"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+def test_scan_fasta_stats_matches_seqio(tmp_path, chunk_size):
+    fasta_file = tmp_path / "sample.consensus.fa"
+    fasta_file.write_bytes(FASTA)
+    records = list(SeqIO.parse(str(fasta_file), "fasta"))
+    fasta_stats = scan_fasta_stats(str(fasta_file), chunk_size=chunk_size)
+    assert fasta_stats == {
+        "sequence_names": [record.description for record in records],
+        "genome_length": sum(len(record.seq) for record in records),
+        "md5": relecov_tools.utils.calculate_md5(str(fasta_file)),
+    }
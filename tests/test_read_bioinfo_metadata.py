@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+import logging
+import sys
+import threading
+
+import pytest
+
+import relecov_tools.read_bioinfo_metadata
+from relecov_tools.log_summary import LogSum
+from relecov_tools.read_bioinfo_metadata import BioinfoMetadata, BioinfoReportLog
+
+NOT_PROVIDED = "Not Provided [SNOMED:434941000124101]"
+
+
+@pytest.fixture
+def bioinfo(tmp_path):
+    """BioinfoMetadata with only the attributes needed by the tested methods,
+    without reading any input json or analysis folder"""
+    bioinfo = BioinfoMetadata.__new__(BioinfoMetadata)
+    bioinfo.log = logging.getLogger("test_read_bioinfo_metadata")
+    bioinfo.log_report = BioinfoReportLog()
+    bioinfo.logsum = LogSum(output_dir=str(tmp_path / "logs"))
+    bioinfo._thread_logs = threading.local()
+    bioinfo.not_provided_field = NOT_PROVIDED
+    bioinfo.extract_mode = "copy"
+    return bioinfo
+
+
+def test_extract_files_warns_missing_files_for_each_sample(bioinfo, tmp_path):
+    batch = str(tmp_path / "batch")
+    bioinfo.extract_files(
+        [
+            (NOT_PROVIDED, batch, "S1", "consensus_sequence_filepath"),
+            (NOT_PROVIDED, batch, "S2", "consensus_sequence_filepath"),
+            (NOT_PROVIDED, batch, "S1", "long_table_path"),
+        ]
+    )
+    assert bioinfo.log_report.report["warning"]["extract_file"] == [
+        "File for consensus_sequence_filepath not provided in sample S1",
+        "File for consensus_sequence_filepath not provided in sample S2",
+        "File for long_table_path not provided in sample S1",
+    ]
+
+
+def test_extract_files_keeps_first_file_for_same_destination(bioinfo, tmp_path):
+    batch = tmp_path / "batch"
+    first, second = tmp_path / "run1", tmp_path / "run2"
+    first.mkdir()
+    second.mkdir()
+    (first / "S1.consensus.fa").write_text(">first\nACGT\n")
+    (second / "S1.consensus.fa").write_text(">second\nTTTT\n")
+    bioinfo.extract_files(
+        [
+            (str(first / "S1.consensus.fa"), str(batch), "S1", "consensus"),
+            (str(second / "S1.consensus.fa"), str(batch), "S1", "consensus"),
+        ]
+    )
+    extracted = batch / "analysis_results" / "S1.consensus.fa"
+    assert extracted.read_text() == ">first\nACGT\n"
+    assert "extract_file" not in bioinfo.log_report.report["warning"]
+
+
+@pytest.mark.parametrize("mode", ["hardlink", "symlink"])
+def test_extract_files_with_link_modes(bioinfo, tmp_path, mode):
+    bioinfo.extract_mode = mode
+    source = tmp_path / "S1.sorted.bam"
+    source.write_bytes(b"bam")
+    bioinfo.extract_files([(str(source), str(tmp_path / "batch"), "S1", "bam")])
+    extracted = tmp_path / "batch" / "analysis_results" / "S1.sorted.bam"
+    assert extracted.read_bytes() == b"bam"
+    assert extracted.is_symlink() == (mode == "symlink")
+
+
+def test_sample_paths_index_matches_whole_sample_names(bioinfo):
+    files_found = {
+        "mapping_consensus": [
+            "/run/S1.consensus.fa",
+            "/run/S10.consensus.fa",
+            "/run/S1_1.consensus.fa",
+            "/run/S1-trimmed/S1R1.consensus.fa",
+        ],
+        "variants_long_table": ["/run/variants_long_table.csv"],
+    }
+    index = bioinfo._build_sample_paths_index(
+        files_found, ["S1", "S10", "S1_1", None], ["variants_long_table"]
+    )
+    assert index == {
+        "mapping_consensus": {
+            "S1": ["/run/S1.consensus.fa", "/run/S1-trimmed/S1R1.consensus.fa"],
+            "S10": ["/run/S10.consensus.fa"],
+            "S1_1": ["/run/S1_1.consensus.fa"],
+        }
+    }
+
+
+def test_sample_paths_index_without_longer_sample_name(bioinfo):
+    # S1_1 is not a sample, so its file belongs to S1 followed by a separator
+    files_found = {"mapping_consensus": ["/run/S1_1.consensus.fa", "/run/S1R1.bam"]}
+    index = bioinfo._build_sample_paths_index(files_found, ["S1", "S10"], [])
+    assert index == {"mapping_consensus": {"S1": ["/run/S1_1.consensus.fa"]}}
+
+
+def test_split_tables_by_batches(bioinfo, tmp_path):
+    bioinfo.software_name = "viralrecon"
+    bioinfo.software_config = {
+        "mapping_stats": {"split_by_batch": True, "sample_col_idx": 1},
+        "variants_long_table": {"split_by_batch": False},
+    }
+    table = tmp_path / "mapping_illumina.tab"
+    table.write_text("sample\treads\nS1\t10\nS2\t20\nS3\t30\nS4\t40\nS2\t21\n")
+    batches = [
+        ("batch_a", [{"sequencing_sample_id": "S1"}, {"sequencing_sample_id": "S2"}]),
+        ("batch_b", [{"sequencing_sample_id": "S3"}, {"sequencing_sample_id": "S2"}]),
+        ("batch_c", [{"sequencing_sample_id": "S5"}]),
+    ]
+    batches = [(tag, batch_data, str(tmp_path / tag)) for tag, batch_data in batches]
+    bioinfo.split_tables_by_batches(
+        {"mapping_stats": [str(table)], "variants_long_table": [str(table)]}, batches
+    )
+
+    def read_table(tag):
+        path = tmp_path / tag / "analysis_results" / f"mapping_illumina_{tag}.tab"
+        return path.read_text().splitlines()
+
+    assert read_table("batch_a") == ["sample\treads", "S1\t10", "S2\t20", "S2\t21"]
+    assert read_table("batch_b") == ["sample\treads", "S2\t20", "S3\t30", "S2\t21"]
+    assert read_table("batch_c") == ["sample\treads"]
+    assert "split_tables_by_batches" not in bioinfo.log_report.report["warning"]
+
+
+def test_bioinfo_results_stop_at_first_failed_key(bioinfo, monkeypatch):
+    monkeypatch.setattr(relecov_tools.read_bioinfo_metadata, "PARSE_THREADS", 1)
+    bioinfo.software_name = "viralrecon"
+    bioinfo.software_config = {key: {} for key in ("first", "failing", "last")}
+    processed = []
+
+    def process_config_key(key, file_path, file_tag, output_dir, metadata=None):
+        processed.append(key)
+        bioinfo.update_all_logs("parse_" + key, "warning", f"Parsed {key}")
+        if key == "failing":
+            bioinfo.update_all_logs("parse_" + key, "error", "Wrong header")
+            sys.exit(1)
+        return None, None
+
+    monkeypatch.setattr(bioinfo, "_process_config_key", process_config_key)
+    files_dict = {key: [f"{key}.csv"] for key in bioinfo.software_config}
+    with pytest.raises(SystemExit):
+        bioinfo.add_bioinfo_results_metadata(files_dict, "tag", [], None)
+    assert "last" not in processed
+    report = bioinfo.log_report.report
+    assert report["warning"]["parse_first"] == ["Parsed first"]
+    assert report["error"]["parse_failing"] == ["Wrong header"]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+import hashlib
+import logging
+import os
+
+import pytest
+
+import relecov_tools.utils
+from relecov_tools.log_summary import LogSum
+from relecov_tools.read_lab_metadata import LabMetadata
+
+
+@pytest.fixture
+def lab_metadata(tmp_path):
+    """LabMetadata with only the attributes needed to fingerprint rows, without
+    reading any metadata file or configuration"""
+    files_folder = tmp_path / "files"
+    files_folder.mkdir()
+    lab_metadata = LabMetadata.__new__(LabMetadata)
+    lab_metadata.log = logging.getLogger("test_read_lab_metadata_rows")
+    lab_metadata.logsum = LogSum(output_dir=str(tmp_path / "logs"))
+    lab_metadata.output_dir = str(tmp_path / "out")
+    lab_metadata.files_folder = str(files_folder)
+    lab_metadata.sample_list_file = None
+    lab_metadata.unique_sample_id = "sequencing_sample_id"
+    lab_metadata.sample_data_map_field = "sequencing_sample_id"
+    lab_metadata.fingerprint_context = "context"
+    lab_metadata._md5_files_state = None
+    lab_metadata.not_provided_field = "Not Provided [SNOMED:434941000124101]"
+    lab_metadata.hashing_threads = 2
+    lab_metadata.lab_code = "COD-1"
+    lab_metadata.batch_id = "20240101"
+    lab_metadata.hex = "ABC123"
+    return lab_metadata
+
+
+def write_previous_output(lab_metadata, rows, records):
+    out_dir = lab_metadata.output_dir
+    relecov_tools.utils.write_json_to_file(
+        rows, f"{out_dir}/read_lab_metadata_COD-1_20240101.json"
+    )
+    relecov_tools.utils.write_json_to_file(
+        records, f"{out_dir}/row_fingerprints_COD-1_20240101.json"
+    )
+
+
+def test_row_fingerprint_covers_md5_files(lab_metadata, tmp_path):
+    files_folder = tmp_path / "files"
+    (files_folder / "S1_R1.fastq.gz").write_text("reads")
+    row = {"sequencing_sample_id": "S1", "sequence_file_R1": "S1_R1.fastq.gz"}
+    fingerprint = lab_metadata.row_fingerprint(row)
+
+    (files_folder / "S1_R1.fastq.gz.md5").write_text("abc  S1_R1.fastq.gz\n")
+    with_sidecar = lab_metadata.row_fingerprint(row)
+    assert with_sidecar != fingerprint
+    (files_folder / "S1_R1.fastq.gz.md5").write_text("def  S1_R1.fastq.gz\n")
+    assert lab_metadata.row_fingerprint(row) != with_sidecar
+
+    lab_metadata._md5_files_state = None
+    (files_folder / "md5sum.txt").write_text("abc  S1_R1.fastq.gz\n")
+    assert lab_metadata.row_fingerprint(row) not in (fingerprint, with_sidecar)
+
+
+def test_load_previous_rows_keeps_rows_without_sample_id(lab_metadata, tmp_path):
+    (tmp_path / "out").mkdir()
+    rows = [{"collecting_lab_sample_id": "A"}, {"collecting_lab_sample_id": "B"}]
+    records = [
+        {"row": 0, "sample_id": "None", "fingerprint": "fp_a", "logs": {}},
+        {"row": 1, "sample_id": "None", "fingerprint": "fp_b", "logs": {}},
+    ]
+    write_previous_output(lab_metadata, rows, records)
+    previous_rows = lab_metadata.load_previous_rows()
+    assert previous_rows["fp_a"][0] == rows[0]
+    assert previous_rows["fp_b"][0] == rows[1]
+
+
+def test_load_previous_rows_skips_mismatched_records(lab_metadata, tmp_path):
+    (tmp_path / "out").mkdir()
+    rows = [{"sequencing_sample_id": "S1"}]
+    records = [
+        {"row": 0, "sample_id": "S2", "fingerprint": "fp_s2", "logs": {}},
+        {"row": 3, "sample_id": "S1", "fingerprint": "fp_out", "logs": {}},
+    ]
+    write_previous_output(lab_metadata, rows, records)
+    assert lab_metadata.load_previous_rows() == {}
+
+
+def test_rows_logs_are_stored_and_replayed(lab_metadata):
+    lab_metadata.logsum.add_warning(entry="Previous warning", sample="S1")
+    logs_count = lab_metadata.get_sample_logs_count()
+    lab_metadata.logsum.add_warning(entry="Ontology not found", sample="S1")
+    lab_metadata.logsum.add_error(entry="Invalid date", sample="S2")
+    rows = [{"sequencing_sample_id": "S1"}, {"sequencing_sample_id": "S2"}]
+    rows_logs = lab_metadata.get_rows_logs(rows, logs_count)
+    assert rows_logs == [
+        {"S1": {"errors": [], "warnings": ["Ontology not found"]}},
+        {"S2": {"errors": ["Invalid date"], "warnings": []}},
+    ]
+
+    lab_metadata.logsum = LogSum(output_dir=lab_metadata.output_dir)
+    lab_metadata.replay_rows_logs(rows_logs)
+    samples = next(iter(lab_metadata.logsum.logs.values()))["samples"]
+    assert samples["S1"]["warnings"] == ["Ontology not found"]
+    assert samples["S2"]["errors"] == ["Invalid date"]
+
+
+def test_samples_files_data_reuses_md5_sidecars(lab_metadata, tmp_path, monkeypatch):
+    files_folder = tmp_path / "files"
+    (tmp_path / "out").mkdir()
+    for name in ("S1_R1.fastq.gz", "S1_R2.fastq.gz", "S2_R1.fastq.gz"):
+        (files_folder / name).write_bytes(name.encode())
+    (files_folder / "S1_R1.fastq.gz.md5").write_text("ABCDEF  S1_R1.fastq.gz\n")
+    (files_folder / "S1_R2.fastq.gz.md5").write_text("\n")
+    hashed = []
+
+    def calculate_md5_batch(file_list, threads=4, description=""):
+        hashed.extend(file_list)
+        return {
+            file: hashlib.md5(open(file, "rb").read()).hexdigest() for file in file_list
+        }
+
+    monkeypatch.setattr(relecov_tools.utils, "calculate_md5_batch", calculate_md5_batch)
+    rows = [
+        {
+            "sequencing_sample_id": "S1",
+            "sequence_file_R1": "S1_R1.fastq.gz",
+            "sequence_file_R2": "S1_R2.fastq.gz",
+        },
+        {"sequencing_sample_id": "S2", "sequence_file_R1": "S2_R1.fastq.gz"},
+    ]
+    j_data = lab_metadata.get_samples_files_data(rows)
+    # Only the files without a usable sidecar are hashed
+    assert sorted(os.path.basename(file) for file in hashed) == [
+        "S1_R2.fastq.gz",
+        "S2_R1.fastq.gz",
+    ]
+    assert j_data["S1"]["sequence_file_R1_md5"] == "abcdef"
+    assert (
+        j_data["S1"]["sequence_file_R2_md5"]
+        == hashlib.md5(b"S1_R2.fastq.gz").hexdigest()
+    )
+    assert (
+        j_data["S2"]["sequence_file_R1_md5"]
+        == hashlib.md5(b"S2_R1.fastq.gz").hexdigest()
+    )
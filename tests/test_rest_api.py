@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+from relecov_tools.rest_api import RestApi
+
+
+def test_samples_already_in_db_caches_found_samples_per_instance(monkeypatch):
+    checked = []
+
+    def sample_already_in_db(self, api_func, credentials, sample):
+        checked.append(sample["sequencing_sample_id"])
+        if sample["sequencing_sample_id"] == "S3":
+            raise ValueError("Error trying to check for sample")
+        return sample["sequencing_sample_id"] == "S1"
+
+    monkeypatch.setattr(RestApi, "sample_already_in_db", sample_already_in_db)
+    samples = [
+        {"sequencing_sample_id": "S1"},
+        {"sequencing_sample_id": "S2"},
+        {"sequencing_sample_id": "S1"},
+        {"sequencing_sample_id": "S3"},
+    ]
+    api_rest = RestApi("http://localhost", "/api/", pool_size=2)
+    results = api_rest.samples_already_in_db("checkSample", {}, samples, threads=2)
+    assert results == [
+        (True, None),
+        (False, None),
+        (True, None),
+        (None, "Error trying to check for sample"),
+    ]
+    assert sorted(checked) == ["S1", "S2", "S3"]
+
+    # Only samples found are reused, the rest are checked again
+    checked.clear()
+    api_rest.samples_already_in_db("checkSample", {}, samples, threads=2)
+    assert sorted(checked) == ["S2", "S3"]
+
+    # Other instances do not share the cache
+    checked.clear()
+    RestApi("http://localhost", "/api/").samples_already_in_db(
+        "checkSample", {}, samples
+    )
+    assert sorted(checked) == ["S1", "S2", "S3"]
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+import os
+
+import pytest
+
+from relecov_tools.read_bioinfo_metadata import BioinfoMetadata
+from relecov_tools.scan_index import ScanIndex
+
+PATTERNS = {"mapping_stats": "mapping_illumina.*.tab"}
+
+
+@pytest.fixture
+def analysis_folder(tmp_path, monkeypatch):
+    """Analysis folder with one subfolder, indexes are saved in tmp_path/cache"""
+    monkeypatch.setattr(ScanIndex, "_cache_dir", str(tmp_path / "cache"))
+    folder = tmp_path / "analysis"
+    (folder / "variants").mkdir(parents=True)
+    (folder / "mapping_illumina_20240101.tab").write_text("sample\n")
+    (folder / "variants" / "variants_long_table.csv").write_text("SAMPLE\n")
+    # Older than the racy window, so the next scan can trust its mtime
+    for path in (folder, folder / "variants"):
+        os.utime(path, ns=(1, 1))
+    return folder
+
+
+def scan(folder, force_rescan=False):
+    scan_index = ScanIndex(str(folder), PATTERNS, force_rescan=force_rescan)
+    files = {}
+    pending = [str(folder)]
+    while pending:
+        current = pending.pop()
+        names, subfolders = scan_index.list_folder(
+            current, BioinfoMetadata._list_folder
+        )
+        files[os.path.relpath(current, folder)] = sorted(names)
+        pending.extend(subfolders)
+    scan_index.save()
+    return scan_index, files
+
+
+def test_scan_index_is_saved_only_in_cache(analysis_folder, tmp_path):
+    root_mtime = os.stat(analysis_folder).st_mtime_ns
+    scan_index, files = scan(analysis_folder)
+    assert files == {
+        ".": ["mapping_illumina_20240101.tab"],
+        "variants": ["variants_long_table.csv"],
+    }
+    assert os.listdir(tmp_path / "cache") == [os.path.basename(scan_index.cache_path)]
+    assert sorted(os.listdir(analysis_folder)) == [
+        "mapping_illumina_20240101.tab",
+        "variants",
+    ]
+    assert os.stat(analysis_folder).st_mtime_ns == root_mtime
+    assert scan_index.new_folders["."]["files"] == ["mapping_illumina_20240101.tab"]
+
+
+def test_scan_index_reuses_unchanged_folders(analysis_folder):
+    first_index, first_files = scan(analysis_folder)
+    assert (first_index.listed, first_index.reused) == (2, 0)
+    second_index, second_files = scan(analysis_folder)
+    assert (second_index.listed, second_index.reused) == (0, 2)
+    assert second_files == first_files
+
+
+def test_scan_index_lists_modified_folders_again(analysis_folder):
+    scan(analysis_folder)
+    (analysis_folder / "variants" / "variants_long_table_2.csv").write_text("S\n")
+    scan_index, files = scan(analysis_folder)
+    assert (scan_index.listed, scan_index.reused) == (1, 1)
+    assert files["variants"] == [
+        "variants_long_table.csv",
+        "variants_long_table_2.csv",
+    ]
+    # Modified during the racy window of the previous scan, so it is listed again
+    scan_index, _ = scan(analysis_folder)
+    assert (scan_index.listed, scan_index.reused) == (1, 1)
+
+
+def test_scan_index_force_rescan(analysis_folder):
+    scan(analysis_folder)
+    scan_index, _ = scan(analysis_folder, force_rescan=True)
+    assert (scan_index.listed, scan_index.reused) == (2, 0)
+
+
+def test_scan_index_discards_topics_for_new_patterns(analysis_folder):
+    scan_index = ScanIndex(str(analysis_folder), PATTERNS)
+    scan_index.list_folder(str(analysis_folder), BioinfoMetadata._list_folder)
+    topics = {"mapping_illumina_20240101.tab": ["mapping_stats"]}
+    scan_index.set_topics(str(analysis_folder), topics)
+    scan_index.save()
+
+    same_patterns = ScanIndex(str(analysis_folder), PATTERNS)
+    same_patterns.list_folder(str(analysis_folder), BioinfoMetadata._list_folder)
+    assert same_patterns.get_topics(str(analysis_folder)) == topics
+    new_patterns = ScanIndex(str(analysis_folder), {"mapping_stats": "*.csv"})
+    new_patterns.list_folder(str(analysis_folder), BioinfoMetadata._list_folder)
+    assert new_patterns.reused == 1
+    assert new_patterns.get_topics(str(analysis_folder)) is None
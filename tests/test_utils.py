@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+import errno
+import hashlib
+import json
+import os
+
+import pytest
+
+import relecov_tools.utils
+
+
+def test_is_metadata_file_accepts_template_and_named_tables():
+    assert relecov_tools.utils.is_metadata_file("METADATA_LAB_RELECOV.xlsx")
+    assert relecov_tools.utils.is_metadata_file("lab/20250101_lab_metadata.csv")
+    assert relecov_tools.utils.is_metadata_file("Metadata_export.tsv")
+    assert not relecov_tools.utils.is_metadata_file("sample1_R1.fastq.gz")
+
+
+def test_is_metadata_file_skips_md5_files(tmp_path):
+    md5_csv = tmp_path / "md5sum.csv"
+    md5_csv.write_text("d41d8cd98f00b204e9800998ecf8427e,sample1_R1.fastq.gz\n")
+    assert relecov_tools.utils.is_md5_file(md5_csv)
+    assert not relecov_tools.utils.is_metadata_file(md5_csv, header_flag="CAMPO")
+    assert not relecov_tools.utils.is_metadata_file("metadata_md5checksum.tsv")
+
+
+def test_is_metadata_file_checks_header_of_unnamed_tables(tmp_path):
+    lims_export = tmp_path / "lims_export.csv"
+    lims_export.write_text("Title,,\nCAMPO,Sample ID,Date\n,S1,2025-01-01\n")
+    other_table = tmp_path / "coverage.csv"
+    other_table.write_text("sample,coverage\nS1,98.5\n")
+    assert relecov_tools.utils.is_metadata_file(lims_export, header_flag="CAMPO")
+    assert not relecov_tools.utils.is_metadata_file(lims_export)
+    assert not relecov_tools.utils.is_metadata_file(other_table, header_flag="CAMPO")
+    assert not relecov_tools.utils.is_metadata_file(
+        os.path.join(tmp_path, "missing.csv"), header_flag="CAMPO"
+    )
+
+
+def test_extract_file_modes(tmp_path):
+    source = tmp_path / "sample.bam"
+    source.write_bytes(b"reads")
+    for mode in ("copy", "hardlink", "symlink"):
+        dest = tmp_path / f"{mode}.bam"
+        assert relecov_tools.utils.extract_file(source, dest, mode=mode) == mode
+        assert dest.read_bytes() == b"reads"
+    assert os.path.samefile(source, tmp_path / "hardlink.bam")
+    assert os.path.islink(tmp_path / "symlink.bam")
+
+
+def test_extract_file_falls_back_to_copy(tmp_path, monkeypatch):
+    source = tmp_path / "sample.bam"
+    source.write_bytes(b"reads")
+
+    def cross_device_link(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device_link)
+    dest = tmp_path / "dest.bam"
+    assert relecov_tools.utils.extract_file(source, dest, mode="hardlink") == "copy"
+    assert dest.read_bytes() == b"reads"
+    assert not os.path.samefile(source, dest)
+
+
+def test_extract_file_does_not_overwrite(tmp_path):
+    source = tmp_path / "sample.bam"
+    source.write_bytes(b"reads")
+    dest = tmp_path / "dest.bam"
+    dest.write_bytes(b"previous")
+    with pytest.raises(FileExistsError):
+        relecov_tools.utils.extract_file(source, dest, mode="hardlink")
+    assert dest.read_bytes() == b"previous"
+
+
+RECORDS = [
+    {"sequencing_sample_id": "S1", "note": "brackets ] and , in text"},
+    {"sequencing_sample_id": "S2", "values": [1, 2.5, None, True]},
+    {"sequencing_sample_id": "S3", "nested": {"a": {"b": "[{}]"}}},
+]
+
+
+@pytest.mark.parametrize("buffer_size", [1, 7, 1 << 20])
+def test_iter_json_records_reads_json_list(tmp_path, buffer_size):
+    json_file = tmp_path / "samples.json"
+    json_file.write_text(json.dumps(RECORDS, indent=4))
+    records = relecov_tools.utils.iter_json_records(json_file, buffer_size)
+    assert list(records) == RECORDS
+
+
+def test_iter_json_records_reads_ndjson(tmp_path):
+    ndjson_file = tmp_path / "samples.ndjson"
+    lines = [json.dumps(record) for record in RECORDS]
+    ndjson_file.write_text("\n".join(lines[:2]) + "\n\n" + lines[2] + "\n")
+    records = relecov_tools.utils.iter_json_records(ndjson_file)
+    assert list(records) == RECORDS
+
+
+@pytest.mark.parametrize(
+    "content", ['[{"a": 1}, {"b": ', '[{"a": 1}, {"b": 2}', '{"a": 1}\n{"b": }\n']
+)
+def test_iter_json_records_rejects_invalid_json(tmp_path, content):
+    json_file = tmp_path / "samples.json"
+    json_file.write_text(content)
+    with pytest.raises(ValueError):
+        list(relecov_tools.utils.iter_json_records(json_file, buffer_size=4))
+
+
+def test_iter_chunks():
+    chunks = relecov_tools.utils.iter_chunks(iter(range(5)), 2)
+    assert list(chunks) == [[0, 1], [2, 3], [4]]
+
+
+def test_calculate_md5_batch(tmp_path):
+    files = []
+    for idx in range(5):
+        file_path = tmp_path / f"S{idx}_R1.fastq.gz"
+        file_path.write_bytes(os.urandom(1000 * idx))
+        files.append(str(file_path))
+    missing = str(tmp_path / "missing.fastq.gz")
+    md5_results = relecov_tools.utils.calculate_md5_batch(files + [missing], 2)
+    assert md5_results.pop(missing) is None
+    assert md5_results == {
+        file: hashlib.md5(open(file, "rb").read()).hexdigest() for file in files
+    }
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+import datetime
+
+import pytest
+
+from relecov_tools.validate import Validate
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sequencing_sample_id": {"type": "string"},
+        "sample_collection_date": {"type": "string", "format": "date"},
+    },
+}
+DATE_RANGE = (datetime.date(2020, 1, 1), datetime.date(2024, 12, 31))
+
+
+def test_validate_instances_rejects_validator_with_threads():
+    validator = Validate.build_validator(SCHEMA, DATE_RANGE)
+    with pytest.raises(ValueError):
+        Validate.validate_instances(
+            [{"sequencing_sample_id": "S1"}],
+            SCHEMA,
+            "sequencing_sample_id",
+            validator=validator,
+            threads=2,
+        )
+
+
+@pytest.mark.parametrize("threads", [1, 2])
+def test_validate_instances_uses_date_range(threads):
+    samples = [
+        {"sequencing_sample_id": "S1", "sample_collection_date": "2023-05-01"},
+        {"sequencing_sample_id": "S2", "sample_collection_date": "2019-05-01"},
+    ]
+    valid, errors = Validate.validate_instances(
+        samples,
+        SCHEMA,
+        "sequencing_sample_id",
+        threads=threads,
+        date_range=DATE_RANGE,
+    )
+    assert valid == samples[:1]
+    assert list(errors.to_dict()["samples"].values()) == [["S2"]]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+import openpyxl
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from relecov_tools.validate import Validate
+
+
+def build_sheet(n_rows=10):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "METADATA_LAB"
+    ws.append(["RELECOV template"])
+    ws.append(["Sample ID given for sequencing", "Value"])
+    for idx in range(1, n_rows + 1):
+        ws.append([f"S{idx}", idx])
+    ws["A5"].font = openpyxl.styles.Font(bold=True)
+    ws.row_dimensions[9].height = 30
+    ws.merge_cells("A1:B1")
+    ws.freeze_panes = "A3"
+    validation = DataValidation(type="whole")
+    validation.add("B3:B1000")
+    ws.add_data_validation(validation)
+    ws.defined_names["sample_ids"] = DefinedName(
+        "sample_ids", attr_text="METADATA_LAB!$A$3:$A$1000"
+    )
+    wb.create_sheet("OVERVIEW")
+    return wb, ws
+
+
+def test_keep_sheet_rows_moves_rows_in_place():
+    wb, ws = build_sheet()
+    # Header rows, S3 (row 5) and S7 (row 9)
+    Validate.keep_sheet_rows(ws, [1, 2, 5, 9])
+    assert wb.sheetnames == ["METADATA_LAB", "OVERVIEW"]
+    assert [row for row in ws.values] == [
+        ("RELECOV template", None),
+        ("Sample ID given for sequencing", "Value"),
+        ("S3", 3),
+        ("S7", 7),
+    ]
+    assert ws.max_row == 4
+    assert ws["A3"].font.bold and not ws["A4"].font.bold
+    assert ws.row_dimensions[4].height == 30
+    assert 9 not in ws.row_dimensions
+    assert [str(rng) for rng in ws.merged_cells.ranges] == ["A1:B1"]
+    assert ws.freeze_panes == "A3"
+    assert len(ws.data_validations.dataValidation) == 1
+    assert "sample_ids" in ws.defined_names
+
+
+def test_keep_sheet_rows_unmerges_moved_ranges():
+    wb, ws = build_sheet()
+    ws.merge_cells("A6:B7")
+    Validate.keep_sheet_rows(ws, [1, 2, 6, 8])
+    assert [str(rng) for rng in ws.merged_cells.ranges] == ["A1:B1"]
+    assert [row for row in ws.values][2:] == [("S4", None), ("S6", 6)]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+import os
+
+import pytest
+from jsonschema import Draft202012Validator, FormatChecker
+
+import relecov_tools.utils
+from relecov_tools.validate import Validate
+
+SCHEMA_FOLDER = os.path.join(os.path.dirname(relecov_tools.utils.__file__), "schema")
+DATA_FOLDER = os.path.join(os.path.dirname(__file__), "data", "map_validate")
+
+SCHEMA = {
+    "$defs": {"positive": {"type": "integer", "minimum": 0}},
+    "type": "object",
+    "required": ["lab", "reads"],
+    "properties": {
+        "lab": {"type": "string", "enum": ["lab_a", "lab_b"]},
+        "reads": {"$ref": "#/$defs/positive"},
+        "date": {"type": "string", "format": "date"},
+        "depth": {"anyOf": [{"type": "string"}, {"type": "number"}]},
+    },
+    "additionalProperties": False,
+    "if": {"properties": {"lab": {"const": "lab_a"}}},
+    "then": {"required": ["depth"]},
+    "anyOf": [{"required": ["lab"]}, {"required": ["other"]}],
+    "allOf": [{"properties": {"reads": {"$ref": "#/$defs/positive"}}}],
+}
+
+SAMPLES = [
+    {"lab": "lab_a", "reads": -1, "date": "2020-13-45"},
+    {"lab": "lab_c", "depth": []},
+    {"reads": 3, "date": "2020-13-45", "unknown": 1},
+]
+
+
+def error_key(error):
+    return (
+        error.message,
+        list(error.path),
+        list(error.schema_path),
+        error.validator,
+        error.validator_value,
+    )
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+@pytest.mark.parametrize("memo", [None, {}])
+def test_iter_sample_errors_matches_jsonschema(sample, memo):
+    validator = Draft202012Validator(SCHEMA, format_checker=FormatChecker())
+    expected = [error_key(error) for error in validator.iter_errors(sample)]
+    errors = Validate.iter_sample_errors(sample, validator, set(), memo)
+    assert [error_key(error) for error in errors] == expected
+    errors = Validate.iter_sample_errors(sample, validator, {"date"}, memo)
+    assert [error_key(error) for error in errors] == [
+        key for key in expected if key[1][:1] != ["date"]
+    ]
+
+
+def test_iter_sample_errors_matches_jsonschema_for_relecov_schema():
+    schema_path = os.path.join(SCHEMA_FOLDER, "relecov_schema.json")
+    json_schema = relecov_tools.utils.read_json_file(schema_path)
+    samples = relecov_tools.utils.read_json_file(
+        os.path.join(DATA_FOLDER, "processed_metadata_lab_test.json")
+    )
+    validator = Validate.build_validator(json_schema)
+    memo = {}
+    for sample in samples:
+        expected = [error_key(error) for error in validator.iter_errors(sample)]
+        errors = Validate.iter_sample_errors(sample, validator, set(), memo)
+        assert [error_key(error) for error in errors] == expected
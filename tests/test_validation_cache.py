@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+import datetime
+import json
+
+import pytest
+
+from relecov_tools.validation_cache import ValidationCache
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"sample_collection_date": {"type": "string"}},
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ValidationCache, "_cache_dir", str(tmp_path))
+    return tmp_path
+
+
+def date_range(end_day):
+    return (datetime.date(2020, 1, 1), datetime.date(2025, 1, end_day))
+
+
+def test_results_are_reused_on_later_days():
+    cache = ValidationCache(SCHEMA, date_range(1))
+    cache.set("valid_sample", [])
+    cache.set("invalid_sample", [("sample_collection_date", "date out of range")])
+    cache.save()
+
+    same_day = ValidationCache(SCHEMA, date_range(1))
+    assert same_day.cache_path == cache.cache_path
+    assert same_day.get("valid_sample") == []
+    assert same_day.get("invalid_sample") == [
+        ("sample_collection_date", "date out of range")
+    ]
+
+    next_day = ValidationCache(SCHEMA, date_range(2))
+    assert next_day.cache_path == cache.cache_path
+    assert next_day.get("valid_sample") == []
+    # Errors are validated again, the sample date may be in range now
+    assert next_day.get("invalid_sample") is None
+    assert next_day.get_stats()["validation_cache_hits"] == 1
+
+
+def test_starting_date_changes_cache_file():
+    cache = ValidationCache(SCHEMA, date_range(1))
+    other_start = ValidationCache(
+        SCHEMA, (datetime.date(2021, 1, 1), datetime.date(2025, 1, 1))
+    )
+    assert cache.cache_path != other_start.cache_path
+
+
+def test_cache_keeps_max_entries(monkeypatch):
+    monkeypatch.setattr(ValidationCache, "max_entries", 2)
+    cache = ValidationCache(SCHEMA, date_range(1))
+    cache.set("first", [])
+    cache.set("second", [])
+    cache.get("first")
+    cache.set("third", [])
+    assert set(cache.results) == {"first", "third"}
+    cache.save()
+
+    reloaded = ValidationCache(SCHEMA, date_range(1))
+    assert set(reloaded.results) == {"first", "third"}
+
+
+def test_cache_file_is_json_and_bad_entries_are_skipped():
+    cache = ValidationCache(SCHEMA, date_range(1))
+    cache.set("invalid_sample", [("sample_collection_date", "date out of range")])
+    cache.save()
+    with open(cache.cache_path) as fh:
+        cached_results = json.load(fh)
+    assert cached_results == {
+        "invalid_sample": [
+            "2025-01-01",
+            [["sample_collection_date", "date out of range"]],
+        ]
+    }
+
+    cached_results["bad_sample"] = "not a record"
+    with open(cache.cache_path, "w") as fh:
+        json.dump(cached_results, fh)
+    reloaded = ValidationCache(SCHEMA, date_range(1))
+    assert set(reloaded.results) == {"invalid_sample"}
+
+    with open(cache.cache_path, "w") as fh:
+        fh.write("not json")
+    assert ValidationCache(SCHEMA, date_range(1)).results == {}